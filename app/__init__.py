@@ -11,22 +11,100 @@ login.login_view = 'auth.login'
 login.login_message = 'Please log in to access this page.'
 
 def create_app(config_class=Config):
+    from app.startup import StartupTimer, init_startup
+    timer = StartupTimer()
+
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    db.init_app(app)
-    migrate.init_app(app, db)
-    login.init_app(app)
+    proxies = app.config.get('TRUSTED_PROXY_COUNT')
+    if proxies:
+        # Client address and scheme come from the router's X-Forwarded-* headers
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
 
-    from app.routes.auth import bp as auth_bp
-    app.register_blueprint(auth_bp, url_prefix='/auth')
+    with timer.phase('rate_limits'):
+        from app.rate_limit import init_rate_limits
+        init_rate_limits(app)
 
-    from app.routes.main import bp as main_bp
-    app.register_blueprint(main_bp)
+    with timer.phase('database'):
+        from app.database import configure_engine_options, register_engine_events
+        configure_engine_options(app)
 
-    from app.routes.admin import bp as admin_bp
-    app.register_blueprint(admin_bp)
+        db.init_app(app)
+        register_engine_events(app, db)
+        migrate.init_app(app, db)
+        login.init_app(app)
 
-    return app
+    with timer.phase('models'):
+        # Imported here, not at module level, so `import app` stays cheap
+        from app import models
+
+    with timer.phase('assets'):
+        from app.assets import init_assets
+        init_assets(app)
+
+    with timer.phase('events'):
+        from app.events import init_events
+        init_events()
+
+    with timer.phase('fragment_cache'):
+        from app.fragment_cache import init_fragment_cache
+        init_fragment_cache(app)
+
+    with timer.phase('change_bus'):
+        from app.change_bus import init_change_bus
+        init_change_bus(app)
+
+    with timer.phase('analytics'):
+        from app.analytics import init_analytics
+        init_analytics(app)
+
+    with timer.phase('rendering'):
+        from app.rendering import init_rendering
+        init_rendering(app)
+
+    with timer.phase('archive'):
+        from app.archive import init_archive
+        init_archive(app)
+
+    with timer.phase('sla'):
+        from app.sla import init_sla
+        init_sla(app)
 
-from app import models
+    with timer.phase('assignments'):
+        from app.queue_manager import init_assignments
+        init_assignments(app)
+
+    with timer.phase('trust'):
+        from app.trust_calculator import init_trust
+        init_trust(app)
+
+    with timer.phase('reports'):
+        from app.reports import init_reports
+        init_reports(app)
+
+    with timer.phase('ingest'):
+        from app.ingest import init_ingest
+        init_ingest(app)
+
+    with timer.phase('exports'):
+        from app.exports import init_exports
+        init_exports(app)
+
+    with timer.phase('blueprints'):
+        from app.routes.auth import bp as auth_bp
+        app.register_blueprint(auth_bp, url_prefix='/auth')
+
+        from app.routes.main import bp as main_bp
+        app.register_blueprint(main_bp)
+
+        from app.routes.admin import bp as admin_bp
+        app.register_blueprint(admin_bp)
+
+        from app.routes.api import bp as api_bp
+        app.register_blueprint(api_bp)
+
+    init_startup(app)
+    timer.finish(app)
+    return app
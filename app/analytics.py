@@ -0,0 +1,188 @@
+"""
+Feedback Analytics for ASCEND
+Daily and weekly feedback rollups per mentor, company and outcome, kept
+current as feedback is written so trend queries never scan Feedback
+"""
+
+from datetime import timedelta
+
+import click
+
+from app.models import Company, Feedback, FeedbackRollup, Question, ArchivedFeedback, ArchivedQuestion
+from app.database import dialect_insert
+from app import db
+
+
+class FeedbackRollups:
+    """Maintain and query the FeedbackRollup table"""
+
+    PERIODS = ('day', 'week')
+
+    @staticmethod
+    def bucket_start(period, moment):
+        """First date of the bucket containing moment (weeks start on Monday)"""
+        day = moment.date() if hasattr(moment, 'date') else moment
+        if period == 'week':
+            return day - timedelta(days=day.weekday())
+        return day
+
+    @staticmethod
+    def record(mentor_id, company_id, outcome, rating, created_at, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) one feedback from its day and week buckets
+
+        Runs in the caller's transaction; does not commit.
+        """
+        if mentor_id is None or not outcome:
+            return
+
+        rated = 1 if rating else 0
+        for period in FeedbackRollups.PERIODS:
+            FeedbackRollups._increment(
+                key={
+                    'period': period,
+                    'bucket_start': FeedbackRollups.bucket_start(period, created_at),
+                    'mentor_id': mentor_id,
+                    'company_id': company_id or 0,
+                    'outcome': outcome,
+                },
+                feedback_count=sign,
+                rating_sum=sign * (rating or 0),
+                rating_count=sign * rated
+            )
+
+    @staticmethod
+    def _increment(key, **deltas):
+        insert = dialect_insert(db.session)
+        if insert is None:
+            row = FeedbackRollup.query.filter_by(**key).first()
+            if row is None:
+                row = FeedbackRollup(feedback_count=0, rating_sum=0, rating_count=0, **key)
+                db.session.add(row)
+            for name, delta in deltas.items():
+                setattr(row, name, getattr(row, name) + delta)
+            db.session.flush()
+            return
+
+        table = FeedbackRollup.__table__
+        stmt = insert(table).values(**key, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: table.c[name] + stmt.excluded[name] for name in deltas}
+        )
+        db.session.execute(stmt)
+
+    @staticmethod
+    def rebuild():
+        """
+        Recompute every rollup from hot and archived feedback (repairs any drift)
+
+        Returns: number of rollup rows written
+        """
+        rows = db.session.query(
+            Feedback.mentor_id, Question.company_id, Feedback.outcome,
+            Feedback.rating, Feedback.created_at
+        ).outerjoin(Question, Question.id == Feedback.question_id).all()
+        rows += db.session.query(
+            ArchivedFeedback.mentor_id, ArchivedQuestion.company_id, ArchivedFeedback.outcome,
+            ArchivedFeedback.rating, ArchivedFeedback.created_at
+        ).outerjoin(ArchivedQuestion, ArchivedQuestion.id == ArchivedFeedback.question_id).all()
+
+        totals = {}
+        for mentor_id, company_id, outcome, rating, created_at in rows:
+            if mentor_id is None or not outcome or created_at is None:
+                continue
+            for period in FeedbackRollups.PERIODS:
+                key = (period, FeedbackRollups.bucket_start(period, created_at),
+                       mentor_id, company_id or 0, outcome)
+                count, rating_sum, rating_count = totals.get(key, (0, 0, 0))
+                totals[key] = (count + 1, rating_sum + (rating or 0), rating_count + (1 if rating else 0))
+
+        FeedbackRollup.query.delete()
+        db.session.bulk_insert_mappings(FeedbackRollup, [
+            {
+                'period': period, 'bucket_start': bucket_start, 'mentor_id': mentor_id,
+                'company_id': company_id, 'outcome': outcome, 'feedback_count': count,
+                'rating_sum': rating_sum, 'rating_count': rating_count,
+            }
+            for (period, bucket_start, mentor_id, company_id, outcome), (count, rating_sum, rating_count)
+            in totals.items()
+        ])
+        db.session.commit()
+
+        return len(totals)
+
+    @staticmethod
+    def outcomes_by_company(period='week', start=None, end=None, company_id=None,
+                            mentor_id=None, outcome=None):
+        """
+        Feedback outcomes per company per bucket, from rollups only
+
+        Returns: list of dicts (bucket_start, company_id, company_name,
+        outcome, count, average_rating), oldest bucket first
+        """
+        count = db.func.sum(FeedbackRollup.feedback_count)
+        rating_sum = db.func.sum(FeedbackRollup.rating_sum)
+        rating_count = db.func.sum(FeedbackRollup.rating_count)
+
+        query = db.session.query(
+            FeedbackRollup.bucket_start, FeedbackRollup.company_id, Company.name,
+            FeedbackRollup.outcome, count, rating_sum, rating_count
+        ).outerjoin(Company, Company.id == FeedbackRollup.company_id)\
+            .filter(FeedbackRollup.period == period)
+
+        if start is not None:
+            query = query.filter(FeedbackRollup.bucket_start >= FeedbackRollups.bucket_start(period, start))
+        if end is not None:
+            query = query.filter(FeedbackRollup.bucket_start <= end)
+        if company_id is not None:
+            query = query.filter(FeedbackRollup.company_id == company_id)
+        if mentor_id is not None:
+            query = query.filter(FeedbackRollup.mentor_id == mentor_id)
+        if outcome:
+            query = query.filter(FeedbackRollup.outcome == outcome)
+
+        rows = query.group_by(FeedbackRollup.bucket_start, FeedbackRollup.company_id,
+                              Company.name, FeedbackRollup.outcome)\
+            .having(count > 0)\
+            .order_by(FeedbackRollup.bucket_start, FeedbackRollup.company_id, FeedbackRollup.outcome)\
+            .all()
+
+        return [{
+            'bucket_start': bucket_start,
+            'company_id': company_id or None,
+            'company_name': company_name,
+            'outcome': outcome,
+            'count': total,
+            'average_rating': round(ratings / rated, 2) if rated else None,
+        } for bucket_start, company_id, company_name, outcome, total, ratings, rated in rows]
+
+    @staticmethod
+    def outcome_totals():
+        """All-time {outcome: (count, rating_sum, rating_count)} from the weekly buckets"""
+        rows = db.session.query(
+            FeedbackRollup.outcome,
+            db.func.sum(FeedbackRollup.feedback_count),
+            db.func.sum(FeedbackRollup.rating_sum),
+            db.func.sum(FeedbackRollup.rating_count)
+        ).filter(FeedbackRollup.period == 'week')\
+            .group_by(FeedbackRollup.outcome)\
+            .all()
+        return {outcome: (count or 0, ratings or 0, rated or 0) for outcome, count, ratings, rated in rows}
+
+
+@click.group('analytics')
+def analytics_cli():
+    """Feedback analytics commands."""
+
+
+@analytics_cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the daily and weekly feedback rollups from Feedback."""
+    written = FeedbackRollups.rebuild()
+    click.echo(f'Wrote {written} rollup rows')
+
+
+def init_analytics(app):
+    """Register the analytics CLI commands"""
+    app.cli.add_command(analytics_cli)
@@ -0,0 +1,304 @@
+"""
+Hot/Cold Archival for ASCEND
+Moves long-answered questions, with their responses and feedback, out of
+the hot tables in batches, and reads through to the archive wherever old
+questions are still shown
+"""
+
+import hashlib
+import math
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+
+from app.models import (
+    Question, Response, Feedback, Assignment, QuestionSignature, LSHBucket, RelatedQuestion,
+    ArchivedQuestion, ArchivedResponse, ArchivedFeedback, Alumni, Company, User
+)
+from app import db
+
+
+# (hot model, archive model) in insert order; deletes run in reverse
+ARCHIVED_MODELS = (
+    (Question, ArchivedQuestion),
+    (Response, ArchivedResponse),
+    (Feedback, ArchivedFeedback),
+)
+
+# Feedback lives in both places; aggregate readers go through these
+FEEDBACK_MODELS = (Feedback, ArchivedFeedback)
+
+
+class ArchiveCollisionError(Exception):
+    """A row about to be archived has an id the archive already holds"""
+
+
+class ArchiveManager:
+    """Batched hot -> cold moves and read-through lookups"""
+
+    DEFAULT_AFTER_DAYS = 365
+    DEFAULT_BATCH_SIZE = 500
+
+    @staticmethod
+    def _config(key, default):
+        try:
+            return current_app.config.get(key, default)
+        except RuntimeError:
+            return default
+
+    @staticmethod
+    def candidate_ids(cutoff, limit):
+        """Answered questions untouched since cutoff, with no open assignment"""
+        open_assignment = db.session.query(Assignment.id).filter(
+            Assignment.question_id == Question.id,
+            Assignment.state == 'open'
+        ).exists()
+        rows = db.session.query(Question.id).filter(
+            Question.status == 'answered',
+            Question.updated_at < cutoff,
+            ~open_assignment
+        ).order_by(Question.updated_at, Question.id).limit(limit).all()
+        return [row.id for row in rows]
+
+    @staticmethod
+    def _copy(hot, cold, key_column, ids, now):
+        """INSERT INTO cold SELECT ... FROM hot WHERE key IN ids"""
+        names = [c.name for c in hot.__table__.columns if c.name in cold.__table__.columns]
+        columns = [hot.__table__.c[name] for name in names]
+        if 'archived_at' in cold.__table__.columns:
+            names.append('archived_at')
+            columns.append(db.literal(now, type_=db.DateTime).label('archived_at'))
+
+        db.session.execute(
+            cold.__table__.insert().from_select(
+                names, db.select(*columns).where(key_column.in_(ids))
+            )
+        )
+
+    @staticmethod
+    def archive_batch(ids, now=None):
+        """
+        Move one batch of questions (with responses and feedback) to the archive
+
+        Everything happens in one transaction; the related-question index
+        drops archived questions, and hot questions that listed them as
+        related get their updated_at bumped so cached pages revalidate.
+        """
+        if not ids:
+            return 0
+        now = now or datetime.utcnow()
+
+        copies = (
+            (Question, ArchivedQuestion, Question.id),
+            (Response, ArchivedResponse, Response.question_id),
+            (Feedback, ArchivedFeedback, Feedback.question_id),
+        )
+        # Tables created before sqlite_autoincrement reuse the ids of deleted
+        # (archived) rows; refuse before writing anything rather than fail mid-batch
+        for hot, cold, key_column in copies:
+            taken = [row.id for row in db.session.query(hot.id)
+                     .join(cold, cold.id == hot.id).filter(key_column.in_(ids))]
+            if taken:
+                raise ArchiveCollisionError(
+                    f'{hot.__tablename__} ids {taken} are already archived; rebuild the '
+                    f'{hot.__tablename__} table with AUTOINCREMENT before archiving')
+
+        for hot, cold, key_column in copies:
+            ArchiveManager._copy(hot, cold, key_column, ids, now)
+
+        affected = [row.question_id for row in db.session.query(RelatedQuestion.question_id)
+                    .filter(RelatedQuestion.related_id.in_(ids),
+                            RelatedQuestion.question_id.notin_(ids))
+                    .distinct()]
+
+        delete = dict(synchronize_session=False)
+        RelatedQuestion.query.filter(db.or_(RelatedQuestion.question_id.in_(ids),
+                                            RelatedQuestion.related_id.in_(ids))).delete(**delete)
+        LSHBucket.query.filter(LSHBucket.question_id.in_(ids)).delete(**delete)
+        QuestionSignature.query.filter(QuestionSignature.question_id.in_(ids)).delete(**delete)
+        Assignment.query.filter(Assignment.question_id.in_(ids)).delete(**delete)
+        Feedback.query.filter(Feedback.question_id.in_(ids)).delete(**delete)
+        Response.query.filter(Response.question_id.in_(ids)).delete(**delete)
+        Question.query.filter(Question.id.in_(ids)).delete(**delete)
+
+        if affected:
+            Question.query.filter(Question.id.in_(affected))\
+                .update({Question.updated_at: now}, **delete)
+
+        db.session.commit()
+        return len(ids)
+
+    @staticmethod
+    def archive(after_days=None, batch_size=None, max_batches=None, now=None):
+        """
+        Archive every eligible question, batch_size at a time
+
+        Returns: number of questions archived
+        """
+        now = now or datetime.utcnow()
+        if after_days is None:
+            after_days = ArchiveManager._config('ARCHIVE_AFTER_DAYS', ArchiveManager.DEFAULT_AFTER_DAYS)
+        batch_size = batch_size or ArchiveManager._config('ARCHIVE_BATCH_SIZE',
+                                                          ArchiveManager.DEFAULT_BATCH_SIZE)
+        cutoff = now - timedelta(days=after_days)
+
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            ids = ArchiveManager.candidate_ids(cutoff, batch_size)
+            if not ids:
+                break
+            archived += ArchiveManager.archive_batch(ids, now)
+            batches += 1
+
+        return archived
+
+    # ---------- Read-through ----------
+
+    @staticmethod
+    def get_question(question_id):
+        """The hot Question, else its archived copy, else None"""
+        return db.session.get(Question, question_id) or db.session.get(ArchivedQuestion, question_id)
+
+    @staticmethod
+    def question_stamp(question_id):
+        """(updated_at, is_archived) for validators, without loading the row"""
+        stamp = db.session.query(Question.updated_at).filter_by(id=question_id).first()
+        if stamp is not None:
+            return stamp[0], False
+        stamp = db.session.query(ArchivedQuestion.updated_at).filter_by(id=question_id).first()
+        if stamp is not None:
+            return stamp[0], True
+        return None
+
+    @staticmethod
+    def answers_stamp(question_id, archived=False):
+        """
+        Digest of the answer rows shown on the question page
+
+        Responses and their mentors carry no updated_at, so the mentor's
+        name, role and company and each helpful_count are read in one
+        joined query and hashed into the page's ETag instead.
+        """
+        question_model, response_model = (ArchivedQuestion, ArchivedResponse) if archived \
+            else (Question, Response)
+        target_company, mentor_company = db.aliased(Company), db.aliased(Company)
+        rows = (db.session.query(target_company.name, response_model.id,
+                                 response_model.helpful_count, response_model.body_hash,
+                                 User.name, Alumni.current_role, mentor_company.name)
+                .select_from(question_model)
+                .outerjoin(target_company, target_company.id == question_model.company_id)
+                .outerjoin(response_model, response_model.question_id == question_model.id)
+                .outerjoin(Alumni, Alumni.id == response_model.mentor_id)
+                .outerjoin(User, User.id == Alumni.user_id)
+                .outerjoin(mentor_company, mentor_company.id == Alumni.current_company_id)
+                .filter(question_model.id == question_id)
+                .order_by(response_model.id)
+                .all())
+        raw = repr([tuple(row) for row in rows])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def version():
+        """Changes whenever a batch is archived (for knowledge base ETags)"""
+        return db.session.query(db.func.max(ArchivedQuestion.archived_at)).scalar()
+
+    @staticmethod
+    def knowledge_base_page(page, per_page, search=None):
+        """
+        Answered questions, hot ones first then archived, newest first in each
+
+        Returns: ReadThroughPage (items, page, pages, has_prev/next, prev/next_num)
+        """
+        hot = Question.query.filter_by(status='answered')
+        cold = ArchivedQuestion.query
+        if search:
+            hot = hot.filter(Question.title.contains(search) | Question.body.contains(search))
+            cold = cold.filter(ArchivedQuestion.title.contains(search) |
+                               ArchivedQuestion.body.contains(search))
+        hot = hot.order_by(Question.created_at.desc(), Question.id.desc())
+        cold = cold.order_by(ArchivedQuestion.created_at.desc(), ArchivedQuestion.id.desc())
+
+        page = max(page, 1)
+        offset = (page - 1) * per_page
+        hot_total = hot.order_by(None).count()
+
+        items = hot.offset(offset).limit(per_page).all() if offset < hot_total else []
+        if len(items) < per_page:
+            cold_offset = max(0, offset - hot_total)
+            items += cold.offset(cold_offset).limit(per_page - len(items)).all()
+        cold_total = cold.order_by(None).count()
+
+        return ReadThroughPage(items, page, per_page, hot_total + cold_total)
+
+    @staticmethod
+    def archived_question_count(student_id=None):
+        query = db.session.query(db.func.count(ArchivedQuestion.id))
+        if student_id is not None:
+            query = query.filter(ArchivedQuestion.student_id == student_id)
+        return query.scalar()
+
+    @staticmethod
+    def archived_answer_count(mentor_id):
+        return db.session.query(db.func.count(ArchivedResponse.id))\
+            .filter(ArchivedResponse.mentor_id == mentor_id).scalar()
+
+
+class ReadThroughPage:
+    """The slice of Flask-SQLAlchemy's Pagination the templates use"""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def pages(self):
+        return max(1, math.ceil(self.total / self.per_page)) if self.per_page else 1
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+
+@click.group('archive')
+def archive_cli():
+    """Hot/cold archival commands."""
+
+
+@archive_cli.command('run')
+@click.option('--days', type=int, default=None, help='Archive answered questions untouched this long.')
+@click.option('--batch-size', type=int, default=None, help='Questions moved per transaction.')
+def run_command(days, batch_size):
+    """Move old answered questions, responses and feedback to the archive."""
+    try:
+        archived = ArchiveManager.archive(after_days=days, batch_size=batch_size)
+    except ArchiveCollisionError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Archived {archived} questions')
+
+
+@archive_cli.command('stats')
+def stats_command():
+    """Show hot and archived row counts."""
+    for hot, cold in ARCHIVED_MODELS:
+        click.echo(f'{hot.__tablename__:<10} hot={hot.query.count():<8} archived={cold.query.count()}')
+
+
+def init_archive(app):
+    """Register the archive CLI commands"""
+    app.cli.add_command(archive_cli)
@@ -0,0 +1,158 @@
+"""
+Static Asset Pipeline for ASCEND
+Builds content-hashed, precompressed copies of the CSS/JS assets and serves
+them with far-future immutable caching
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+import click
+from flask import current_app, request, send_from_directory, abort
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+
+class AssetPipeline:
+    """Fingerprints static assets and maps logical names to hashed files"""
+
+    OUTPUT_DIR = 'dist'
+    MANIFEST = 'manifest.json'
+    EXTENSIONS = ('.css', '.js')
+    HASH_LENGTH = 10
+
+    # One year; hashed names change whenever the content does
+    MAX_AGE = 365 * 24 * 60 * 60
+
+    # Encodings in preference order: (Accept-Encoding token, file suffix)
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+    @staticmethod
+    def fingerprint(content):
+        return hashlib.sha256(content).hexdigest()[:AssetPipeline.HASH_LENGTH]
+
+    @staticmethod
+    def build(static_folder):
+        """
+        Write hashed, precompressed copies of every CSS/JS file
+
+        Output goes to <static>/dist/ together with manifest.json, which maps
+        'css/style.css' -> 'dist/css/style.<hash>.css'.
+
+        Returns: the manifest dict
+        """
+        out_root = os.path.join(static_folder, AssetPipeline.OUTPUT_DIR)
+        manifest = {}
+
+        for dirpath, dirnames, filenames in os.walk(static_folder):
+            if os.path.abspath(dirpath).startswith(os.path.abspath(out_root)):
+                continue
+            for filename in sorted(filenames):
+                if not filename.endswith(AssetPipeline.EXTENSIONS):
+                    continue
+
+                source = os.path.join(dirpath, filename)
+                logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    content = f.read()
+
+                stem, ext = os.path.splitext(logical)
+                hashed = f'{stem}.{AssetPipeline.fingerprint(content)}{ext}'
+                target = os.path.join(out_root, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                with open(target, 'wb') as f:
+                    f.write(content)
+                with open(target + '.gz', 'wb') as f:
+                    # mtime=0 keeps the .gz byte-identical across builds
+                    f.write(gzip.compress(content, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(target + '.br', 'wb') as f:
+                        f.write(brotli.compress(content, quality=11))
+
+                manifest[logical] = f'{AssetPipeline.OUTPUT_DIR}/{hashed}'
+
+        os.makedirs(out_root, exist_ok=True)
+        with open(os.path.join(out_root, AssetPipeline.MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        return manifest
+
+    @staticmethod
+    def load_manifest(static_folder):
+        path = os.path.join(static_folder, AssetPipeline.OUTPUT_DIR, AssetPipeline.MANIFEST)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def rewrite_static_urls(endpoint, values):
+    """url_defaults hook: url_for('static', filename=...) -> hashed file"""
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    manifest = current_app.extensions.get('asset_manifest') or {}
+    hashed = manifest.get(values['filename'])
+    if hashed:
+        values['filename'] = hashed
+
+
+def serve_hashed_asset(filename):
+    """Serve a fingerprinted asset, preferring a precompressed variant"""
+    directory = os.path.join(current_app.static_folder, AssetPipeline.OUTPUT_DIR)
+    if not filename.endswith(AssetPipeline.EXTENSIONS):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0]
+    encoding = None
+    path = filename
+    for token, suffix in AssetPipeline.ENCODINGS:
+        if request.accept_encodings.quality(token) > 0 and \
+                os.path.isfile(os.path.join(directory, filename + suffix)):
+            encoding = token
+            path = filename + suffix
+            break
+
+    response = send_from_directory(directory, path, mimetype=mimetype,
+                                   max_age=AssetPipeline.MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@click.group('assets')
+def assets_cli():
+    """Static asset pipeline commands."""
+
+
+@assets_cli.command('build')
+def build_command():
+    """Fingerprint and precompress CSS/JS into static/dist."""
+    manifest = AssetPipeline.build(current_app.static_folder)
+    current_app.extensions['asset_manifest'] = manifest
+    for logical, hashed in sorted(manifest.items()):
+        click.echo(f'{logical} -> {hashed}')
+    if brotli is None:
+        click.echo('brotli not installed: only gzip variants were written')
+
+
+def init_assets(app):
+    """Load the asset manifest and register the hashed-asset route"""
+    app.extensions['asset_manifest'] = AssetPipeline.load_manifest(app.static_folder)
+    app.url_defaults(rewrite_static_urls)
+    app.add_url_rule(
+        f'{app.static_url_path}/{AssetPipeline.OUTPUT_DIR}/<path:filename>',
+        endpoint='hashed_static',
+        view_func=serve_hashed_asset
+    )
+    app.cli.add_command(assets_cli)
@@ -0,0 +1,218 @@
+"""
+Cross-Worker Invalidation Bus for ASCEND
+Each gunicorn worker keeps in-memory state (fragment versions, the mentor
+map, the industry index, the mentor queue). Committed entity changes are
+appended to the change_log table in the same transaction, and every worker
+replays other workers' entries shortly afterwards, so caches stay warm in
+every process without going stale.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import ChangeLog, Alumni
+from app.fragment_cache import fragment_versions
+from app.matching import industry_index, mentor_map
+from app.queue_manager import global_queue
+from app import db
+
+
+# Tables whose changes other workers need to hear about
+BROADCAST_TABLES = frozenset({'user', 'alumni', 'company', 'question', 'response', 'feedback'})
+
+
+class ChangeBus:
+    """Publishes committed changes to change_log and replays other processes' entries"""
+
+    def __init__(self):
+        self._handlers = {}  # table ('*' = any) -> [handler(table, entity_ids)]
+        self._last_id = None  # None until the first poll in this process
+        self._seen = {}  # id -> created_at of entries applied inside the lag window
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+        self._origin = None
+        self._origin_pid = None
+
+    @property
+    def origin(self):
+        """host:pid:token, regenerated after a fork so workers never share one"""
+        pid = os.getpid()
+        if self._origin_pid != pid:
+            self._origin = f'{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}'[:80]
+            self._origin_pid = pid
+            self._last_id = None
+            self._seen = {}
+        return self._origin
+
+    def subscribe(self, table, handler):
+        self._handlers.setdefault(table, []).append(handler)
+
+    def reset(self):
+        self._last_id = None
+        self._seen = {}
+        self._last_poll = 0.0
+
+    # ---------- Publishing ----------
+
+    def publish(self, session):
+        """before_commit: append the transaction's changes to change_log"""
+        # Flush now so the change set is complete; commit's own flush is then a no-op
+        session.flush()
+        changes = {(table, entity_id) for table, entity_id in session.info.get('fragment_changes', ())
+                   if table in BROADCAST_TABLES}
+        if not changes:
+            return
+        now = datetime.utcnow()
+        session.execute(ChangeLog.__table__.insert(), [
+            {'origin': self.origin, 'table_name': table, 'entity_id': entity_id, 'created_at': now}
+            for table, entity_id in sorted(changes, key=lambda c: (c[0], c[1] or 0))
+        ])
+
+    # ---------- Replaying ----------
+
+    def poll(self, force=False):
+        """
+        Apply change_log entries written by other processes since the last poll
+
+        Throttled to once per CHANGE_BUS_POLL_SECONDS; concurrent callers in the
+        same process skip rather than wait.
+
+        Ids are allocated before commit, so on PostgreSQL a lower id can
+        become visible after a higher one. Besides everything above the
+        high-water mark, each poll re-reads entries from the last
+        CHANGE_BUS_LAG_SECONDS and skips the ids it already applied.
+
+        Returns: number of entries applied
+        """
+        interval = current_app.config.get('CHANGE_BUS_POLL_SECONDS', 1.0)
+        now = time.monotonic()
+        if not force and now - self._last_poll < interval:
+            return 0
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            self._last_poll = now
+            origin = self.origin
+            cutoff = datetime.utcnow() - timedelta(
+                seconds=current_app.config.get('CHANGE_BUS_LAG_SECONDS', 30))
+            query = db.session.query(ChangeLog.id, ChangeLog.origin, ChangeLog.table_name,
+                                     ChangeLog.entity_id, ChangeLog.created_at)
+            if self._last_id is None:
+                # Nothing is cached yet in a fresh process; start from the tip
+                self._last_id = db.session.query(db.func.max(ChangeLog.id)).scalar() or 0
+                self._seen = {row.id: row.created_at
+                              for row in query.filter(ChangeLog.created_at >= cutoff)}
+                return 0
+
+            rows = query.filter(db.or_(ChangeLog.id > self._last_id, ChangeLog.created_at >= cutoff))\
+                .order_by(ChangeLog.id).all()
+            rows = [row for row in rows if row.id not in self._seen]
+            self._seen = {entry_id: at for entry_id, at in self._seen.items() if at >= cutoff}
+            if not rows:
+                return 0
+            self._last_id = max(self._last_id, rows[-1].id)
+
+            changed = {}
+            for row in rows:
+                if row.created_at >= cutoff:
+                    self._seen[row.id] = row.created_at
+                if row.origin != origin:
+                    changed.setdefault(row.table_name, set()).add(row.entity_id)
+            for table, entity_ids in changed.items():
+                for handler in self._handlers.get(table, []) + self._handlers.get('*', []):
+                    handler(table, entity_ids)
+            return sum(len(ids) for ids in changed.values())
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def prune(retention_hours=None, now=None):
+        """Delete change_log entries older than the retention window"""
+        if retention_hours is None:
+            retention_hours = current_app.config.get('CHANGE_LOG_RETENTION_HOURS', 24)
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=retention_hours)
+        deleted = ChangeLog.query.filter(ChangeLog.created_at < cutoff)\
+            .delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+# Global bus instance (one per process)
+change_bus = ChangeBus()
+
+
+# ---------- Handlers for the in-memory structures ----------
+
+def bump_fragments(table, entity_ids):
+    for entity_id in entity_ids:
+        fragment_versions.bump(table, entity_id)
+
+
+def refresh_mentors(table, entity_ids):
+    mentor_map.refresh()
+    for alumni_id in entity_ids:
+        alumni = db.session.get(Alumni, alumni_id)
+        if alumni is None:
+            industry_index.remove_mentor(alumni_id)
+        else:
+            industry_index.update_mentor(alumni)
+
+
+def refresh_companies(table, entity_ids):
+    mentor_map.refresh()
+    industry_index.refresh()
+
+
+def refresh_queue(table, entity_ids):
+    global_queue.refresh_questions(entity_ids)
+
+
+def poll_changes():
+    """before_request: replay other workers' changes"""
+    try:
+        change_bus.poll()
+    except SQLAlchemyError:
+        # A locked or missing change_log must not fail the page; the next
+        # poll (CHANGE_BUS_POLL_SECONDS later) tries again
+        db.session.rollback()
+        current_app.logger.warning('Change bus poll failed, skipped', exc_info=True)
+
+
+@click.group('changes')
+def changes_cli():
+    """Cross-worker change log commands."""
+
+
+@changes_cli.command('prune')
+@click.option('--hours', type=int, default=None, help='Keep entries newer than this.')
+def prune_command(hours):
+    """Delete old change_log entries."""
+    deleted = ChangeBus.prune(hours)
+    click.echo(f'Pruned {deleted} change log entries')
+
+
+_registered = False
+
+
+def init_change_bus(app):
+    """Register the publish hook, the replay handlers, the poll and CLI commands"""
+    global _registered
+    if not _registered:
+        event.listen(Session, 'before_commit', change_bus.publish)
+        change_bus.subscribe('*', bump_fragments)
+        change_bus.subscribe('alumni', refresh_mentors)
+        change_bus.subscribe('company', refresh_companies)
+        change_bus.subscribe('question', refresh_queue)
+        _registered = True
+    app.before_request(poll_changes)
+    app.cli.add_command(changes_cli)
@@ -0,0 +1,80 @@
+"""
+Database Engine Profiles for ASCEND
+Applies the SQLite pragmas or PostgreSQL pool settings from Config
+to the engine that matches the configured database URL
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def engine_profile(database_uri):
+    """Return 'sqlite', 'postgres' or 'default' for a database URL"""
+    backend = make_url(database_uri).get_backend_name()
+    if backend == 'sqlite':
+        return 'sqlite'
+    if backend in ('postgresql', 'postgres'):
+        return 'postgres'
+    return 'default'
+
+
+def configure_engine_options(app):
+    """
+    Merge the profile's create_engine options into SQLALCHEMY_ENGINE_OPTIONS
+
+    Must run before db.init_app, which creates the engine.
+    """
+    profile = engine_profile(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config['DATABASE_PROFILE'] = profile
+
+    if profile == 'postgres':
+        options = dict(app.config.get('POSTGRES_ENGINE_OPTIONS') or {})
+        options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    return profile
+
+
+def sqlite_pragma_listener(pragmas):
+    """Build a 'connect' listener that runs the given pragmas"""
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas.items()]
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    return set_sqlite_pragmas
+
+
+def register_engine_events(app, db):
+    """Attach the SQLite pragma listener once the engine exists"""
+    if app.config.get('DATABASE_PROFILE') != 'sqlite':
+        return
+
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', sqlite_pragma_listener(pragmas))
+
+
+def dialect_insert(session):
+    """
+    The dialect insert() that supports ON CONFLICT for the session's database
+
+    Returns: sqlalchemy.dialects.<sqlite|postgresql>.insert, or None when
+    the backend has no upsert and callers must fall back to the ORM
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    return None
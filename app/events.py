@@ -0,0 +1,175 @@
+"""
+Live Event Bus for ASCEND
+In-process publish/subscribe for queue and dashboard updates. Events are
+collected from ORM flushes and published only after the transaction
+commits, then streamed to browsers as server-sent events.
+"""
+
+import itertools
+import json
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models import Question
+
+
+class Subscription:
+    """One listener's mailbox; bounded so a stalled client cannot grow memory"""
+
+    MAX_PENDING = 100
+
+    def __init__(self, bus, topics):
+        self.bus = bus
+        self.topics = frozenset(topics)
+        self.queue = queue.Queue(maxsize=self.MAX_PENDING)
+
+    def get(self, timeout=None):
+        """Next event, or None after timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Thread-safe topic-based pub/sub within one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # topic -> set of Subscription
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topics):
+        subscription = Subscription(self, topics)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def publish(self, topics, event_type, data):
+        """
+        Deliver an event to every subscriber of any of the topics (once each)
+
+        Returns: number of subscribers reached
+        """
+        payload = {'id': next(self._ids), 'type': event_type, 'data': data}
+        with self._lock:
+            targets = set()
+            for topic in topics:
+                targets.update(self._subscribers.get(topic, ()))
+
+        delivered = 0
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(payload)
+                delivered += 1
+            except queue.Full:
+                # Slow consumer: drop rather than block the committing request
+                pass
+        return delivered
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._subscribers.values())) if self._subscribers else 0
+
+
+# Global event bus instance
+event_bus = EventBus()
+
+
+def company_topic(company_id):
+    return f'company:{company_id}'
+
+
+def mentor_topic(mentor_id):
+    return f'mentor:{mentor_id}'
+
+
+ALL_QUESTIONS_TOPIC = 'questions'
+
+
+def _question_summary(question):
+    return {
+        'id': question.id,
+        'title': question.title,
+        'body': (question.body or '')[:200],
+        'category': question.category,
+        'urgency': question.urgency,
+        'company_id': question.company_id,
+        'created_at': (question.created_at or datetime.utcnow()).isoformat(),
+    }
+
+
+def collect_events(session, flush_context):
+    """after_flush: turn new/changed rows into pending events"""
+    pending = session.info.setdefault('pending_events', [])
+
+    for obj in session.new:
+        if isinstance(obj, Question) and (obj.status or 'pending') == 'pending':
+            pending.append((
+                (company_topic(obj.company_id), ALL_QUESTIONS_TOPIC),
+                'question.new',
+                _question_summary(obj)
+            ))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Question):
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.deleted and 'pending' in history.deleted and obj.status != 'pending':
+            pending.append((
+                (company_topic(obj.company_id), ALL_QUESTIONS_TOPIC),
+                'question.taken',
+                {'question_id': obj.id, 'company_id': obj.company_id, 'status': obj.status}
+            ))
+
+
+def queue_event(session, topics, event_type, data):
+    """Queue an event for changes the flush hook cannot see (Core upserts like feedback)"""
+    session.info.setdefault('pending_events', []).append((tuple(topics), event_type, data))
+
+
+def publish_events(session):
+    """after_commit: publish what the committed transaction produced"""
+    for topics, event_type, data in session.info.pop('pending_events', []):
+        event_bus.publish(topics, event_type, data)
+
+
+def discard_events(session):
+    """after_rollback: the changes never happened"""
+    session.info.pop('pending_events', None)
+
+
+def format_sse(payload):
+    """Encode an event for a text/event-stream response"""
+    return f"id: {payload['id']}\nevent: {payload['type']}\ndata: {json.dumps(payload['data'])}\n\n"
+
+
+_registered = False
+
+
+def init_events():
+    """Register the session hooks once per process"""
+    global _registered
+    if _registered:
+        return
+    event.listen(Session, 'after_flush', collect_events)
+    event.listen(Session, 'after_commit', publish_events)
+    event.listen(Session, 'after_rollback', discard_events)
+    _registered = True
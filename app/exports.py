@@ -0,0 +1,210 @@
+"""
+Data Export for ASCEND
+Streams questions, responses, feedback and referrals as CSV or JSON Lines.
+Rows come from the column-projection builders in app.queries (related names
+joined in SQL) and are fetched yield_per chunks at a time, so memory stays
+flat however large the table is. Archived questions, responses and feedback
+follow the hot rows, flagged archived=true. Used by the admin download
+routes and the `flask export` command.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+
+import click
+from flask import current_app
+
+from app.models import (
+    Question, Response, Feedback, Referral, ArchivedQuestion, ArchivedResponse, ArchivedFeedback
+)
+from app.queries import (
+    QUESTION_FIELDS, RESPONSE_FIELDS, FEEDBACK_FIELDS, REFERRAL_FIELDS,
+    question_rows, response_rows, feedback_rows, referral_rows,
+    archived_question_rows, archived_response_rows, archived_feedback_rows
+)
+from app import db
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+
+def _csv_value(value):
+    """A CSV cell; user-written text that would run as a formula is quoted with '"""
+    if value is None:
+        return ''
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class ExportManager:
+    """Export kinds, filters and the CSV / JSONL writers"""
+
+    # kind -> (fields, sources); each source is
+    # (rows builder, archived, id column, date column, company column)
+    KINDS = {
+        'questions': (list(QUESTION_FIELDS), (
+            (question_rows, False, lambda: Question.id,
+             lambda: Question.created_at, lambda: Question.company_id),
+            (archived_question_rows, True, lambda: ArchivedQuestion.id,
+             lambda: ArchivedQuestion.created_at, lambda: ArchivedQuestion.company_id),
+        )),
+        'responses': (list(RESPONSE_FIELDS), (
+            (response_rows, False, lambda: Response.id,
+             lambda: Response.created_at, lambda: Question.company_id),
+            (archived_response_rows, True, lambda: ArchivedResponse.id,
+             lambda: ArchivedResponse.created_at, lambda: ArchivedQuestion.company_id),
+        )),
+        'feedback': (list(FEEDBACK_FIELDS), (
+            (feedback_rows, False, lambda: Feedback.id,
+             lambda: Feedback.created_at, lambda: Question.company_id),
+            (archived_feedback_rows, True, lambda: ArchivedFeedback.id,
+             lambda: ArchivedFeedback.created_at, lambda: ArchivedQuestion.company_id),
+        )),
+        # Referrals are never archived
+        'referrals': (list(REFERRAL_FIELDS), (
+            (referral_rows, False, lambda: Referral.id,
+             lambda: Referral.requested_at, lambda: Referral.company_id),
+        )),
+    }
+    FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+    DEFAULT_CHUNK_ROWS = 1000
+
+    @staticmethod
+    def parse_filters(params):
+        """
+        from / to (YYYY-MM-DD, inclusive) and company_id from request args
+
+        Raises: ValueError with a message fit for the user
+        """
+        filters = {}
+        for key, name in (('from', 'date_from'), ('to', 'date_to')):
+            raw = params.get(key)
+            if raw:
+                try:
+                    filters[name] = date.fromisoformat(raw)
+                except ValueError:
+                    raise ValueError(f'{key} must be a YYYY-MM-DD date')
+        raw = params.get('company_id')
+        if raw:
+            try:
+                filters['company_id'] = int(raw)
+            except ValueError:
+                raise ValueError('company_id must be an integer')
+        return filters
+
+    @staticmethod
+    def fields(kind):
+        return ExportManager.KINDS[kind][0] + ['archived']
+
+    @staticmethod
+    def queries(kind, date_from=None, date_to=None, company_id=None):
+        """One filtered query per source (hot table, then archive), each ordered by id"""
+        if kind not in ExportManager.KINDS:
+            raise ValueError(f'Unknown export: {kind}')
+        fields, sources = ExportManager.KINDS[kind]
+
+        queries = []
+        for builder, archived, id_column, date_column, company_column in sources:
+            filters = []
+            if date_from is not None:
+                filters.append(date_column() >= datetime.combine(date_from, time.min))
+            if date_to is not None:
+                filters.append(date_column() < datetime.combine(date_to + timedelta(days=1), time.min))
+            if company_id is not None:
+                filters.append(company_column() == company_id)
+            queries.append(builder(fields, *filters)
+                           .add_columns(db.literal(archived).label('archived'))
+                           .order_by(id_column()))
+        return queries
+
+    @staticmethod
+    def stream(kind, fmt, chunk_rows=None, **filters):
+        """
+        Export as an iterator of text chunks of about chunk_rows rows each
+
+        Arguments are validated here, before the first chunk is requested,
+        so bad input fails the request instead of a half-sent download.
+        """
+        if fmt not in ExportManager.FORMATS:
+            raise ValueError(f'Unknown format: {fmt}')
+        chunk_rows = chunk_rows or current_app.config.get('EXPORT_CHUNK_ROWS',
+                                                          ExportManager.DEFAULT_CHUNK_ROWS)
+        queries = ExportManager.queries(kind, **filters)
+        writer = ExportManager._csv_chunks if fmt == 'csv' else ExportManager._jsonl_chunks
+        return writer(queries, ExportManager.fields(kind), chunk_rows)
+
+    @staticmethod
+    def _rows(queries, chunk_rows):
+        # yield_per streams each cursor in batches instead of buffering every row
+        for query in queries:
+            yield from query.yield_per(chunk_rows)
+
+    @staticmethod
+    def _csv_chunks(queries, fields, chunk_rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        pending = 0
+        for row in ExportManager._rows(queries, chunk_rows):
+            writer.writerow([_csv_value(value) for value in row])
+            pending += 1
+            if pending >= chunk_rows:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def _jsonl_chunks(queries, fields, chunk_rows):
+        lines = []
+        for row in ExportManager._rows(queries, chunk_rows):
+            lines.append(json.dumps({f: _plain(v) for f, v in zip(fields, row)}) + '\n')
+            if len(lines) >= chunk_rows:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+
+
+@click.command('export')
+@click.argument('kind', type=click.Choice(list(ExportManager.KINDS)))
+@click.option('--format', 'fmt', type=click.Choice(list(ExportManager.FORMATS)), default='csv')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), default=None,
+              help='First day to include (YYYY-MM-DD).')
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), default=None,
+              help='Last day to include (YYYY-MM-DD).')
+@click.option('--company-id', type=int, default=None)
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default='-',
+              help='File to write (default: stdout).')
+def export_command(kind, fmt, date_from, date_to, company_id, output):
+    """Stream questions, responses, feedback or referrals to a CSV or JSONL file."""
+    chunks = ExportManager.stream(kind, fmt,
+                                  date_from=date_from.date() if date_from else None,
+                                  date_to=date_to.date() if date_to else None,
+                                  company_id=company_id)
+    if output == '-':
+        for chunk in chunks:
+            click.echo(chunk, nl=False)
+        return
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    click.echo(f'Exported {kind} to {output}', err=True)
+
+
+def init_exports(app):
+    """Register the export CLI command"""
+    app.cli.add_command(export_command)
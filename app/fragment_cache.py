@@ -0,0 +1,184 @@
+"""
+Template Fragment Cache for ASCEND
+A {% cache %} Jinja tag that stores rendered fragments in the app's cache
+store, keyed by the entities they show. Committing a change to an entity
+bumps its version, so its fragments are simply never looked up again.
+
+    {% cache 'kb_card', question %} ... {% endcache %}
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+
+class MemoryCache:
+    """Thread-safe LRU store with per-entry expiry (the app's cache store)"""
+
+    def __init__(self, max_entries=2000, default_timeout=300):
+        self.max_entries = max_entries
+        self.default_timeout = default_timeout
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.default_timeout if timeout is None else timeout
+        expires_at = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class FragmentVersions:
+    """
+    Per-entity version counters
+
+    Kept apart from the LRU store: if a version were evicted it would reset
+    and could match an old fragment again.
+    """
+
+    def __init__(self):
+        self._versions = {}  # (table, id) -> int
+        self._lock = threading.Lock()
+
+    def get(self, table, entity_id):
+        return self._versions.get((table, entity_id), 0)
+
+    def bump(self, table, entity_id):
+        with self._lock:
+            key = (table, entity_id)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def key_part(self, part):
+        """Cache-key text for one {% cache %} argument"""
+        if hasattr(part, '_get_current_object'):  # LocalProxy such as current_user
+            part = part._get_current_object()
+        table = getattr(part, '__table__', None)
+        if table is None:
+            return repr(part)
+        table = table.name
+
+        entity_id = inspect(part).identity
+        entity_id = entity_id[0] if entity_id else None
+        stamp = getattr(part, 'updated_at', None)
+        return f'{table}:{entity_id}:{stamp.isoformat() if stamp else ""}:{self.get(table, entity_id)}'
+
+
+# Global version table (one per process)
+fragment_versions = FragmentVersions()
+
+
+# Changing a child also changes cards that show it through its parent
+PARENT_KEYS = {
+    'response': (('question', 'question_id'),),
+    'feedback': (('response', 'response_id'), ('question', 'question_id')),
+}
+
+
+def queue_invalidation(session, table, entity_id):
+    """Invalidate an entity on commit for changes made with Core statements"""
+    session.info.setdefault('fragment_changes', set()).add((table, entity_id))
+
+
+def collect_changes(session, flush_context):
+    """after_flush: remember which entities (and parents) changed"""
+    changes = session.info.setdefault('fragment_changes', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__table__', None)
+        if table is None:
+            continue
+        table = table.name
+        changes.add((table, getattr(obj, 'id', None)))
+        for parent_table, column in PARENT_KEYS.get(table, ()):
+            parent_id = getattr(obj, column, None)
+            if parent_id is not None:
+                changes.add((parent_table, parent_id))
+
+
+def bump_versions(session):
+    """after_commit: the changes are real, retire their fragments"""
+    for table, entity_id in session.info.pop('fragment_changes', ()):
+        fragment_versions.bump(table, entity_id)
+
+
+def discard_changes(session):
+    session.info.pop('fragment_changes', None)
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache name, part, ... %}body{% endcache %}"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_cached_fragment', [nodes.List(parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _cached_fragment(self, parts, caller):
+        config = current_app.config
+        store = current_app.extensions.get('cache')
+        if store is None or not config.get('FRAGMENT_CACHE_ENABLED', True):
+            return caller()
+
+        key = 'fragment:' + '|'.join(fragment_versions.key_part(part) for part in parts)
+        html = store.get(key)
+        if html is None:
+            html = caller()
+            store.set(key, str(html), config.get('FRAGMENT_CACHE_TIMEOUT'))
+        return Markup(html)
+
+
+_registered = False
+
+
+def init_fragment_cache(app):
+    """Create the cache store, add the {% cache %} tag and register the session hooks once"""
+    global _registered
+    app.extensions['cache'] = MemoryCache(
+        max_entries=app.config.get('CACHE_MAX_ENTRIES', 2000),
+        default_timeout=app.config.get('FRAGMENT_CACHE_TIMEOUT', 300)
+    )
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if not _registered:
+        event.listen(Session, 'after_flush', collect_changes)
+        event.listen(Session, 'after_commit', bump_versions)
+        event.listen(Session, 'after_rollback', discard_changes)
+        _registered = True
@@ -0,0 +1,77 @@
+"""
+HTTP Conditional GET helpers for ASCEND
+Builds ETag / Last-Modified validators from cheap version stamps and
+answers 304 Not Modified before a view runs its heavy queries
+"""
+
+import hashlib
+from datetime import timezone
+
+from flask import current_app, request, session, make_response, g
+
+
+def make_etag(*parts):
+    """Strong ETag from version parts (plus ETAG_SALT, bumped on template changes)"""
+    salt = current_app.config.get('ETAG_SALT', '')
+    raw = '|'.join(str(p) for p in (salt,) + parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def _as_utc(dt):
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.replace(microsecond=0)
+
+
+def _has_pending_flashes():
+    # A page carrying flash messages must be rendered and never cached.
+    # Rendering pops the flashes, so the answer is remembered for with_validators.
+    if 'has_pending_flashes' not in g:
+        g.has_pending_flashes = bool(session.get('_flashes'))
+    return g.has_pending_flashes
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response if the client's cached copy is still current
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+
+    Returns: Response or None
+    """
+    if _has_pending_flashes():
+        return None
+
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif last_modified is not None and request.if_modified_since:
+        matched = _as_utc(last_modified) <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+
+    response = current_app.response_class(status=304)
+    return _set_validators(response, etag, last_modified)
+
+
+def with_validators(rv, etag, last_modified=None):
+    """Attach ETag / Last-Modified to a rendered view result"""
+    response = make_response(rv)
+    if _has_pending_flashes() or response.status_code != 200:
+        return response
+
+    return _set_validators(response, etag, last_modified)
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    # Pages are per-user; browsers may keep them but must revalidate
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
@@ -0,0 +1,280 @@
+"""
+Knowledge Base Ingestion for ASCEND
+Seeds the knowledge base from placement-prep PDFs. Pages are extracted in a
+process pool and grouped into text chunks; once a document is fully
+extracted its entries are written and indexed for related questions in
+short transactions, a batch at a time, so web requests never wait long for
+the database. Files that were ingested before are skipped by content hash.
+"""
+
+import os
+import time
+from collections import deque
+
+import click
+
+from app.models import Question, IngestedDocument
+from app.pdf import inspect_task, extract_task, new_process_pool
+from app.related_questions import RelatedQuestionIndex
+from app import db
+
+
+class TextChunker:
+    """Groups page texts into chunks of at most max_chars, remembering their page span"""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self._parts = []
+        self._length = 0
+        self._first_page = None
+        self._last_page = None
+
+    def feed(self, page_number, text):
+        """Add one page; yields (first_page, last_page, text) for every completed chunk"""
+        text = text.strip()
+        while text:
+            room = self.max_chars - self._length
+            if self._parts and len(text) > room:
+                yield self._emit()
+                continue
+            if len(text) > self.max_chars:
+                # One page longer than a chunk: cut at the last whitespace that fits
+                cut = text.rfind(' ', 0, self.max_chars)
+                cut = cut if cut > 0 else self.max_chars
+                piece, text = text[:cut], text[cut:].strip()
+            else:
+                piece, text = text, ''
+            self._add(page_number, piece)
+
+    def finish(self):
+        if self._parts:
+            yield self._emit()
+
+    def _add(self, page_number, piece):
+        if self._first_page is None:
+            self._first_page = page_number
+        self._last_page = page_number
+        self._parts.append(piece)
+        self._length += len(piece) + 2
+
+    def _emit(self):
+        chunk = (self._first_page, self._last_page, '\n\n'.join(self._parts))
+        self._parts, self._length = [], 0
+        self._first_page = self._last_page = None
+        return chunk
+
+
+def bounded_map(pool, fn, items, window):
+    """Ordered pool.map that keeps at most `window` tasks in flight, so results never pile up"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class KnowledgeIngestor:
+    """PDF files -> knowledge base entries"""
+
+    CATEGORY = 'Prep Material'
+    # Status of entries written but not yet published (not listed anywhere)
+    IMPORTING = 'importing'
+    CHUNK_CHARS = 3000
+    PAGES_PER_TASK = 8
+    DEFAULT_BATCH_SIZE = 50
+
+    @staticmethod
+    def find_pdfs(paths):
+        """Expand directories (recursively) into a sorted list of .pdf files"""
+        found = []
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    found.extend(os.path.join(root, name) for name in names
+                                 if name.lower().endswith('.pdf'))
+            else:
+                found.append(path)
+        return sorted(found)
+
+    @staticmethod
+    def entry_title(path, first_page, last_page):
+        name = os.path.splitext(os.path.basename(path))[0].replace('_', ' ').replace('-', ' ')
+        pages = f'p. {first_page}' if first_page == last_page else f'pp. {first_page}-{last_page}'
+        suffix = f' ({pages})'
+        return name[:200 - len(suffix)] + suffix
+
+    @staticmethod
+    def _entry(document_id, path, first_page, last_page, text):
+        return Question(title=KnowledgeIngestor.entry_title(path, first_page, last_page),
+                        body=text, category=KnowledgeIngestor.CATEGORY,
+                        status=KnowledgeIngestor.IMPORTING, document_id=document_id)
+
+    @staticmethod
+    def _index(document_id, batch_size):
+        """Index a published document's entries batch_size per transaction, then mark it complete"""
+        ids = [row.id for row in db.session.query(Question.id)
+               .filter_by(document_id=document_id).order_by(Question.id)]
+        for start in range(0, len(ids), batch_size):
+            for question in Question.query.filter(Question.id.in_(ids[start:start + batch_size])):
+                RelatedQuestionIndex.add_question(question, commit=False)
+            db.session.commit()
+        IngestedDocument.query.filter_by(id=document_id).update({IngestedDocument.state: 'complete'})
+        db.session.commit()
+
+    @staticmethod
+    def store(path, digest, pages, chunks, batch_size):
+        """
+        Write one fully extracted document in short transactions
+
+        The IngestedDocument row is committed first in state 'writing'.
+        Entries follow batch_size per transaction with status 'importing',
+        which no page lists; one UPDATE then publishes them all as answered
+        (state 'indexing'), and they are indexed a batch at a time before
+        the state becomes 'complete'. recover() deals with a run that died
+        part way.
+
+        Returns: number of entries
+        """
+        document = IngestedDocument(sha256=digest, filename=os.path.basename(path)[:255],
+                                    page_count=pages, entry_count=len(chunks), state='writing')
+        db.session.add(document)
+        db.session.commit()
+        document_id = document.id
+
+        for start in range(0, len(chunks), batch_size):
+            db.session.add_all(KnowledgeIngestor._entry(document_id, path, first, last, text)
+                               for first, last, text in chunks[start:start + batch_size])
+            db.session.commit()
+
+        Question.query.filter_by(document_id=document_id, status=KnowledgeIngestor.IMPORTING)\
+            .update({Question.status: 'answered'}, synchronize_session=False)
+        IngestedDocument.query.filter_by(id=document_id).update({IngestedDocument.state: 'indexing'})
+        db.session.commit()
+
+        KnowledgeIngestor._index(document_id, batch_size)
+        return len(chunks)
+
+    @staticmethod
+    def recover(batch_size=None):
+        """
+        Finish or undo documents an interrupted run left behind
+
+        Documents still 'writing' lose their hidden entries and are ingested
+        again; 'indexing' ones are published already and only need indexing.
+        Don't run two ingests against one database at once.
+
+        Returns: number of documents recovered
+        """
+        batch_size = batch_size or KnowledgeIngestor.DEFAULT_BATCH_SIZE
+        unfinished = IngestedDocument.query.filter(IngestedDocument.state != 'complete').all()
+        for document in unfinished:
+            if document.state == 'indexing':
+                KnowledgeIngestor._index(document.id, batch_size)
+                continue
+            Question.query.filter_by(document_id=document.id).delete(synchronize_session=False)
+            db.session.delete(document)
+            db.session.commit()
+        return len(unfinished)
+
+    @staticmethod
+    def ingest(paths, workers=None, batch_size=None, chunk_chars=None):
+        """
+        Ingest every PDF under paths
+
+        Hashing and text extraction run in a pool of `workers` processes
+        (0 = in this process). Results stream back in order; each document
+        is extracted completely before store() writes it batch_size entries
+        per transaction, so no write lock is held while pages are extracted
+        and a failed file writes nothing.
+
+        Returns: dict with documents, skipped, failed, pages, entries,
+        seconds and pages_per_second
+        """
+        batch_size = batch_size or KnowledgeIngestor.DEFAULT_BATCH_SIZE
+        chunk_chars = chunk_chars or KnowledgeIngestor.CHUNK_CHARS
+        if workers is None:
+            workers = os.cpu_count() or 1
+        stats = {'documents': 0, 'skipped': 0, 'failed': [], 'pages': 0, 'entries': 0}
+        started = time.perf_counter()
+        KnowledgeIngestor.recover(batch_size)
+
+        files = KnowledgeIngestor.find_pdfs(paths)
+        pool = new_process_pool(workers) if workers and files else None
+        run = pool.map if pool else map
+        try:
+            # Hash and count pages of every file; skip the ones already ingested
+            todo, seen = [], set()
+            inspected = list(run(inspect_task, files))
+            hashes = [digest for _, digest, _, _ in inspected if digest]
+            known = {row.sha256 for row in db.session.query(IngestedDocument.sha256)
+                     .filter(IngestedDocument.sha256.in_(hashes))} if hashes else set()
+            db.session.commit()  # end the read before the long extraction
+            for path, digest, pages, error in inspected:
+                if error:
+                    stats['failed'].append((path, error))
+                elif digest in known or digest in seen:
+                    stats['skipped'] += 1
+                else:
+                    seen.add(digest)
+                    todo.append((path, digest, pages))
+
+            tasks = [(path, start, min(start + KnowledgeIngestor.PAGES_PER_TASK, pages))
+                     for path, _, pages in todo
+                     for start in range(0, pages, KnowledgeIngestor.PAGES_PER_TASK)]
+            if pool:
+                results = bounded_map(pool, extract_task, tasks, window=workers * 4)
+            else:
+                results = map(extract_task, tasks)
+
+            for path, digest, pages in todo:
+                chunker = TextChunker(chunk_chars)
+                chunks, error = [], None
+                for start in range(0, pages, KnowledgeIngestor.PAGES_PER_TASK):
+                    page_texts, task_error = next(results)
+                    if error or task_error:
+                        error = error or task_error
+                        continue  # drain this document's remaining ranges
+                    stats['pages'] += len(page_texts)
+                    for page_number, text in page_texts:
+                        chunks.extend(chunker.feed(page_number, text))
+
+                if error:
+                    stats['failed'].append((path, error))
+                    continue
+
+                chunks.extend(chunker.finish())
+                stats['entries'] += KnowledgeIngestor.store(path, digest, pages, chunks, batch_size)
+                stats['documents'] += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['pages_per_second'] = stats['pages'] / stats['seconds'] if stats['seconds'] else 0.0
+        return stats
+
+
+@click.group('kb')
+def kb_cli():
+    """Knowledge base commands."""
+
+
+@kb_cli.command('ingest')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--workers', type=int, default=None, help='Extraction processes (default: CPU count, 0 = inline).')
+@click.option('--batch-size', type=int, default=None, help='Entries written per transaction.')
+def ingest_command(paths, workers, batch_size):
+    """Add the text of PDF files (or directories of them) to the knowledge base."""
+    stats = KnowledgeIngestor.ingest(paths, workers=workers, batch_size=batch_size)
+    for path, error in stats['failed']:
+        click.echo(f'Failed: {path}: {error}', err=True)
+    click.echo(f"Ingested {stats['documents']} documents ({stats['pages']} pages, "
+               f"{stats['entries']} entries); skipped {stats['skipped']} already ingested; "
+               f"{stats['pages_per_second']:.1f} pages/sec")
+
+
+def init_ingest(app):
+    """Register the knowledge base CLI commands"""
+    app.cli.add_command(kb_cli)
@@ -3,6 +3,8 @@ Mentor Matching Algorithm for ASCEND
 Intelligently matches students' questions with the best available mentors
 """
 
+import bisect
+
 from app.models import Alumni, Question, Company, Response
 from app import db
 
@@ -79,8 +81,8 @@ class MentorMatcher:
         """
         score = 100
         
-        # Load balancing - penalize mentors with many pending questions
-        pending_count = MentorMatcher.get_pending_count(mentor.id)
+        # Load balancing - penalize mentors with many open assignments
+        pending_count = mentor.open_assignments or 0
         score -= (pending_count * 5)
         
         # Trust score bonus
@@ -95,18 +97,9 @@ class MentorMatcher:
     
     @staticmethod
     def get_pending_count(mentor_id):
-        """Get count of questions currently pending for this mentor"""
-        # Count questions in mentor's company that are pending
-        mentor = Alumni.query.get(mentor_id)
-        if not mentor:
-            return 0
-        
-        pending = Question.query.filter_by(
-            company_id=mentor.current_company_id,
-            status='pending'
-        ).count()
-        
-        return pending
+        """Get count of questions currently assigned to this mentor"""
+        return db.session.query(Alumni.open_assignments)\
+            .filter_by(id=mentor_id).scalar() or 0
     
     @staticmethod
     def calculate_response_rate(mentor_id):
@@ -129,31 +122,24 @@ class MentorMatcher:
         1. Find mentors in same industry
         2. Find any available verified mentor
         3. Return None if no mentors available
+        
+        Both lookups are served from the in-memory industry_index.
         """
-        company = Company.query.get(question.company_id)
+        industry = industry_index.get_company_industry(question.company_id)
         
-        if company and company.industry:
-            # Try to find mentors in same industry
-            industry_companies = Company.query.filter_by(
-                industry=company.industry
-            ).all()
-            
-            for comp in industry_companies:
-                if comp.id == company.id:
-                    continue
-                
-                mentors = MentorMatcher.get_available_mentors(comp.id)
-                if mentors:
-                    # Return mentor with highest trust score
-                    return max(mentors, key=lambda m: m.trust_score)
-        
-        # Last resort: any available mentor
-        any_mentor = Alumni.query.filter_by(
-            is_verified=True,
-            is_accepting_questions=True
-        ).order_by(Alumni.trust_score.desc()).first()
+        mentor_id = None
+        if industry:
+            # Best mentor in the same industry, at another company
+            mentor_id = industry_index.best_mentor_id(
+                industry,
+                exclude_company_id=question.company_id
+            )
+        
+        if mentor_id is None:
+            # Last resort: any available mentor
+            mentor_id = industry_index.best_mentor_id()
         
-        return any_mentor
+        return db.session.get(Alumni, mentor_id) if mentor_id else None
     
     @staticmethod
     def get_mentor_recommendations(student_id, limit=5):
@@ -202,11 +188,12 @@ class CompanyMentorMap:
     """HashMap-based data structure for fast company-to-mentor lookup"""
     
     def __init__(self):
-        self._map = {}
-        self._build_map()
+        # Built on first use so importing this module needs no database
+        self._map = None
     
     def _build_map(self):
         """Build the company -> mentors mapping"""
+        self._map = {}
         companies = Company.query.all()
         
         for company in companies:
@@ -221,8 +208,13 @@ class CompanyMentorMap:
                 'available_count': sum(1 for m in mentors if m.is_accepting_questions)
             }
     
+    def _ensure_built(self):
+        if self._map is None:
+            self._build_map()
+    
     def get_mentors(self, company_id):
         """Get all mentors for a company"""
+        self._ensure_built()
         return self._map.get(company_id, {}).get('mentors', [])
     
     def get_available_mentors(self, company_id):
@@ -232,17 +224,186 @@ class CompanyMentorMap:
     
     def get_company_stats(self, company_id):
         """Get statistics for a company"""
+        self._ensure_built()
         return self._map.get(company_id, {})
     
     def refresh(self):
         """Refresh the mapping (call after mentor updates)"""
-        self._map = {}
-        self._build_map()
+        self._map = None
+
+
+class IndustryMentorIndex:
+    """
+    Top-K-by-trust available mentors per industry, plus a global list
+    
+    Each list holds (-trust_score, mentor_id, company_id) entries in sorted
+    order, so the best mentor is always at the front. Lists are capped at
+    TOP_K; a list only goes back to the database when removals shrink a
+    capped list below TOP_K.
+    """
+    
+    TOP_K = 20
+    
+    def __init__(self):
+        self._lists = None  # industry -> sorted entries (None key = global)
+        self._truncated = set()  # keys whose list was capped at TOP_K
+        self._stale = set()  # keys that must be reloaded before use
+        self._mentor_industry = {}  # mentor_id -> industry, for every available mentor
+        self._company_industry = {}  # company_id -> industry
+    
+    def _available_query(self):
+        return db.session.query(
+            Alumni.id,
+            Alumni.trust_score,
+            Alumni.current_company_id,
+            Company.industry
+        ).outerjoin(Company, Company.id == Alumni.current_company_id)\
+            .filter(Alumni.is_verified == True, Alumni.is_accepting_questions == True)
+    
+    @staticmethod
+    def _entry(mentor_id, trust_score, company_id):
+        return (-(trust_score or 0), mentor_id, company_id)
+    
+    def _build(self):
+        """Build every list with two queries"""
+        self._lists = {None: []}
+        self._truncated = set()
+        self._stale = set()
+        self._mentor_industry = {}
+        self._company_industry = dict(db.session.query(Company.id, Company.industry).all())
+        
+        rows = self._available_query().all()
+        for mentor_id, trust_score, company_id, industry in rows:
+            self._mentor_industry[mentor_id] = industry
+            entry = self._entry(mentor_id, trust_score, company_id)
+            self._lists[None].append(entry)
+            if industry:
+                self._lists.setdefault(industry, []).append(entry)
+        
+        for key, entries in self._lists.items():
+            entries.sort()
+            if len(entries) > self.TOP_K:
+                del entries[self.TOP_K:]
+                self._truncated.add(key)
+    
+    def _reload(self, key):
+        """Reload one capped list that lost entries"""
+        query = self._available_query()
+        if key is not None:
+            query = query.filter(Company.industry == key)
+        rows = query.order_by(Alumni.trust_score.desc(), Alumni.id)\
+            .limit(self.TOP_K + 1).all()
+        
+        entries = sorted(self._entry(m, t, c) for m, t, c, _ in rows)
+        if len(entries) > self.TOP_K:
+            del entries[self.TOP_K:]
+            self._truncated.add(key)
+        else:
+            self._truncated.discard(key)
+        self._lists[key] = entries
+        self._stale.discard(key)
+    
+    def _ensure_built(self):
+        if self._lists is None:
+            self._build()
+    
+    def _insert(self, key, entry):
+        entries = self._lists.setdefault(key, [])
+        bisect.insort(entries, entry)
+        if len(entries) > self.TOP_K:
+            entries.pop()
+            self._truncated.add(key)
+    
+    def _discard(self, mentor_id):
+        if mentor_id not in self._mentor_industry:
+            return
+        industry = self._mentor_industry.pop(mentor_id)
+        
+        for key in (industry, None) if industry else (None,):
+            entries = self._lists.get(key, [])
+            for i, entry in enumerate(entries):
+                if entry[1] == mentor_id:
+                    del entries[i]
+                    if key in self._truncated:
+                        self._stale.add(key)
+                    break
+    
+    def get_company_industry(self, company_id):
+        """Industry of a company, cached after the first lookup"""
+        self._ensure_built()
+        if company_id not in self._company_industry:
+            company = Company.query.get(company_id)
+            self._company_industry[company_id] = company.industry if company else None
+        return self._company_industry[company_id]
+    
+    def best_mentor_id(self, industry=None, exclude_company_id=None):
+        """
+        Highest-trust available mentor id for an industry (or globally)
+        
+        Returns: Alumni id or None
+        """
+        self._ensure_built()
+        if industry in self._stale:
+            self._reload(industry)
+        
+        for _, mentor_id, company_id in self._lists.get(industry, []):
+            if exclude_company_id is None or company_id != exclude_company_id:
+                return mentor_id
+        
+        if industry in self._truncated:
+            # Every cached entry is at the excluded company; look past the cap
+            query = self._available_query().filter(
+                Alumni.current_company_id != exclude_company_id
+            )
+            if industry is not None:
+                query = query.filter(Company.industry == industry)
+            row = query.order_by(Alumni.trust_score.desc(), Alumni.id).first()
+            return row[0] if row else None
+        
+        return None
+    
+    def top_mentor_ids(self, industry=None, limit=None):
+        """Available mentor ids for an industry (or globally), best first"""
+        self._ensure_built()
+        if industry in self._stale:
+            self._reload(industry)
+        
+        entries = self._lists.get(industry, [])
+        return [mentor_id for _, mentor_id, _ in entries[:limit]]
+    
+    def update_mentor(self, alumni):
+        """Re-index one mentor after a verification, availability or trust change"""
+        if self._lists is None:
+            # Nothing built yet; the first lookup will see the change
+            return
+        
+        self._discard(alumni.id)
+        if not (alumni.is_verified and alumni.is_accepting_questions):
+            return
+        
+        industry = self.get_company_industry(alumni.current_company_id)
+        self._mentor_industry[alumni.id] = industry
+        entry = self._entry(alumni.id, alumni.trust_score, alumni.current_company_id)
+        self._insert(None, entry)
+        if industry:
+            self._insert(industry, entry)
+    
+    def remove_mentor(self, mentor_id):
+        """Drop a mentor that no longer exists"""
+        if self._lists is not None:
+            self._discard(mentor_id)
+
+    def refresh(self):
+        """Drop everything; rebuilt on next lookup (call after bulk changes)"""
+        self._lists = None
 
 
 # Global mentor map instance
 mentor_map = CompanyMentorMap()
 
+# Global industry -> mentors index used by fallback matching
+industry_index = IndustryMentorIndex()
+
 
 def match_question_to_mentor(question_id):
     """
@@ -14,6 +14,8 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(128))
     role = db.Column(db.String(20), nullable=False) # 'student', 'alumni', 'admin'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Names show on knowledge base cards; moves that page's HTTP validators
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     student_profile = db.relationship('Student', backref='user', uselist=False)
@@ -41,6 +43,10 @@ class Alumni(db.Model):
     trust_score = db.Column(db.Integer, default=50)
     is_accepting_questions = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
+    # Maintained by AssignmentManager; number of assignments in state 'open'
+    open_assignments = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Sum of feedback weights scaled to DecayedTrust.EPOCH; decayed to "now" when read
+    decayed_trust_sum = db.Column(db.Float, default=0.0, server_default='0', nullable=False)
     responses = db.relationship('Response', backref='mentor', lazy='dynamic')
 
 class Company(db.Model):
@@ -48,6 +54,8 @@ class Company(db.Model):
     name = db.Column(db.String(100), unique=True, nullable=False)
     industry = db.Column(db.String(50))
     logo_url = db.Column(db.String(200)) # Placeholder or URL
+    # Names show on knowledge base cards; moves that page's HTTP validators
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     alumni = db.relationship('Alumni', backref='company', lazy='dynamic')
     questions = db.relationship('Question', backref='target_company', lazy='dynamic')
 
@@ -61,10 +69,23 @@ class Question(db.Model):
     urgency = db.Column(db.String(20)) # Normal, High
     status = db.Column(db.String(20), default='pending') # pending, answered
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped whenever anything shown on the question page changes (HTTP validators)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Counted in CompanySLA.breached_count (set by the SLA sweep, cleared when answered)
+    sla_breached = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
     responses = db.relationship('Response', backref='question', lazy='dynamic')
 
     # Optional: Targeted mentor
     target_mentor_id = db.Column(db.Integer, db.ForeignKey('alumni.id'), nullable=True)
+    # Set on knowledge base entries ingested from a PDF (see app.ingest)
+    document_id = db.Column(db.Integer, db.ForeignKey('ingested_document.id'), index=True)
+
+    __table_args__ = (
+        db.Index('ix_question_status_updated_at', 'status', 'updated_at'),
+        db.Index('ix_question_sla_sweep', 'status', 'sla_breached', 'created_at'),
+        # Archived rows keep their ids; SQLite must not hand them out again
+        {'sqlite_autoincrement': True},
+    )
 
 class Response(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -73,13 +94,20 @@ class Response(db.Model):
     body = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     helpful_count = db.Column(db.Integer, default=0)
+    # Rendered Markdown, regenerated when body_hash no longer matches (see app.rendering)
+    body_html = db.Column(db.Text)
+    body_hash = db.Column(db.String(64))
     # Relationship to feedback
     feedback = db.relationship('Feedback', backref='response', uselist=False)
 
+    # Archived rows keep their ids; SQLite must not hand them out again
+    __table_args__ = {'sqlite_autoincrement': True}
+
 class Feedback(db.Model):
     """Outcome-based feedback for mentor responses"""
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'))
+    # One feedback per question; the unique index backs the upsert in FeedbackManager
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), unique=True)
     response_id = db.Column(db.Integer, db.ForeignKey('response.id'))
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'))
     mentor_id = db.Column(db.Integer, db.ForeignKey('alumni.id'))
@@ -91,6 +119,9 @@ class Feedback(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Archived rows keep their ids; SQLite must not hand them out again
+    __table_args__ = {'sqlite_autoincrement': True}
+
 class Referral(db.Model):
     """Referral request tracking"""
     id = db.Column(db.Integer, primary_key=True)
@@ -113,3 +144,168 @@ class Referral(db.Model):
     student = db.relationship('Student', backref='referral_requests')
     mentor = db.relationship('Alumni', backref='referral_requests')
     company = db.relationship('Company', backref='referrals')
+
+    # Status tabs on the referral dashboards page through these newest first
+    __table_args__ = (
+        db.Index('ix_referral_mentor_status_requested', 'mentor_id', 'status', 'requested_at'),
+        db.Index('ix_referral_student_status_requested', 'student_id', 'status', 'requested_at'),
+    )
+
+class Assignment(db.Model):
+    """A question handed to a specific mentor for a limited lease"""
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), index=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('alumni.id'))
+    assigned_at = db.Column(db.DateTime, default=datetime.utcnow)
+    lease_expires_at = db.Column(db.DateTime, nullable=False)
+    state = db.Column(db.String(20), default='open') # 'open', 'answered', 'released', 'expired'
+
+    question = db.relationship('Question', backref=db.backref('assignments', lazy='dynamic'))
+    mentor = db.relationship('Alumni', backref=db.backref('assignments', lazy='dynamic'))
+
+    __table_args__ = (
+        db.Index('ix_assignment_mentor_state', 'mentor_id', 'state'),
+        db.Index('ix_assignment_state_lease', 'state', 'lease_expires_at'),
+    )
+
+class CompanySLA(db.Model):
+    """Per-company count of pending questions past the answer SLA, advanced by SLATracker.sweep"""
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), primary_key=True)
+    breached_count = db.Column(db.Integer, default=0, nullable=False)
+    last_swept_at = db.Column(db.DateTime)
+
+class QuestionSignature(db.Model):
+    """MinHash signature of a question's text, used by the related-questions index"""
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+class LSHBucket(db.Model):
+    """One band of a question's MinHash signature, hashed into an LSH bucket"""
+    id = db.Column(db.Integer, primary_key=True)
+    band = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.String(16), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), index=True)
+
+    __table_args__ = (db.Index('ix_lsh_bucket_band_bucket', 'band', 'bucket'),)
+
+class RelatedQuestion(db.Model):
+    """Precomputed related-question candidates for a question"""
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), index=True)
+    related_id = db.Column(db.Integer, db.ForeignKey('question.id'))
+    score = db.Column(db.Float, nullable=False)
+
+    related = db.relationship('Question', foreign_keys=[related_id])
+
+class FeedbackRollup(db.Model):
+    """Feedback counts per period bucket, mentor, company and outcome"""
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(8), nullable=False) # 'day' or 'week'
+    bucket_start = db.Column(db.Date, nullable=False) # the day, or the Monday of the week
+    mentor_id = db.Column(db.Integer, nullable=False)
+    # 0 when the question had no target company (NULLs would defeat the unique key)
+    company_id = db.Column(db.Integer, nullable=False, default=0)
+    outcome = db.Column(db.String(50), nullable=False)
+
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('period', 'bucket_start', 'mentor_id', 'company_id', 'outcome',
+                            name='uq_feedback_rollup_key'),
+        db.Index('ix_feedback_rollup_company', 'period', 'company_id', 'bucket_start'),
+        db.Index('ix_feedback_rollup_mentor', 'period', 'mentor_id', 'bucket_start'),
+    )
+
+class TrustSnapshot(db.Model):
+    """A mentor's trust score and its components, recorded whenever they change"""
+    id = db.Column(db.Integer, primary_key=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('alumni.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    score = db.Column(db.Integer, nullable=False) # the score stored on Alumni.trust_score
+    additive_score = db.Column(db.Integer, nullable=False)
+    decayed_score = db.Column(db.Integer, nullable=False)
+    badge = db.Column(db.String(10), nullable=False)
+
+    total_feedback = db.Column(db.Integer, default=0, nullable=False)
+    helpful_count = db.Column(db.Integer, default=0, nullable=False)
+    interview_count = db.Column(db.Integer, default=0, nullable=False)
+    referral_count = db.Column(db.Integer, default=0, nullable=False)
+    not_helpful_count = db.Column(db.Integer, default=0, nullable=False)
+    unanswered_count = db.Column(db.Integer, default=0, nullable=False)
+    average_rating = db.Column(db.Float, default=0, nullable=False)
+
+    mentor = db.relationship('Alumni', backref=db.backref('trust_snapshots', lazy='dynamic'))
+
+    __table_args__ = (db.Index('ix_trust_snapshot_mentor_created', 'mentor_id', 'created_at'),)
+
+class IngestedDocument(db.Model):
+    """A PDF whose text was added to the knowledge base; the hash skips it on later runs"""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), unique=True, nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    page_count = db.Column(db.Integer, default=0, nullable=False)
+    entry_count = db.Column(db.Integer, default=0, nullable=False)
+    ingested_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # 'writing' -> 'indexing' -> 'complete'; see KnowledgeIngestor.store
+    state = db.Column(db.String(20), default='writing', nullable=False)
+
+class ChangeLog(db.Model):
+    """Committed entity changes, replayed by other workers to refresh their in-memory state"""
+    id = db.Column(db.Integer, primary_key=True)
+    origin = db.Column(db.String(80), nullable=False) # host:pid:token of the writing process
+    table_name = db.Column(db.String(64), nullable=False)
+    entity_id = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+# ---------- Archive (cold storage) ----------
+# Answered questions past ARCHIVE_AFTER_DAYS move here with their responses
+# and feedback (see app.archive). Ids are kept, so links keep working.
+
+class ArchivedQuestion(db.Model):
+    """Cold copy of an answered Question"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    student_id = db.Column(db.Integer, index=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'))
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(50))
+    urgency = db.Column(db.String(20))
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, index=True)
+    updated_at = db.Column(db.DateTime)
+    target_mentor_id = db.Column(db.Integer)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    target_company = db.relationship('Company')
+    responses = db.relationship('ArchivedResponse', backref='question', lazy='dynamic',
+                                order_by='ArchivedResponse.id')
+
+class ArchivedResponse(db.Model):
+    """Cold copy of a Response to an archived question"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('archived_question.id'), index=True)
+    mentor_id = db.Column(db.Integer, db.ForeignKey('alumni.id'), index=True)
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime)
+    helpful_count = db.Column(db.Integer, default=0)
+    body_html = db.Column(db.Text)
+    body_hash = db.Column(db.String(64))
+
+    mentor = db.relationship('Alumni')
+    feedback = db.relationship('ArchivedFeedback', uselist=False,
+                               primaryjoin='ArchivedResponse.id == foreign(ArchivedFeedback.response_id)')
+
+class ArchivedFeedback(db.Model):
+    """Cold copy of Feedback on an archived question"""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    question_id = db.Column(db.Integer, unique=True)
+    response_id = db.Column(db.Integer)
+    student_id = db.Column(db.Integer)
+    mentor_id = db.Column(db.Integer, index=True)
+    outcome = db.Column(db.String(50))
+    rating = db.Column(db.Integer)
+    comment = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
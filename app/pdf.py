@@ -0,0 +1,211 @@
+"""
+PDF Conversion for ASCEND
+HTML -> PDF with xhtml2pdf and PDF -> text with pypdf, run in pools of
+worker processes so the work never holds a web worker's GIL. This module
+imports nothing from the app, so spawned pool processes start quickly.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import markdown
+
+
+class PDFError(Exception):
+    """PDF conversion or text extraction failed, or its library is not installed"""
+
+
+PDF_STYLE = """
+body { font-family: Helvetica, sans-serif; font-size: 11pt; color: #1F2937; }
+h1 { color: #2563EB; border-bottom: 2px solid #2563EB; padding-bottom: 10px; }
+h2 { color: #10B981; margin-top: 20px; }
+h3 { color: #4B5563; }
+code { background-color: #F3F4F6; padding: 2px 4px; font-family: Courier New, monospace; }
+pre { background-color: #F3F4F6; padding: 10px; }
+table { width: 100%; border-collapse: collapse; margin-top: 15px; }
+th, td { border: 1px solid #ddd; padding: 6px; text-align: left; }
+th { background-color: #f2f2f2; }
+.muted { color: #6B7280; font-size: 9pt; }
+"""
+
+
+def markdown_to_html(text):
+    """Wrap Markdown in a styled HTML document ready for html_to_pdf"""
+    body = markdown.markdown(text, extensions=['tables', 'fenced_code'])
+    return f'<html><head><style>{PDF_STYLE}</style></head><body>{body}</body></html>'
+
+
+def html_to_pdf(html, output_path):
+    """
+    Write html as a PDF at output_path
+
+    Writes to a temporary file first and renames it into place, so readers
+    never see a half-written PDF. Returns: output_path
+    """
+    try:
+        from xhtml2pdf import pisa  # heavy; only loaded where PDFs are made
+    except ImportError:
+        raise PDFError('xhtml2pdf is not installed')
+
+    tmp_path = f'{output_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as pdf_file:
+            status = pisa.CreatePDF(html, dest=pdf_file)
+        if status.err:
+            raise PDFError(f'xhtml2pdf reported {status.err} errors')
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def _pdf_reader(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        try:
+            from PyPDF2 import PdfReader  # older installs
+        except ImportError:
+            raise PDFError('pypdf is not installed')
+    return PdfReader(path)
+
+
+def inspect_pdf(path):
+    """(sha256 of the file, page count); the hash identifies already-ingested files"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    try:
+        pages = len(_pdf_reader(path).pages)
+    except PDFError:
+        raise
+    except Exception as e:  # damaged or encrypted files
+        raise PDFError(f'{path}: {e}')
+    return digest.hexdigest(), pages
+
+
+def extract_pages(path, start, stop):
+    """
+    Text of pages [start, stop) as [(page_number, text)], 1-based numbers
+
+    Pages that fail to extract come back as empty text rather than failing
+    the whole range.
+    """
+    reader = _pdf_reader(path)
+    pages = []
+    for index in range(start, min(stop, len(reader.pages))):
+        try:
+            text = reader.pages[index].extract_text() or ''
+        except Exception:
+            text = ''
+        pages.append((index + 1, text))
+    return pages
+
+
+def inspect_task(path):
+    """Pool wrapper for inspect_pdf: (path, sha256, pages, error) instead of raising"""
+    try:
+        digest, pages = inspect_pdf(path)
+        return path, digest, pages, None
+    except (OSError, PDFError) as e:
+        return path, None, 0, str(e)
+
+
+def extract_task(task):
+    """Pool wrapper for extract_pages: (pages, error) instead of raising"""
+    path, start, stop = task
+    try:
+        return extract_pages(path, start, stop), None
+    except Exception as e:
+        return None, str(e)
+
+
+def new_process_pool(workers):
+    """Spawn-based pool: forking a threaded web worker can deadlock the child"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+class PDFPool:
+    """
+    Process pool for html_to_pdf, created on first use
+
+    Concurrent requests for the same output path share one conversion. With
+    workers=0 conversions run inline in the calling thread (tests, scripts).
+    """
+
+    def __init__(self):
+        self.workers = 2
+        self.timeout = 60
+        self._executor = None
+        self._inflight = {}  # output_path -> Future
+        self._lock = threading.RLock()  # done callbacks may run inside submit
+
+    def init_app(self, app):
+        self.workers = app.config.get('REPORT_WORKERS', 2)
+        self.timeout = app.config.get('REPORT_TIMEOUT_SECONDS', 60)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = new_process_pool(self.workers)
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken pool (a child died: OOM, segfault) so the next submit starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def submit(self, html, output_path):
+        """Start (or join) a conversion; returns a Future, or None when running inline"""
+        if not self.workers:
+            html_to_pdf(html, output_path)
+            return None
+        with self._lock:
+            future = self._inflight.get(output_path)
+            if future is None:
+                try:
+                    future = self._get_executor().submit(html_to_pdf, html, output_path)
+                except BrokenProcessPool:
+                    self._executor.shutdown(wait=False)
+                    self._executor = None
+                    future = self._get_executor().submit(html_to_pdf, html, output_path)
+                future.executor = self._executor
+                self._inflight[output_path] = future
+                future.add_done_callback(lambda _: self._forget(output_path))
+        return future
+
+    def _forget(self, output_path):
+        with self._lock:
+            self._inflight.pop(output_path, None)
+
+    def render(self, html, output_path):
+        """Convert and wait; raises PDFError (or TimeoutError)"""
+        future = self.submit(html, output_path)
+        if future is not None:
+            self.wait(future)
+        return output_path
+
+    def wait(self, future):
+        """Result of a submitted conversion; raises PDFError (or TimeoutError)"""
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool as e:
+            self._discard_executor(future.executor)
+            raise PDFError(f'PDF worker process died: {e}') from e
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+# Global pool (one per web worker process)
+pdf_pool = PDFPool()
@@ -0,0 +1,304 @@
+"""
+Column-projection query builders for ASCEND
+Each builder selects only the requested fields, with related names joined
+in SQL, so list endpoints never fall back to per-row lazy loads
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy.orm import aliased, joinedload
+
+from app.models import (
+    User, Student, Alumni, Company, Question, Response, Feedback, Referral,
+    ArchivedQuestion, ArchivedResponse, ArchivedFeedback
+)
+from app.archive import ArchiveManager
+from app import db
+
+
+StudentUser = aliased(User)
+MentorUser = aliased(User)
+
+
+def _first_answerer_name():
+    """Correlated subquery: name of the first mentor to answer a question"""
+    return db.session.query(User.name)\
+        .join(Alumni, Alumni.user_id == User.id)\
+        .join(Response, Response.mentor_id == Alumni.id)\
+        .filter(Response.question_id == Question.id)\
+        .order_by(Response.created_at, Response.id)\
+        .limit(1)\
+        .scalar_subquery()
+
+
+def _response_count():
+    return db.session.query(db.func.count(Response.id))\
+        .filter(Response.question_id == Question.id)\
+        .scalar_subquery()
+
+
+def _archived_first_answerer_name():
+    return db.session.query(User.name)\
+        .join(Alumni, Alumni.user_id == User.id)\
+        .join(ArchivedResponse, ArchivedResponse.mentor_id == Alumni.id)\
+        .filter(ArchivedResponse.question_id == ArchivedQuestion.id)\
+        .order_by(ArchivedResponse.created_at, ArchivedResponse.id)\
+        .limit(1)\
+        .scalar_subquery()
+
+
+def _archived_response_count():
+    return db.session.query(db.func.count(ArchivedResponse.id))\
+        .filter(ArchivedResponse.question_id == ArchivedQuestion.id)\
+        .scalar_subquery()
+
+
+# field name -> column factory (factories so subqueries are built per query)
+QUESTION_FIELDS = {
+    'id': lambda: Question.id,
+    'title': lambda: Question.title,
+    'body': lambda: Question.body,
+    'category': lambda: Question.category,
+    'urgency': lambda: Question.urgency,
+    'status': lambda: Question.status,
+    'created_at': lambda: Question.created_at,
+    'company_id': lambda: Question.company_id,
+    'company_name': lambda: Company.name,
+    'answered_by': _first_answerer_name,
+    'response_count': _response_count,
+}
+
+RESPONSE_FIELDS = {
+    'id': lambda: Response.id,
+    'question_id': lambda: Response.question_id,
+    'question_title': lambda: Question.title,
+    'body': lambda: Response.body,
+    'created_at': lambda: Response.created_at,
+    'helpful_count': lambda: Response.helpful_count,
+    'mentor_id': lambda: Response.mentor_id,
+    'mentor_name': lambda: MentorUser.name,
+}
+
+REFERRAL_FIELDS = {
+    'id': lambda: Referral.id,
+    'status': lambda: Referral.status,
+    'message': lambda: Referral.message,
+    'mentor_response': lambda: Referral.mentor_response,
+    'requested_at': lambda: Referral.requested_at,
+    'responded_at': lambda: Referral.responded_at,
+    'company_id': lambda: Referral.company_id,
+    'company_name': lambda: Company.name,
+    'student_id': lambda: Referral.student_id,
+    'student_name': lambda: StudentUser.name,
+    'mentor_id': lambda: Referral.mentor_id,
+    'mentor_name': lambda: MentorUser.name,
+}
+
+
+FEEDBACK_FIELDS = {
+    'id': lambda: Feedback.id,
+    'question_id': lambda: Feedback.question_id,
+    'question_title': lambda: Question.title,
+    'response_id': lambda: Feedback.response_id,
+    'outcome': lambda: Feedback.outcome,
+    'rating': lambda: Feedback.rating,
+    'comment': lambda: Feedback.comment,
+    'created_at': lambda: Feedback.created_at,
+    'company_id': lambda: Question.company_id,
+    'company_name': lambda: Company.name,
+    'student_id': lambda: Feedback.student_id,
+    'student_name': lambda: StudentUser.name,
+    'mentor_id': lambda: Feedback.mentor_id,
+    'mentor_name': lambda: MentorUser.name,
+}
+
+# The same fields read from the archive tables (see app.archive)
+ARCHIVED_QUESTION_FIELDS = dict(QUESTION_FIELDS, **{
+    'id': lambda: ArchivedQuestion.id,
+    'title': lambda: ArchivedQuestion.title,
+    'body': lambda: ArchivedQuestion.body,
+    'category': lambda: ArchivedQuestion.category,
+    'urgency': lambda: ArchivedQuestion.urgency,
+    'status': lambda: ArchivedQuestion.status,
+    'created_at': lambda: ArchivedQuestion.created_at,
+    'company_id': lambda: ArchivedQuestion.company_id,
+    'answered_by': _archived_first_answerer_name,
+    'response_count': _archived_response_count,
+})
+
+ARCHIVED_RESPONSE_FIELDS = dict(RESPONSE_FIELDS, **{
+    'id': lambda: ArchivedResponse.id,
+    'question_id': lambda: ArchivedResponse.question_id,
+    'question_title': lambda: ArchivedQuestion.title,
+    'body': lambda: ArchivedResponse.body,
+    'created_at': lambda: ArchivedResponse.created_at,
+    'helpful_count': lambda: ArchivedResponse.helpful_count,
+    'mentor_id': lambda: ArchivedResponse.mentor_id,
+})
+
+ARCHIVED_FEEDBACK_FIELDS = dict(FEEDBACK_FIELDS, **{
+    'id': lambda: ArchivedFeedback.id,
+    'question_id': lambda: ArchivedFeedback.question_id,
+    'question_title': lambda: ArchivedQuestion.title,
+    'response_id': lambda: ArchivedFeedback.response_id,
+    'outcome': lambda: ArchivedFeedback.outcome,
+    'rating': lambda: ArchivedFeedback.rating,
+    'comment': lambda: ArchivedFeedback.comment,
+    'created_at': lambda: ArchivedFeedback.created_at,
+    'company_id': lambda: ArchivedQuestion.company_id,
+    'student_id': lambda: ArchivedFeedback.student_id,
+    'mentor_id': lambda: ArchivedFeedback.mentor_id,
+})
+
+
+def _columns(field_map, fields):
+    return [field_map[f]().label(f) for f in fields]
+
+
+def question_rows(fields, *filters):
+    """Query of answered/pending questions projecting only `fields`"""
+    return db.session.query(*_columns(QUESTION_FIELDS, fields))\
+        .select_from(Question)\
+        .outerjoin(Company, Company.id == Question.company_id)\
+        .filter(*filters)
+
+
+def response_rows(fields, *filters):
+    """Query of responses with question title and mentor name joined"""
+    return db.session.query(*_columns(RESPONSE_FIELDS, fields))\
+        .select_from(Response)\
+        .join(Question, Question.id == Response.question_id)\
+        .outerjoin(Alumni, Alumni.id == Response.mentor_id)\
+        .outerjoin(MentorUser, MentorUser.id == Alumni.user_id)\
+        .filter(*filters)
+
+
+def referral_rows(fields, *filters):
+    """Query of referrals with company, student and mentor names joined"""
+    return db.session.query(*_columns(REFERRAL_FIELDS, fields))\
+        .select_from(Referral)\
+        .outerjoin(Company, Company.id == Referral.company_id)\
+        .outerjoin(Student, Student.id == Referral.student_id)\
+        .outerjoin(StudentUser, StudentUser.id == Student.user_id)\
+        .outerjoin(Alumni, Alumni.id == Referral.mentor_id)\
+        .outerjoin(MentorUser, MentorUser.id == Alumni.user_id)\
+        .filter(*filters)
+
+
+def feedback_rows(fields, *filters):
+    """Query of feedback with question title, company, student and mentor names joined"""
+    return db.session.query(*_columns(FEEDBACK_FIELDS, fields))\
+        .select_from(Feedback)\
+        .outerjoin(Question, Question.id == Feedback.question_id)\
+        .outerjoin(Company, Company.id == Question.company_id)\
+        .outerjoin(Student, Student.id == Feedback.student_id)\
+        .outerjoin(StudentUser, StudentUser.id == Student.user_id)\
+        .outerjoin(Alumni, Alumni.id == Feedback.mentor_id)\
+        .outerjoin(MentorUser, MentorUser.id == Alumni.user_id)\
+        .filter(*filters)
+
+
+def archived_question_rows(fields, *filters):
+    """question_rows over ArchivedQuestion"""
+    return db.session.query(*_columns(ARCHIVED_QUESTION_FIELDS, fields))\
+        .select_from(ArchivedQuestion)\
+        .outerjoin(Company, Company.id == ArchivedQuestion.company_id)\
+        .filter(*filters)
+
+
+def archived_response_rows(fields, *filters):
+    """response_rows over ArchivedResponse"""
+    return db.session.query(*_columns(ARCHIVED_RESPONSE_FIELDS, fields))\
+        .select_from(ArchivedResponse)\
+        .join(ArchivedQuestion, ArchivedQuestion.id == ArchivedResponse.question_id)\
+        .outerjoin(Alumni, Alumni.id == ArchivedResponse.mentor_id)\
+        .outerjoin(MentorUser, MentorUser.id == Alumni.user_id)\
+        .filter(*filters)
+
+
+def archived_feedback_rows(fields, *filters):
+    """feedback_rows over ArchivedFeedback"""
+    return db.session.query(*_columns(ARCHIVED_FEEDBACK_FIELDS, fields))\
+        .select_from(ArchivedFeedback)\
+        .outerjoin(ArchivedQuestion, ArchivedQuestion.id == ArchivedFeedback.question_id)\
+        .outerjoin(Company, Company.id == ArchivedQuestion.company_id)\
+        .outerjoin(Student, Student.id == ArchivedFeedback.student_id)\
+        .outerjoin(StudentUser, StudentUser.id == Student.user_id)\
+        .outerjoin(Alumni, Alumni.id == ArchivedFeedback.mentor_id)\
+        .outerjoin(MentorUser, MentorUser.id == Alumni.user_id)\
+        .filter(*filters)
+
+
+def student_question_counts(student_id):
+    """(total, answered) question counts for a student, archived questions included"""
+    total, answered = db.session.query(
+        db.func.count(Question.id),
+        db.func.coalesce(db.func.sum(db.case((Question.status == 'answered', 1), else_=0)), 0)
+    ).filter(Question.student_id == student_id).one()
+    # Only answered questions are archived
+    archived = ArchiveManager.archived_question_count(student_id)
+    return total + archived, answered + archived
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque keyset cursor for the row (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from encode_cursor; raises ValueError if malformed"""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, UnicodeError, base64.binascii.Error) as error:
+        raise ValueError('Invalid cursor') from error
+
+
+REFERRAL_STATUSES = ('requested', 'approved', 'rejected')
+
+
+def referral_status_counts(owner_filter):
+    """{status: count} for one student's or mentor's referrals, in one grouped query"""
+    rows = db.session.query(Referral.status, db.func.count(Referral.id))\
+        .filter(owner_filter)\
+        .group_by(Referral.status)\
+        .all()
+    return dict(rows)
+
+
+def referral_page(owner_filter, status, cursor=None, limit=20):
+    """
+    One page of referrals, newest first, keyset-paginated on (requested_at, id)
+
+    Company, student and mentor (with their users) are joined eagerly so the
+    templates never lazy-load per row.
+
+    Returns: (referrals, next_cursor or None)
+    """
+    query = Referral.query\
+        .options(
+            joinedload(Referral.company),
+            joinedload(Referral.student).joinedload(Student.user),
+            joinedload(Referral.mentor).joinedload(Alumni.user)
+        )\
+        .filter(owner_filter, Referral.status == status)
+
+    if cursor:
+        at, row_id = decode_cursor(cursor)
+        query = query.filter(db.or_(
+            Referral.requested_at < at,
+            db.and_(Referral.requested_at == at, Referral.id < row_id)
+        ))
+
+    referrals = query.order_by(Referral.requested_at.desc(), Referral.id.desc())\
+        .limit(limit + 1).all()
+
+    next_cursor = None
+    if len(referrals) > limit:
+        referrals = referrals[:limit]
+        next_cursor = encode_cursor(referrals[-1].requested_at, referrals[-1].id)
+
+    return referrals, next_cursor
@@ -5,8 +5,12 @@ Handles question distribution to mentors using FIFO and priority queues
 
 from collections import deque
 import heapq
-from datetime import datetime
-from app.models import Question, Alumni, Company
+import time
+from datetime import datetime, timedelta
+import click
+from sqlalchemy.orm import joinedload
+from app.models import Question, Alumni, Company, Assignment
+from app.sla import SLATracker
 from app import db
 
 
@@ -83,6 +87,26 @@ class MentorQueue:
         
         return size
     
+    def remove_question(self, question_id):
+        """Drop a question from whichever queue holds it; returns True if it was queued"""
+        for i, node in enumerate(self.priority_queue):
+            if node.question.id == question_id:
+                self.priority_queue.pop(i)
+                heapq.heapify(self.priority_queue)
+                return True
+        for company_queue in self.company_queues.values():
+            for question in company_queue:
+                if question.id == question_id:
+                    company_queue.remove(question)
+                    return True
+        return False
+
+    def refresh_questions(self, question_ids):
+        """Reload queued questions changed elsewhere; answered ones leave the queue"""
+        for question_id in question_ids:
+            if self.remove_question(question_id):
+                self.requeue_question(question_id)
+
     def requeue_question(self, question_id):
         """Re-add a question to queue (if mentor didn't answer)"""
         question = Question.query.get(question_id)
@@ -104,17 +128,8 @@ class QueueAllocator:
     
     @staticmethod
     def calculate_mentor_load(mentor_id):
-        """Calculate current pending question load for a mentor"""
-        from app.models import Response
-        
-        # Count questions assigned but not answered
-        pending_responses = Response.query.filter_by(
-            mentor_id=mentor_id
-        ).join(Question).filter(
-            Question.status == 'pending'
-        ).count()
-        
-        return pending_responses
+        """Current open-assignment load for a mentor (maintained counter)"""
+        return AssignmentManager.get_load(mentor_id)
     
     @staticmethod
     def assign_to_mentor(question):
@@ -133,7 +148,7 @@ class QueueAllocator:
         min_load = float('inf')
         
         for mentor in mentors:
-            load = QueueAllocator.calculate_mentor_load(mentor.id)
+            load = mentor.open_assignments or 0
             
             # Tie-breaker: higher trust score
             if load < min_load or (load == min_load and mentor.trust_score > best_mentor.trust_score):
@@ -142,22 +157,300 @@ class QueueAllocator:
         
         return best_mentor
     
+    @staticmethod
+    def plan_distribution():
+        """
+        Plan assignments for all unassigned pending questions in one pass
+        
+        Loads the pending questions without an open assignment and every
+        available mentor (whose load is the open_assignments counter) with
+        two queries, then hands them to BatchAssignmentOptimizer.
+        
+        Returns: dict with 'assignments', 'unassigned' and 'stats'
+        """
+        open_question_ids = db.session.query(Assignment.question_id)\
+            .filter(Assignment.state == 'open')
+        pending_questions = Question.query.filter(
+            Question.status == 'pending',
+            ~Question.id.in_(open_question_ids)
+        ).all()
+        
+        mentors = Alumni.query.options(joinedload(Alumni.user)).filter_by(
+            is_verified=True,
+            is_accepting_questions=True
+        ).all()
+        
+        loads = {m.id: m.open_assignments or 0 for m in mentors}
+        
+        return BatchAssignmentOptimizer.optimize(pending_questions, mentors, loads)
+    
     @staticmethod
     def distribute_questions():
         """Distribute all pending questions to mentors (batch processing)"""
-        pending_questions = Question.query.filter_by(status='pending').all()
+        assignments = QueueAllocator.plan_distribution()['assignments']
+        AssignmentManager.assign_many(
+            [(a['question_id'], a['mentor_id']) for a in assignments]
+        )
+        return assignments
+
+
+class AssignmentManager:
+    """
+    Explicit question -> mentor assignments with leases
+    
+    Every transition in or out of the 'open' state adjusts
+    Alumni.open_assignments in the same transaction, so a mentor's load is
+    a single column read rather than a count query.
+    """
+    
+    LEASE = timedelta(days=3)
+    
+    @staticmethod
+    def _adjust_counters(deltas):
+        """Apply {mentor_id: delta} to the open_assignments counters in SQL"""
+        for mentor_id, delta in deltas.items():
+            if delta:
+                Alumni.query.filter_by(id=mentor_id).update(
+                    {Alumni.open_assignments: Alumni.open_assignments + delta},
+                    synchronize_session=False
+                )
+    
+    @staticmethod
+    def get_load(mentor_id):
+        """Open assignments for a mentor (O(1) counter read)"""
+        load = db.session.query(Alumni.open_assignments).filter_by(id=mentor_id).scalar()
+        return load or 0
+    
+    @staticmethod
+    def assign(question_id, mentor_id, lease=None, commit=True):
+        """Assign one question to a mentor"""
+        return AssignmentManager.assign_many([(question_id, mentor_id)], lease, commit)[0]
+    
+    @staticmethod
+    def assign_many(pairs, lease=None, commit=True):
+        """
+        Create open assignments for (question_id, mentor_id) pairs
         
-        assignments = []
-        for question in pending_questions:
-            mentor = QueueAllocator.assign_to_mentor(question)
-            if mentor:
-                assignments.append({
-                    'question_id': question.id,
-                    'mentor_id': mentor.id,
-                    'mentor_name': mentor.user.name
-                })
+        Returns: list of Assignment objects
+        """
+        now = datetime.utcnow()
+        expires = now + (lease or AssignmentManager.LEASE)
+        
+        assignments = [
+            Assignment(question_id=question_id, mentor_id=mentor_id,
+                       assigned_at=now, lease_expires_at=expires, state='open')
+            for question_id, mentor_id in pairs
+        ]
+        db.session.add_all(assignments)
+        
+        deltas = {}
+        for _, mentor_id in pairs:
+            deltas[mentor_id] = deltas.get(mentor_id, 0) + 1
+        AssignmentManager._adjust_counters(deltas)
+        
+        if commit:
+            db.session.commit()
         
         return assignments
+    
+    @staticmethod
+    def _close(query, state_for):
+        """Close the open assignments matched by query; state_for(assignment) picks the new state"""
+        closed = query.filter(Assignment.state == 'open').all()
+        
+        deltas = {}
+        for assignment in closed:
+            assignment.state = state_for(assignment)
+            deltas[assignment.mentor_id] = deltas.get(assignment.mentor_id, 0) - 1
+        AssignmentManager._adjust_counters(deltas)
+        
+        return closed
+    
+    @staticmethod
+    def complete_question(question_id, answered_by=None, commit=True):
+        """
+        Close a question's open assignments once it is answered
+        
+        The answering mentor's assignment becomes 'answered'; anyone else
+        holding the question is 'released'.
+        """
+        closed = AssignmentManager._close(
+            Assignment.query.filter_by(question_id=question_id),
+            lambda a: 'answered' if a.mentor_id == answered_by else 'released'
+        )
+        
+        if commit:
+            db.session.commit()
+        
+        return closed
+    
+    @staticmethod
+    def release(question_id, mentor_id, commit=True):
+        """Give a question back to the pool before its lease runs out"""
+        closed = AssignmentManager._close(
+            Assignment.query.filter_by(question_id=question_id, mentor_id=mentor_id),
+            lambda a: 'released'
+        )
+        
+        if commit:
+            db.session.commit()
+        
+        return closed
+    
+    @staticmethod
+    def expire_leases(now=None):
+        """
+        Expire open assignments whose lease has run out (`flask assignments expire`)
+        
+        Returns: number of expired assignments
+        """
+        now = now or datetime.utcnow()
+        expired = AssignmentManager._close(
+            Assignment.query.filter(Assignment.lease_expires_at < now),
+            lambda a: 'expired'
+        )
+        db.session.commit()
+        
+        return len(expired)
+    
+    @staticmethod
+    def rebuild_counters(session=None):
+        """
+        Recompute every open_assignments counter from the Assignment table
+        
+        session defaults to db.session; migrations pass one bound to their
+        own connection.
+        """
+        session = session or db.session
+        counts = dict(
+            session.query(Assignment.mentor_id, db.func.count(Assignment.id))
+            .filter(Assignment.state == 'open')
+            .group_by(Assignment.mentor_id)
+            .all()
+        )
+        
+        session.query(Alumni).update({Alumni.open_assignments: 0}, synchronize_session=False)
+        for mentor_id, count in counts.items():
+            session.query(Alumni).filter_by(id=mentor_id).update(
+                {Alumni.open_assignments: count}, synchronize_session=False
+            )
+        session.commit()
+        
+        return counts
+
+
+class BatchAssignmentOptimizer:
+    """
+    Capacity-aware batch assignment of questions to mentors
+    
+    Questions are taken in priority order (High urgency, then oldest first).
+    Each company keeps a min-heap of its mentors keyed by
+    (load, -trust_score, id); the top mentor takes the question and goes
+    back on the heap with its load incremented, so a batch spreads across
+    mentors instead of piling onto whoever was least loaded at the start.
+    Mentors that reach their capacity leave the heap.
+    """
+    
+    # Max open questions per mentor, including load carried into the batch
+    DEFAULT_CAPACITY = 10
+    
+    @staticmethod
+    def question_order(question):
+        return (0 if question.urgency == 'High' else 1, question.created_at or datetime.min, question.id)
+    
+    @staticmethod
+    def optimize(questions, mentors, loads=None, capacity=None):
+        """
+        Assign questions to mentors of the same company
+        
+        Args:
+            questions: Question objects to assign
+            mentors: available Alumni objects
+            loads: optional dict mentor_id -> current load
+            capacity: max load per mentor (default DEFAULT_CAPACITY)
+        
+        Returns:
+            dict with 'assignments' (list of dicts), 'unassigned' (question ids)
+            and 'stats' (assignment quality and runtime)
+        """
+        started = time.perf_counter()
+        loads = dict(loads or {})
+        capacity = capacity or BatchAssignmentOptimizer.DEFAULT_CAPACITY
+        
+        by_id = {}
+        heaps = {}
+        for mentor in mentors:
+            by_id[mentor.id] = mentor
+            load = loads.setdefault(mentor.id, 0)
+            if load < capacity:
+                heaps.setdefault(mentor.current_company_id, []).append(
+                    (load, -(mentor.trust_score or 0), mentor.id)
+                )
+        for heap in heaps.values():
+            heapq.heapify(heap)
+        
+        assignments = []
+        unassigned = []
+        for question in sorted(questions, key=BatchAssignmentOptimizer.question_order):
+            heap = heaps.get(question.company_id)
+            if not heap:
+                unassigned.append(question.id)
+                continue
+            
+            load, neg_trust, mentor_id = heapq.heappop(heap)
+            load += 1
+            loads[mentor_id] = load
+            if load < capacity:
+                heapq.heappush(heap, (load, neg_trust, mentor_id))
+            
+            mentor = by_id[mentor_id]
+            assignments.append({
+                'question_id': question.id,
+                'mentor_id': mentor_id,
+                'mentor_name': mentor.user.name if mentor.user else None
+            })
+        
+        stats = BatchAssignmentOptimizer.assignment_stats(assignments, unassigned, mentors, loads)
+        stats['runtime_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        
+        return {
+            'assignments': assignments,
+            'unassigned': unassigned,
+            'stats': stats
+        }
+    
+    @staticmethod
+    def assignment_stats(assignments, unassigned, mentors, loads):
+        """
+        Quality of an assignment
+        
+        Returns: dict with counts, load spread across mentors and the
+        average trust score of the mentors questions went to
+        """
+        mentor_loads = [loads.get(m.id, 0) for m in mentors]
+        trust = {m.id: m.trust_score or 0 for m in mentors}
+        
+        stats = {
+            'assigned': len(assignments),
+            'unassigned': len(unassigned),
+            'mentors_used': len({a['mentor_id'] for a in assignments}),
+            'max_load': max(mentor_loads) if mentor_loads else 0,
+            'min_load': min(mentor_loads) if mentor_loads else 0,
+            'load_stddev': 0,
+            'avg_assigned_trust': 0
+        }
+        
+        if mentor_loads:
+            mean = sum(mentor_loads) / len(mentor_loads)
+            variance = sum((l - mean) ** 2 for l in mentor_loads) / len(mentor_loads)
+            stats['load_stddev'] = round(variance ** 0.5, 3)
+        
+        if assignments:
+            stats['avg_assigned_trust'] = round(
+                sum(trust[a['mentor_id']] for a in assignments) / len(assignments), 2
+            )
+        
+        return stats
 
 
 # Global queue instance
@@ -209,6 +502,7 @@ def get_queue_stats():
         'total_pending': Question.query.filter_by(status='pending').count(),
         'high_priority': Question.query.filter_by(status='pending', urgency='High').count(),
         'companies_with_questions': len(global_queue.company_queues),
+        'sla_breached': SLATracker.total_breached(),
         'available_mentors': Alumni.query.filter_by(
             is_verified=True,
             is_accepting_questions=True
@@ -216,3 +510,27 @@ def get_queue_stats():
     }
     
     return stats
+
+
+@click.group('assignments')
+def assignments_cli():
+    """Mentor assignment lease commands."""
+
+
+@assignments_cli.command('expire')
+def expire_command():
+    """Close assignments whose lease has run out (run from cron)."""
+    expired = AssignmentManager.expire_leases()
+    click.echo(f'Expired {expired} assignments')
+
+
+@assignments_cli.command('rebuild')
+def rebuild_command():
+    """Recount every mentor's open assignments from scratch."""
+    counts = AssignmentManager.rebuild_counters()
+    click.echo(f'{sum(counts.values())} open assignments across {len(counts)} mentors')
+
+
+def init_assignments(app):
+    """Register the assignments CLI commands"""
+    app.cli.add_command(assignments_cli)
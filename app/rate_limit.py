@@ -0,0 +1,389 @@
+"""
+Admission Control for ASCEND
+Token-bucket rate limits (per user, or per client IP when logged out) and
+concurrency limits (per endpoint, across all workers) for the write-heavy
+and password-hashing endpoints. State lives in a small SQLite file next to
+the app database, separate from it so admission checks never queue behind
+application writes. Rejected requests get an immediate 429 before any
+database or password work is done.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import click
+from flask import current_app, g, request, session
+
+logger = logging.getLogger(__name__)
+
+# Admission outcomes (also the metric names)
+ALLOWED = 'allowed'
+RATE_LIMITED = 'rate_limited'
+CONCURRENCY_LIMITED = 'concurrency_limited'
+STORE_ERROR = 'store_error'
+
+
+class LimitStoreError(Exception):
+    """The shared limit store is locked or unavailable"""
+
+
+def refill(tokens, updated_at, now, rate, burst):
+    """Tokens in a bucket at `now`, refilled at `rate` per second up to `burst`"""
+    if tokens is None:
+        return float(burst)
+    return min(float(burst), tokens + max(0.0, now - updated_at) * rate)
+
+
+class MemoryLimitStore:
+    """Single-process store (tests, development servers)"""
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._slots = {}  # token -> (slot_key, expires_at)
+        self._counters = {}  # (endpoint, outcome) -> count
+        self._lock = threading.Lock()
+
+    def admit(self, endpoint, bucket_key, rate, burst, slot_key, limit, ttl, now):
+        with self._lock:
+            tokens, updated_at = self._buckets.get(bucket_key, (None, now))
+            tokens = refill(tokens, updated_at, now, rate, burst)
+            outcome, retry_after, slot = ALLOWED, 0.0, None
+            if tokens < 1:
+                outcome, retry_after = RATE_LIMITED, (1 - tokens) / rate
+            elif limit:
+                self._slots = {t: s for t, s in self._slots.items() if s[1] > now}
+                if sum(1 for key, _ in self._slots.values() if key == slot_key) >= limit:
+                    outcome, retry_after = CONCURRENCY_LIMITED, 1.0
+                else:
+                    slot = uuid.uuid4().hex
+                    self._slots[slot] = (slot_key, now + ttl)
+            if outcome == ALLOWED:
+                self._buckets[bucket_key] = (tokens - 1, now)
+            self._counters[(endpoint, outcome)] = self._counters.get((endpoint, outcome), 0) + 1
+            return outcome, retry_after, slot
+
+    def release(self, slot):
+        with self._lock:
+            self._slots.pop(slot, None)
+
+    def in_flight(self, now):
+        with self._lock:
+            counts = {}
+            for key, expires_at in self._slots.values():
+                if expires_at > now:
+                    counts[key] = counts.get(key, 0) + 1
+            return counts
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def prune(self, idle_before, now):
+        with self._lock:
+            self._buckets = {k: b for k, b in self._buckets.items() if b[1] >= idle_before}
+            self._slots = {t: s for t, s in self._slots.items() if s[1] > now}
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._slots.clear()
+            self._counters.clear()
+
+
+class SQLiteLimitStore:
+    """
+    Store shared by every worker on the host through one SQLite file
+
+    Each admission is one short BEGIN IMMEDIATE transaction. Connections are
+    per thread and per process (reopened after a fork); a lock held longer
+    than `timeout` seconds raises LimitStoreError instead of waiting.
+    """
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS bucket ('
+        'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS slot ('
+        'token TEXT PRIMARY KEY, key TEXT NOT NULL, expires_at REAL NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS ix_slot_key ON slot (key, expires_at)',
+        'CREATE TABLE IF NOT EXISTS counter ('
+        'endpoint TEXT NOT NULL, outcome TEXT NOT NULL, count INTEGER NOT NULL, '
+        'PRIMARY KEY (endpoint, outcome))',
+    )
+
+    def __init__(self, path, timeout=0.05):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _transaction(self, work):
+        conn = None
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            result = work(conn)
+            conn.execute('COMMIT')
+            return result
+        except sqlite3.Error as e:
+            raise LimitStoreError(str(e)) from e
+        finally:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+
+    def admit(self, endpoint, bucket_key, rate, burst, slot_key, limit, ttl, now):
+        def work(conn):
+            row = conn.execute('SELECT tokens, updated_at FROM bucket WHERE key = ?',
+                               (bucket_key,)).fetchone()
+            tokens = refill(row[0], row[1], now, rate, burst) if row else float(burst)
+            outcome, retry_after, slot = ALLOWED, 0.0, None
+            if tokens < 1:
+                outcome, retry_after = RATE_LIMITED, (1 - tokens) / rate
+            elif limit:
+                conn.execute('DELETE FROM slot WHERE key = ? AND expires_at <= ?', (slot_key, now))
+                busy = conn.execute('SELECT COUNT(*) FROM slot WHERE key = ?', (slot_key,)).fetchone()[0]
+                if busy >= limit:
+                    outcome, retry_after = CONCURRENCY_LIMITED, 1.0
+                else:
+                    slot = uuid.uuid4().hex
+                    conn.execute('INSERT INTO slot (token, key, expires_at) VALUES (?, ?, ?)',
+                                 (slot, slot_key, now + ttl))
+            if outcome == ALLOWED:
+                conn.execute('INSERT INTO bucket (key, tokens, updated_at) VALUES (?, ?, ?) '
+                             'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, '
+                             'updated_at = excluded.updated_at', (bucket_key, tokens - 1, now))
+            conn.execute('INSERT INTO counter (endpoint, outcome, count) VALUES (?, ?, 1) '
+                         'ON CONFLICT (endpoint, outcome) DO UPDATE SET count = count + 1',
+                         (endpoint, outcome))
+            return outcome, retry_after, slot
+        return self._transaction(work)
+
+    def release(self, slot):
+        self._transaction(lambda conn: conn.execute('DELETE FROM slot WHERE token = ?', (slot,)))
+
+    def in_flight(self, now):
+        rows = self._transaction(lambda conn: conn.execute(
+            'SELECT key, COUNT(*) FROM slot WHERE expires_at > ? GROUP BY key', (now,)).fetchall())
+        return dict(rows)
+
+    def counters(self):
+        rows = self._transaction(lambda conn: conn.execute(
+            'SELECT endpoint, outcome, count FROM counter').fetchall())
+        return {(endpoint, outcome): count for endpoint, outcome, count in rows}
+
+    def prune(self, idle_before, now):
+        def work(conn):
+            conn.execute('DELETE FROM bucket WHERE updated_at < ?', (idle_before,))
+            conn.execute('DELETE FROM slot WHERE expires_at <= ?', (now,))
+        self._transaction(work)
+
+    def clear(self):
+        def work(conn):
+            for table in ('bucket', 'slot', 'counter'):
+                conn.execute(f'DELETE FROM {table}')
+        self._transaction(work)
+
+
+class RateLimiter:
+    """
+    Admission control for the endpoints in RATE_LIMITS
+
+    RATE_LIMITS maps an endpoint to {'per_minute', 'burst', 'concurrency'}:
+    each client may make `per_minute` requests a minute with bursts of up to
+    `burst`, and at most `concurrency` of them run at once across all
+    workers (0 = no concurrency limit). An optional 'key_field' adds that
+    form field to the client key of logged-out requests; those requests also
+    pass a looser per-IP bucket first ('ip_per_minute' / 'ip_burst', default
+    three times the per-client limit), so rotating the field does not lift
+    the limit. Only the listed methods are limited (POST by default), so
+    forms still render under load.
+    """
+
+    PRUNE_INTERVAL = 300
+    IDLE_SECONDS = 3600
+
+    def __init__(self, store, limits, slot_ttl=30):
+        self.store = store
+        self.limits = limits
+        self.slot_ttl = slot_ttl
+        self.store_errors = 0  # this process only: the store cannot record its own failures
+        self._last_prune = 0.0
+
+    @staticmethod
+    def client_key(key_field=None):
+        """
+        user:<id> when logged in (read from the session, no database load),
+        else ip:<addr>, plus the submitted form field named by key_field
+
+        remote_addr is the client's only when TRUSTED_PROXY_COUNT matches the
+        proxies in front of the app; otherwise every client shares the
+        router's address. Keying login on the email as well keeps users
+        behind one NAT (a campus network) out of each other's buckets.
+        """
+        user_id = session.get('_user_id')
+        if user_id:
+            return f'user:{user_id}'
+        key = f'ip:{request.remote_addr or "unknown"}'
+        if key_field:
+            key += f':{key_field}:' + (request.form.get(key_field) or '').strip().lower()[:254]
+        return key
+
+    def check(self, endpoint, method, client, ip_client=None):
+        """
+        Admit or reject one request
+
+        ip_client, when it differs from client, is first checked against the
+        endpoint's per-IP bucket (counted in stats as '<endpoint>:ip').
+
+        Returns: (outcome, retry_after seconds, slot token or None). A store
+        failure admits the request, so a stuck limiter never takes the site
+        down with it.
+        """
+        limit = self.limits.get(endpoint)
+        if limit is None or method not in limit.get('methods', ('POST',)):
+            return ALLOWED, 0.0, None
+
+        now = time.time()
+        try:
+            if now - self._last_prune > self.PRUNE_INTERVAL:
+                self._last_prune = now
+                self.store.prune(now - self.IDLE_SECONDS, now)
+            if ip_client and ip_client != client:
+                outcome, retry_after, _ = self.store.admit(
+                    f'{endpoint}:ip', f'{endpoint}:{ip_client}',
+                    limit.get('ip_per_minute', limit['per_minute'] * 3) / 60.0,
+                    limit.get('ip_burst', limit.get('burst', 1) * 3), endpoint, 0, self.slot_ttl, now)
+                if outcome != ALLOWED:
+                    return outcome, retry_after, None
+            return self.store.admit(endpoint, f'{endpoint}:{client}', limit['per_minute'] / 60.0,
+                                    limit.get('burst', 1), endpoint, limit.get('concurrency', 0),
+                                    self.slot_ttl, now)
+        except LimitStoreError as e:
+            self.store_errors += 1
+            logger.warning('Rate limit store unavailable, admitting %s: %s', endpoint, e)
+            return STORE_ERROR, 0.0, None
+
+    def release(self, slot):
+        try:
+            self.store.release(slot)
+        except LimitStoreError as e:
+            # The slot expires on its own after slot_ttl
+            logger.warning('Could not release concurrency slot: %s', e)
+
+    def stats(self):
+        """{endpoint: {outcome: count, 'in_flight': n}} across all workers sharing the store"""
+        stats = {}
+        for (endpoint, outcome), count in self.store.counters().items():
+            stats.setdefault(endpoint, {})[outcome] = count
+        for endpoint, count in self.store.in_flight(time.time()).items():
+            stats.setdefault(endpoint, {})['in_flight'] = count
+        return stats
+
+
+def get_limiter(app=None):
+    return (app or current_app).extensions.get('rate_limiter')
+
+
+def too_many_requests(retry_after):
+    response = current_app.response_class(
+        'Too many requests right now. Please wait a moment and try again.\n',
+        status=429, mimetype='text/plain')
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def admit_request():
+    """before_request: reject over-limit requests before any other work"""
+    limiter = get_limiter()
+    if limiter is None or request.endpoint not in limiter.limits:
+        return None
+    key_field = limiter.limits[request.endpoint].get('key_field')
+    outcome, retry_after, slot = limiter.check(request.endpoint, request.method,
+                                               RateLimiter.client_key(key_field),
+                                               RateLimiter.client_key() if key_field else None)
+    if outcome in (RATE_LIMITED, CONCURRENCY_LIMITED):
+        return too_many_requests(retry_after)
+    g.rate_limit_slot = slot
+
+
+def release_slot(exc=None):
+    """teardown_request: free the concurrency slot taken by admit_request"""
+    slot = g.pop('rate_limit_slot', None)
+    if slot is not None:
+        get_limiter().release(slot)
+
+
+def build_store(app):
+    storage = app.config.get('RATE_LIMIT_STORAGE')
+    if storage == 'memory':
+        return MemoryLimitStore()
+    if not storage:
+        os.makedirs(app.instance_path, exist_ok=True)
+        storage = os.path.join(app.instance_path, 'ratelimit.db')
+    return SQLiteLimitStore(storage, timeout=app.config.get('RATE_LIMIT_STORE_TIMEOUT', 0.05))
+
+
+@click.group('ratelimit')
+def ratelimit_cli():
+    """Rate limiting commands."""
+
+
+@ratelimit_cli.command('stats')
+def stats_command():
+    """Show admitted and rejected request counts per endpoint."""
+    limiter = get_limiter()
+    if limiter is None:
+        click.echo('Rate limiting is disabled.')
+        return
+    stats = limiter.stats()
+    if not stats:
+        click.echo('No limited requests recorded yet.')
+    for endpoint in sorted(stats):
+        counts = stats[endpoint]
+        click.echo(f"{endpoint}: {counts.get(ALLOWED, 0)} allowed, "
+                   f"{counts.get(RATE_LIMITED, 0)} rate limited, "
+                   f"{counts.get(CONCURRENCY_LIMITED, 0)} concurrency limited, "
+                   f"{counts.get('in_flight', 0)} in flight")
+
+
+@ratelimit_cli.command('reset')
+def reset_command():
+    """Refill every bucket, free every slot and zero the counters."""
+    limiter = get_limiter()
+    if limiter is not None:
+        limiter.store.clear()
+    click.echo('Rate limit state cleared.')
+
+
+def init_rate_limits(app):
+    """
+    Install admission control on the app
+
+    RATE_LIMIT_ENABLED = None (the default) turns it on everywhere except
+    under TESTING, so test clients can log in freely.
+    """
+    app.cli.add_command(ratelimit_cli)
+    enabled = app.config.get('RATE_LIMIT_ENABLED')
+    if enabled is None:
+        enabled = not app.testing
+    if not enabled:
+        return
+
+    app.extensions['rate_limiter'] = RateLimiter(build_store(app), app.config.get('RATE_LIMITS', {}),
+                                                 app.config.get('RATE_LIMIT_SLOT_TTL', 30))
+    # Run first, ahead of the change-bus poll and Flask-Login's user load
+    app.before_request_funcs.setdefault(None, []).insert(0, admit_request)
+    app.teardown_request(release_slot)
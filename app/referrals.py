@@ -0,0 +1,89 @@
+"""
+Referral Workflow for ASCEND
+Mentor decisions on referral requests, applied to any number of requests
+with one set-based UPDATE and one commit
+"""
+
+from datetime import datetime
+
+from app.models import Referral
+from app import db
+
+
+class ReferralManager:
+    """Approve or reject referral requests on behalf of their mentor"""
+
+    ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+    MAX_BULK = 500
+
+    @staticmethod
+    def respond(mentor_id, referral_ids, action, response_text=None, now=None):
+        """
+        Apply one decision to many referrals
+
+        Only referrals that belong to mentor_id and are still 'requested'
+        change; ownership and state are part of the UPDATE's WHERE clause, so
+        a concurrent response or a foreign id can never be overwritten.
+
+        Args:
+            mentor_id: ID of the responding mentor
+            referral_ids: iterable of referral ids
+            action: 'approve' or 'reject'
+            response_text: optional message stored on every updated referral
+            now: timestamp for responded_at (defaults to utcnow)
+
+        Returns:
+            {referral_id: 'approved' | 'rejected' | 'already_responded' | 'not_found'}
+
+        Raises:
+            ValueError: unknown action or too many ids
+        """
+        status = ReferralManager.ACTIONS.get(action)
+        if status is None:
+            raise ValueError(f'Unknown action: {action}')
+
+        ids = sorted({int(i) for i in referral_ids})
+        if len(ids) > ReferralManager.MAX_BULK:
+            raise ValueError(f'At most {ReferralManager.MAX_BULK} referrals per request')
+        if not ids:
+            return {}
+
+        values = {'status': status, 'responded_at': now or datetime.utcnow()}
+        if response_text is not None:
+            values['mentor_response'] = response_text
+
+        table = Referral.__table__
+        stmt = table.update().where(
+            table.c.id.in_(ids),
+            table.c.mentor_id == mentor_id,
+            table.c.status == 'requested'
+        ).values(**values)
+
+        if db.session.get_bind().dialect.update_returning:
+            updated = {row.id for row in db.session.execute(stmt.returning(table.c.id))}
+        else:
+            # Same transaction: the rows matched here are the rows updated below
+            updated = {row.id for row in db.session.execute(
+                db.select(table.c.id).where(stmt.whereclause)
+            )}
+            db.session.execute(stmt)
+
+        results = {referral_id: status for referral_id in updated}
+
+        missing = [i for i in ids if i not in updated]
+        if missing:
+            # Rows owned by someone else are reported as not found
+            owned = dict(db.session.execute(
+                db.select(table.c.id, table.c.status)
+                .where(table.c.id.in_(missing), table.c.mentor_id == mentor_id)
+            ).all())
+            for referral_id in missing:
+                results[referral_id] = 'already_responded' if referral_id in owned else 'not_found'
+
+        db.session.commit()
+        return results
+
+
+def respond_to_referrals(mentor_id, referral_ids, action, response_text=None):
+    """Convenience function for ReferralManager.respond"""
+    return ReferralManager.respond(mentor_id, referral_ids, action, response_text)
@@ -0,0 +1,267 @@
+"""
+Related Questions Index for ASCEND
+Finds similar questions with MinHash signatures and locality-sensitive hashing,
+and stores the candidates per question so pages never compute similarity
+"""
+
+import hashlib
+import random
+import re
+import struct
+from datetime import datetime
+
+from sqlalchemy.orm import joinedload
+
+from app.models import Question, QuestionSignature, LSHBucket, RelatedQuestion
+from app import db
+
+
+class MinHasher:
+    """MinHash signatures over word shingles of question text"""
+
+    NUM_PERM = 64
+    BANDS = 32
+    ROWS = NUM_PERM // BANDS
+
+    # Mersenne prime used for the universal hash family
+    PRIME = (1 << 61) - 1
+    SEED = 1729
+
+    STOPWORDS = frozenset([
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'can', 'do',
+        'for', 'from', 'how', 'i', 'if', 'in', 'is', 'it', 'me', 'my', 'of',
+        'on', 'or', 'should', 'so', 'that', 'the', 'this', 'to', 'was', 'what',
+        'when', 'where', 'which', 'who', 'will', 'with', 'you', 'your'
+    ])
+
+    @staticmethod
+    def shingles(text):
+        """Set of words and word bigrams, ignoring case, punctuation and stopwords"""
+        words = [w for w in re.findall(r'[a-z0-9+#]+', (text or '').lower())
+                 if w not in MinHasher.STOPWORDS]
+        shingles = set(words)
+        shingles.update(f'{a} {b}' for a, b in zip(words, words[1:]))
+        return shingles
+
+    @staticmethod
+    def _hash_token(token):
+        """Stable 64-bit token hash (Python's hash() is salted per process)"""
+        digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+
+    @staticmethod
+    def signature(text):
+        """
+        Compute the MinHash signature of a text
+
+        Returns: list of NUM_PERM ints, or None if the text has no shingles
+        """
+        hashes = [MinHasher._hash_token(s) for s in MinHasher.shingles(text)]
+        if not hashes:
+            return None
+
+        prime = MinHasher.PRIME
+        return [
+            min((a * h + b) % prime for h in hashes)
+            for a, b in MinHasher.PERMUTATIONS
+        ]
+
+    @staticmethod
+    def pack(signature):
+        return struct.pack(f'<{len(signature)}Q', *signature)
+
+    @staticmethod
+    def unpack(data):
+        return list(struct.unpack(f'<{len(data) // 8}Q', data))
+
+    @staticmethod
+    def band_buckets(signature):
+        """Hash each band of the signature into a bucket key"""
+        rows = MinHasher.ROWS
+        buckets = []
+        for band in range(MinHasher.BANDS):
+            chunk = MinHasher.pack(signature[band * rows:(band + 1) * rows])
+            buckets.append((band, hashlib.blake2b(chunk, digest_size=8).hexdigest()))
+        return buckets
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        """Estimated Jaccard similarity of two signatures"""
+        matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return matches / len(sig_a)
+
+
+# (a, b) coefficients of the hash family, seeded so stored signatures stay comparable
+_rng = random.Random(MinHasher.SEED)
+MinHasher.PERMUTATIONS = [
+    (_rng.randrange(1, MinHasher.PRIME), _rng.randrange(0, MinHasher.PRIME))
+    for _ in range(MinHasher.NUM_PERM)
+]
+
+
+class RelatedQuestionIndex:
+    """Maintains the stored related-question candidates"""
+
+    # How many related questions to keep per question
+    LIMIT = 5
+    # Candidates below this estimated similarity are not worth showing
+    MIN_SIMILARITY = 0.15
+
+    @staticmethod
+    def question_text(question):
+        return f'{question.title} {question.body}'
+
+    @staticmethod
+    def remove_question(question_id):
+        """Drop a question's signature, buckets and related rows"""
+        QuestionSignature.query.filter_by(question_id=question_id).delete()
+        LSHBucket.query.filter_by(question_id=question_id).delete()
+        RelatedQuestion.query.filter(
+            (RelatedQuestion.question_id == question_id) |
+            (RelatedQuestion.related_id == question_id)
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def find_candidates(question_id, buckets):
+        """
+        Find questions sharing at least one LSH bucket
+
+        Returns: list of (question_id, signature, status) tuples
+        """
+        bucket_filter = db.or_(*[
+            db.and_(LSHBucket.band == band, LSHBucket.bucket == bucket)
+            for band, bucket in buckets
+        ])
+        candidate_ids = db.session.query(LSHBucket.question_id)\
+            .filter(bucket_filter, LSHBucket.question_id != question_id)\
+            .distinct()
+        rows = db.session.query(
+            QuestionSignature.question_id,
+            QuestionSignature.signature,
+            Question.status
+        ).join(Question, Question.id == QuestionSignature.question_id)\
+            .filter(QuestionSignature.question_id.in_(candidate_ids))\
+            .all()
+
+        return [(qid, MinHasher.unpack(sig), status) for qid, sig, status in rows]
+
+    @staticmethod
+    def add_question(question, commit=True):
+        """
+        Index a question and update the stored candidates
+
+        Every question gets its own list of related answered questions.
+        Answered questions are also offered to the lists of similar questions,
+        so existing pages pick them up without recomputation.
+
+        Returns: list of (related_id, score) stored for this question
+        """
+        RelatedQuestionIndex.remove_question(question.id)
+        # The question page shows this list, so its HTTP validators must move
+        question.updated_at = datetime.utcnow()
+
+        signature = MinHasher.signature(RelatedQuestionIndex.question_text(question))
+        if signature is None:
+            if commit:
+                db.session.commit()
+            return []
+
+        buckets = MinHasher.band_buckets(signature)
+        db.session.add(QuestionSignature(
+            question_id=question.id,
+            signature=MinHasher.pack(signature)
+        ))
+        db.session.add_all(
+            LSHBucket(band=band, bucket=bucket, question_id=question.id)
+            for band, bucket in buckets
+        )
+
+        scored = []
+        for candidate_id, candidate_sig, status in \
+                RelatedQuestionIndex.find_candidates(question.id, buckets):
+            score = MinHasher.similarity(signature, candidate_sig)
+            if score >= RelatedQuestionIndex.MIN_SIMILARITY:
+                scored.append((score, candidate_id, status))
+        scored.sort(key=lambda x: (-x[0], x[1]))
+
+        # This question's own panel only lists answered questions
+        own = [(cid, score) for score, cid, status in scored if status == 'answered']
+        own = own[:RelatedQuestionIndex.LIMIT]
+        db.session.add_all(
+            RelatedQuestion(question_id=question.id, related_id=cid, score=score)
+            for cid, score in own
+        )
+
+        if question.status == 'answered' and scored:
+            RelatedQuestionIndex._offer_to_candidates(
+                question.id, [(cid, score) for score, cid, _ in scored]
+            )
+
+        if commit:
+            db.session.commit()
+
+        return own
+
+    @staticmethod
+    def _offer_to_candidates(question_id, scored):
+        """Insert question_id into each candidate's list if it makes the top LIMIT"""
+        candidate_ids = [cid for cid, _ in scored]
+        existing = {}
+        for row in RelatedQuestion.query.filter(
+                RelatedQuestion.question_id.in_(candidate_ids)).all():
+            existing.setdefault(row.question_id, []).append(row)
+
+        changed = []
+        for cid, score in scored:
+            rows = existing.get(cid, [])
+            if len(rows) >= RelatedQuestionIndex.LIMIT:
+                weakest = min(rows, key=lambda r: r.score)
+                if weakest.score >= score:
+                    continue
+                db.session.delete(weakest)
+            db.session.add(RelatedQuestion(question_id=cid, related_id=question_id, score=score))
+            changed.append(cid)
+        
+        if changed:
+            Question.query.filter(Question.id.in_(changed)).update(
+                {Question.updated_at: datetime.utcnow()}, synchronize_session=False
+            )
+
+    @staticmethod
+    def get_related(question_id, limit=None):
+        """Stored related questions, best first, with the related Question loaded"""
+        return RelatedQuestion.query.filter_by(question_id=question_id)\
+            .options(joinedload(RelatedQuestion.related))\
+            .order_by(RelatedQuestion.score.desc())\
+            .limit(limit or RelatedQuestionIndex.LIMIT)\
+            .all()
+
+    @staticmethod
+    def rebuild():
+        """Rebuild the whole index from scratch (batch operation)"""
+        RelatedQuestion.query.delete()
+        LSHBucket.query.delete()
+        QuestionSignature.query.delete()
+
+        count = 0
+        for question in Question.query.order_by(Question.id).all():
+            RelatedQuestionIndex.add_question(question, commit=False)
+            count += 1
+
+        db.session.commit()
+
+        return count
+
+
+def index_question(question_id):
+    """Convenience function to (re)index a single question"""
+    question = Question.query.get(question_id)
+    if not question:
+        return []
+
+    return RelatedQuestionIndex.add_question(question)
+
+
+def get_related_questions(question_id):
+    """Convenience function to fetch a question's related questions"""
+    return RelatedQuestionIndex.get_related(question_id)
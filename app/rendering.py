@@ -0,0 +1,146 @@
+"""
+Answer Rendering for ASCEND
+Renders Markdown answers to sanitized HTML once per body, storing the result
+on the Response keyed by a hash of the body and the renderer settings
+"""
+
+import hashlib
+import html
+import re
+from urllib.parse import urlparse
+
+import click
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+from markupsafe import Markup
+from sqlalchemy import event
+
+from app.models import Response, ArchivedResponse
+from app import db
+
+
+class SafeLinkTreeprocessor(Treeprocessor):
+    """Drop href/src values whose scheme is not on the allow list"""
+
+    ALLOWED_SCHEMES = ('', 'http', 'https', 'mailto')
+    # Browsers ignore these inside a URL scheme ('java\tscript:' is 'javascript:')
+    IGNORED_CHARS = re.compile(r'[\x00-\x20\x7f]+')
+
+    @classmethod
+    def scheme(cls, value):
+        """The scheme a browser would see: entities decoded (Markdown keeps them), blanks dropped"""
+        return urlparse(cls.IGNORED_CHARS.sub('', html.unescape(value))).scheme.lower()
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ('href', 'src'):
+                value = element.get(attribute)
+                if value is None:
+                    continue
+                if self.scheme(value) not in self.ALLOWED_SCHEMES:
+                    del element.attrib[attribute]
+            if element.tag == 'a' and element.get('href'):
+                element.set('rel', 'nofollow noopener')
+
+
+class SafeMarkdownExtension(Extension):
+    """No raw HTML passthrough, and only safe link targets"""
+
+    def extendMarkdown(self, md):
+        # Raw HTML in the source is escaped as text instead of passed through
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        md.treeprocessors.register(SafeLinkTreeprocessor(md), 'safe_links', 0)
+
+
+class AnswerRenderer:
+    """Markdown -> sanitized HTML, cached per response body"""
+
+    # Bump when EXTENSIONS or the sanitizer change; `flask answers rerender`
+    # then refreshes every stored rendering
+    VERSION = 2
+    EXTENSIONS = ('fenced_code', 'tables', 'sane_lists', 'nl2br')
+
+    @staticmethod
+    def content_hash(body):
+        key = f'{AnswerRenderer.VERSION}:{body or ""}'.encode('utf-8')
+        return hashlib.sha256(key).hexdigest()
+
+    @staticmethod
+    def render(body):
+        md = markdown.Markdown(extensions=list(AnswerRenderer.EXTENSIONS) + [SafeMarkdownExtension()])
+        return md.convert(body or '')
+
+    @staticmethod
+    def refresh(response):
+        """Re-render only if the body (or renderer version) changed; returns True if it did"""
+        body_hash = AnswerRenderer.content_hash(response.body)
+        if response.body_hash == body_hash and response.body_html is not None:
+            return False
+        response.body_html = AnswerRenderer.render(response.body)
+        response.body_hash = body_hash
+        return True
+
+    @staticmethod
+    def html(response):
+        """Stored HTML when current, else rendered on the fly (GETs never write)"""
+        if response.body_html is not None and \
+                response.body_hash == AnswerRenderer.content_hash(response.body):
+            return Markup(response.body_html)
+        return Markup(AnswerRenderer.render(response.body))
+
+    @staticmethod
+    def rerender_all(batch_size=500, force=False):
+        """
+        Refresh stored HTML for every hot and archived response
+
+        Returns: number of responses re-rendered
+        """
+        rendered = 0
+        for model in (Response, ArchivedResponse):
+            last_id = 0
+            while True:
+                batch = model.query.filter(model.id > last_id)\
+                    .order_by(model.id).limit(batch_size).all()
+                if not batch:
+                    break
+                for response in batch:
+                    if force:
+                        response.body_hash = None
+                    rendered += AnswerRenderer.refresh(response)
+                last_id = batch[-1].id
+                db.session.commit()
+        return rendered
+
+
+def render_on_write(mapper, connection, target):
+    """before_insert/before_update: keep body_html in step with body"""
+    AnswerRenderer.refresh(target)
+
+
+@click.group('answers')
+def answers_cli():
+    """Answer rendering commands."""
+
+
+@answers_cli.command('rerender')
+@click.option('--force', is_flag=True, help='Re-render even if the stored hash is current.')
+def rerender_command(force):
+    """Re-render stored answer HTML (after changing renderer settings)."""
+    rendered = AnswerRenderer.rerender_all(force=force)
+    click.echo(f'Re-rendered {rendered} answers')
+
+
+_registered = False
+
+
+def init_rendering(app):
+    """Register the render-on-write hooks, the template filter and CLI commands"""
+    global _registered
+    if not _registered:
+        for name in ('before_insert', 'before_update'):
+            event.listen(Response, name, render_on_write)
+        _registered = True
+    app.add_template_filter(AnswerRenderer.html, 'answer_html')
+    app.cli.add_command(answers_cli)
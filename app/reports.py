@@ -0,0 +1,206 @@
+"""
+PDF Reports for ASCEND
+Per-mentor impact reports and the admin platform report. Report HTML is
+built from the database in the request, then converted to PDF in the
+pdf_pool worker processes; PDFs are cached on disk by a hash of their HTML,
+so an unchanged report is never converted twice.
+"""
+
+import hashlib
+import os
+
+import click
+from flask import current_app, render_template, send_file
+
+from app.models import User, Student, Alumni, Company, Question, Response
+from app.analytics import FeedbackRollups
+from app.archive import ArchiveManager
+from app.sla import SLATracker
+from app.trust_calculator import TrustSnapshots, TrustCalculator
+from app.pdf import pdf_pool, PDF_STYLE
+from app import db
+
+
+class ReportBuilder:
+    """Template context and HTML for each report kind"""
+
+    KINDS = ('mentor_impact', 'platform')
+    OUTCOMES = ('helpful', 'got_interview', 'got_referral', 'not_helpful')
+
+    @staticmethod
+    def mentor_impact_context(alumni_id):
+        """Everything the mentor impact report shows, or None for an unknown mentor"""
+        alumni = db.session.get(Alumni, alumni_id)
+        if alumni is None:
+            return None
+
+        by_company = {}
+        for row in FeedbackRollups.outcomes_by_company(period='week', mentor_id=alumni_id):
+            name = row['company_name'] or 'General'
+            counts = by_company.setdefault(name, dict.fromkeys(ReportBuilder.OUTCOMES, 0))
+            counts[row['outcome']] = counts.get(row['outcome'], 0) + row['count']
+
+        snapshot = TrustSnapshots.latest(alumni_id)
+        trust_score = alumni.trust_score or 0
+        return {
+            'mentor': alumni,
+            'name': alumni.user.name if alumni.user else f'Mentor #{alumni.id}',
+            'company': db.session.get(Company, alumni.current_company_id) if alumni.current_company_id else None,
+            'trust_score': trust_score,
+            'trust_badge': snapshot.badge if snapshot else TrustCalculator.get_trust_badge(trust_score),
+            'trust': snapshot,
+            'answered_count': Response.query.filter_by(mentor_id=alumni_id).count() +
+                ArchiveManager.archived_answer_count(alumni_id),
+            'outcomes': ReportBuilder.OUTCOMES,
+            'by_company': sorted(by_company.items()),
+        }
+
+    @staticmethod
+    def platform_context():
+        """Platform-wide counts, outcomes, SLA and top mentors"""
+        totals = FeedbackRollups.outcome_totals()
+        top_mentors = db.session.query(User.name, Company.name, Alumni.trust_score)\
+            .join(Alumni, Alumni.user_id == User.id)\
+            .outerjoin(Company, Company.id == Alumni.current_company_id)\
+            .filter(Alumni.is_verified == True)\
+            .order_by(Alumni.trust_score.desc(), Alumni.id)\
+            .limit(10).all()
+
+        return {
+            'student_count': Student.query.count(),
+            'alumni_count': Alumni.query.count(),
+            'verified_alumni_count': Alumni.query.filter_by(is_verified=True).count(),
+            'question_count': Question.query.count() + ArchiveManager.archived_question_count(),
+            'pending_count': Question.query.filter_by(status='pending').count(),
+            'sla_breached': SLATracker.total_breached(),
+            'sla_companies': SLATracker.worst_companies(10),
+            'outcome_totals': [(outcome, totals.get(outcome, (0, 0, 0))[0])
+                               for outcome in ReportBuilder.OUTCOMES],
+            'top_mentors': top_mentors,
+        }
+
+    @staticmethod
+    def render_html(kind, context):
+        return render_template(f'reports/{kind}.html', pdf_style=PDF_STYLE, **context)
+
+
+class ReportCache:
+    """Content-addressed PDF files under REPORTS_DIR"""
+
+    # Bump when the PDF styling changes without the HTML changing
+    VERSION = 1
+
+    @staticmethod
+    def directory():
+        path = current_app.config.get('REPORTS_DIR') or \
+            os.path.join(current_app.instance_path, 'reports')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def content_hash(html):
+        return hashlib.sha256(f'{ReportCache.VERSION}:{html}'.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def path(kind, digest):
+        return os.path.join(ReportCache.directory(), f'{kind}-{digest}.pdf')
+
+    @staticmethod
+    def get(kind, html):
+        """
+        Cached PDF for this HTML, converting it first if needed
+
+        Returns: (path, digest)
+        Raises: PDFError if conversion fails
+        """
+        digest = ReportCache.content_hash(html)
+        path = ReportCache.path(kind, digest)
+        if not os.path.exists(path):
+            pdf_pool.render(html, path)
+        return path, digest
+
+    @staticmethod
+    def get_many(kind, documents):
+        """
+        Convert several reports in parallel
+
+        Args: documents: {key: html}
+        Returns: {key: (path, digest)}
+        """
+        results, futures = {}, []
+        for key, html in documents.items():
+            digest = ReportCache.content_hash(html)
+            path = ReportCache.path(kind, digest)
+            if not os.path.exists(path):
+                future = pdf_pool.submit(html, path)
+                if future is not None:
+                    futures.append(future)
+            results[key] = (path, digest)
+        for future in futures:
+            pdf_pool.wait(future)
+        return results
+
+    @staticmethod
+    def prune(keep):
+        """Delete cached PDFs not in keep (a set of paths); returns the number deleted"""
+        deleted = 0
+        directory = ReportCache.directory()
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith('.pdf') and path not in keep:
+                os.remove(path)
+                deleted += 1
+        return deleted
+
+
+def mentor_report(alumni_id):
+    """(path, digest) of a mentor's impact report, or None for an unknown mentor"""
+    context = ReportBuilder.mentor_impact_context(alumni_id)
+    if context is None:
+        return None
+    return ReportCache.get('mentor_impact', ReportBuilder.render_html('mentor_impact', context))
+
+
+def platform_report():
+    """(path, digest) of the admin platform report"""
+    return ReportCache.get('platform', ReportBuilder.render_html('platform', ReportBuilder.platform_context()))
+
+
+def send_report(path, digest, download_name):
+    """Stream a cached PDF from disk; If-None-Match on the content hash gets a 304"""
+    return send_file(path, mimetype='application/pdf', as_attachment=True,
+                     download_name=download_name, etag=digest, conditional=True, max_age=0)
+
+
+@click.group('reports')
+def reports_cli():
+    """PDF report commands."""
+
+
+@reports_cli.command('generate')
+def generate_command():
+    """Pre-render every verified mentor's impact report and the platform report."""
+    documents = {}
+    for (alumni_id,) in db.session.query(Alumni.id).filter(Alumni.is_verified == True):
+        context = ReportBuilder.mentor_impact_context(alumni_id)
+        documents[alumni_id] = ReportBuilder.render_html('mentor_impact', context)
+    current = ReportCache.get_many('mentor_impact', documents)
+    current['platform'] = platform_report()
+    click.echo(f'{len(current)} reports up to date in {ReportCache.directory()}')
+
+
+@reports_cli.command('prune')
+def prune_command():
+    """Delete cached PDFs that no longer match current report content."""
+    keep = {platform_report()[0]}
+    for (alumni_id,) in db.session.query(Alumni.id):
+        context = ReportBuilder.mentor_impact_context(alumni_id)
+        html = ReportBuilder.render_html('mentor_impact', context)
+        keep.add(ReportCache.path('mentor_impact', ReportCache.content_hash(html)))
+    click.echo(f'Deleted {ReportCache.prune(keep)} stale reports')
+
+
+def init_reports(app):
+    """Configure the PDF pool and register the reports CLI commands"""
+    pdf_pool.init_app(app)
+    app.cli.add_command(reports_cli)
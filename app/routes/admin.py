@@ -1,7 +1,15 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
+from datetime import date
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, current_app, \
+    stream_with_context
 from flask_login import login_required, current_user
 from app import db
 from app.models import User, Student, Alumni, Question
+from app.matching import industry_index
+from app.sla import SLATracker
+from app.archive import ArchiveManager
+from app.reports import mentor_report, platform_report, send_report
+from app.pdf import PDFError
+from app.exports import ExportManager
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -17,11 +25,13 @@ def dashboard():
     student_count = Student.query.count()
     alumni_count = Alumni.query.count()
     verified_alumni_count = Alumni.query.filter_by(is_verified=True).count()
-    question_count = Question.query.count()
+    question_count = Question.query.count() + ArchiveManager.archived_question_count()
     
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
     
     return render_template('admin/dashboard.html', 
+                           sla_breached=SLATracker.total_breached(),
+                           sla_companies=SLATracker.worst_companies(),
                            student_count=student_count,
                            alumni_count=alumni_count,
                            verified_alumni_count=verified_alumni_count,
@@ -38,6 +48,7 @@ def approve_alumni(id):
     alumni = Alumni.query.get_or_404(id)
     alumni.is_verified = True
     db.session.commit()
+    industry_index.update_mentor(alumni)
     flash(f'Alumni {alumni.user.name} has been verified.', 'success')
     return redirect(url_for('admin.user_list'))
 
@@ -46,5 +57,43 @@ def revoke_alumni(id):
     alumni = Alumni.query.get_or_404(id)
     alumni.is_verified = False
     db.session.commit()
+    industry_index.update_mentor(alumni)
     flash(f'Alumni {alumni.user.name} verification revoked.', 'warning')
     return redirect(url_for('admin.user_list'))
+
+@bp.route('/reports/platform.pdf')
+def platform_pdf():
+    try:
+        path, digest = platform_report()
+    except (PDFError, TimeoutError):
+        current_app.logger.exception('Platform report failed')
+        flash('The report could not be generated right now. Please try again later.', 'danger')
+        return redirect(url_for('admin.dashboard'))
+    return send_report(path, digest, 'ascend-platform-report.pdf')
+
+@bp.route('/reports/mentor/<int:id>.pdf')
+def mentor_pdf(id):
+    try:
+        report = mentor_report(id)
+    except (PDFError, TimeoutError):
+        current_app.logger.exception('Impact report failed for mentor %s', id)
+        flash('The report could not be generated right now. Please try again later.', 'danger')
+        return redirect(url_for('admin.user_list'))
+    if report is None:
+        abort(404)
+    path, digest = report
+    return send_report(path, digest, f'ascend-impact-report-{id}.pdf')
+
+@bp.route('/export/<any(questions, responses, feedback, referrals):kind>.<any(csv, jsonl):fmt>')
+def export(kind, fmt):
+    """Streamed download; ?from=YYYY-MM-DD&to=YYYY-MM-DD&company_id=N narrow it"""
+    try:
+        chunks = ExportManager.stream(kind, fmt, **ExportManager.parse_filters(request.args))
+    except ValueError as error:
+        abort(400, description=str(error))
+
+    response = current_app.response_class(stream_with_context(chunks),
+                                          mimetype=ExportManager.FORMATS[fmt])
+    response.headers['Content-Disposition'] = \
+        f'attachment; filename="ascend-{kind}-{date.today().isoformat()}.{fmt}"'
+    return response
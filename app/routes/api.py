@@ -0,0 +1,402 @@
+from datetime import date, datetime
+
+from flask import Blueprint, jsonify, request
+from flask_login import current_user
+
+from app import db
+from app.models import Company, Question, Response, Referral, ArchivedQuestion
+from app.queries import (
+    QUESTION_FIELDS, RESPONSE_FIELDS, REFERRAL_FIELDS,
+    question_rows, response_rows, referral_rows, student_question_counts,
+    archived_question_rows, encode_cursor, decode_cursor
+)
+from app.trust_calculator import TrustCalculator
+from app.analytics import FeedbackRollups
+from app.referrals import ReferralManager
+from app.archive import ArchiveManager
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+MAX_LIMIT = 100
+DEFAULT_LIMIT = 20
+MAX_BATCH = 10
+# Marks knowledge_base cursors that continue into the archive ('.' is not base64url)
+ARCHIVE_CURSOR = 'archived.'
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@bp.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({'error': error.message}), error.status
+
+
+@bp.before_request
+def require_login():
+    # JSON 401 instead of the login page redirect
+    if not current_user.is_authenticated:
+        return jsonify({'error': 'Authentication required.'}), 401
+
+
+def require_role(role):
+    if current_user.role != role:
+        raise ApiError('Access denied.', 403)
+
+
+def serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def parse_fields(params, allowed, default):
+    """Sparse fieldsets: ?fields=a,b -> ['a', 'b'], validated against allowed"""
+    raw = params.get('fields')
+    if not raw:
+        return list(default)
+
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit(params):
+    try:
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        raise ApiError('limit must be an integer')
+    return max(1, min(MAX_LIMIT, limit))
+
+
+def parse_date(params, key):
+    raw = params.get(key)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ApiError(f'{key} must be a YYYY-MM-DD date')
+
+
+def parse_cursor(cursor):
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise ApiError('Invalid cursor')
+
+
+def cursor_page(query, fields, created_col, id_col, params, descending=True):
+    """
+    Keyset pagination over (created_col, id_col)
+
+    Returns: {'items': [...], 'next_cursor': str or None}
+    """
+    limit = parse_limit(params)
+    query = query.add_columns(created_col.label('_cursor_at'), id_col.label('_cursor_id'))
+
+    if params.get('cursor'):
+        at, row_id = parse_cursor(params['cursor'])
+        if descending:
+            query = query.filter(db.or_(created_col < at, db.and_(created_col == at, id_col < row_id)))
+        else:
+            query = query.filter(db.or_(created_col > at, db.and_(created_col == at, id_col > row_id)))
+
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col, id_col)
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]._cursor_at, rows[-1]._cursor_id)
+
+    return {
+        'items': rows_to_dicts(rows, fields),
+        'next_cursor': next_cursor
+    }
+
+
+def rows_to_dicts(rows, fields):
+    return [{f: serialize(getattr(row, f)) for f in fields} for row in rows]
+
+
+# ---------- Resources ----------
+
+QUESTION_DEFAULT = ('id', 'title', 'category', 'urgency', 'status', 'created_at', 'company_name')
+KNOWLEDGE_BASE_DEFAULT = QUESTION_DEFAULT + ('answered_by',)
+RESPONSE_DEFAULT = ('id', 'question_id', 'question_title', 'created_at', 'mentor_name')
+REFERRAL_DEFAULT = ('id', 'status', 'company_name', 'student_name', 'mentor_name',
+                    'requested_at', 'responded_at')
+STUDENT_DASHBOARD_KEYS = ('question_count', 'answered_count', 'pending_count',
+                          'companies', 'recent_responses')
+MENTOR_DASHBOARD_KEYS = ('pending_count', 'answered_count', 'trust_score', 'trust_badge',
+                         'is_accepting', 'open_assignments', 'recent_responses')
+
+
+def student_dashboard(params):
+    require_role('student')
+    student_id = current_user.student_profile.id
+    keys = parse_fields(params, STUDENT_DASHBOARD_KEYS, STUDENT_DASHBOARD_KEYS)
+    data = {}
+
+    if {'question_count', 'answered_count', 'pending_count'} & set(keys):
+        total, answered = student_question_counts(student_id)
+        data.update(question_count=total, answered_count=answered, pending_count=total - answered)
+    if 'companies' in keys:
+        companies = db.session.query(Company.id, Company.name, Company.industry).limit(5).all()
+        data['companies'] = rows_to_dicts(companies, ('id', 'name', 'industry'))
+    if 'recent_responses' in keys:
+        rows = response_rows(RESPONSE_DEFAULT, Question.student_id == student_id)\
+            .order_by(Response.created_at.desc()).limit(3).all()
+        data['recent_responses'] = rows_to_dicts(rows, RESPONSE_DEFAULT)
+
+    return {k: data[k] for k in keys}
+
+
+def mentor_dashboard(params):
+    require_role('alumni')
+    alumni = current_user.alumni_profile
+    keys = parse_fields(params, MENTOR_DASHBOARD_KEYS, MENTOR_DASHBOARD_KEYS)
+    data = {
+        'trust_score': alumni.trust_score,
+        'trust_badge': TrustCalculator.get_trust_badge(alumni.trust_score or 0),
+        'is_accepting': alumni.is_accepting_questions,
+        'open_assignments': alumni.open_assignments or 0,
+    }
+
+    if 'pending_count' in keys:
+        data['pending_count'] = Question.query.filter_by(
+            company_id=alumni.current_company_id, status='pending'
+        ).count()
+    if 'answered_count' in keys:
+        data['answered_count'] = Response.query.filter_by(mentor_id=alumni.id).count() + \
+            ArchiveManager.archived_answer_count(alumni.id)
+    if 'recent_responses' in keys:
+        rows = response_rows(RESPONSE_DEFAULT, Response.mentor_id == alumni.id)\
+            .order_by(Response.created_at.desc()).limit(5).all()
+        data['recent_responses'] = rows_to_dicts(rows, RESPONSE_DEFAULT)
+
+    return {k: data[k] for k in keys}
+
+
+def mentor_queue(params):
+    """Pending questions, oldest first (the queue's FIFO order)"""
+    require_role('alumni')
+    fields = parse_fields(params, QUESTION_FIELDS, QUESTION_DEFAULT)
+    filters = [Question.status == 'pending']
+    if params.get('company_id'):
+        filters.append(Question.company_id == params.get('company_id'))
+
+    return cursor_page(question_rows(fields, *filters), fields,
+                       Question.created_at, Question.id, params, descending=False)
+
+
+def knowledge_base(params):
+    """
+    Answered questions, newest first, optionally searched with q
+
+    Hot questions come first, then archived ones (see app.archive); a
+    cursor starting with ARCHIVE_CURSOR pages through the archive.
+    """
+    fields = parse_fields(params, QUESTION_FIELDS, KNOWLEDGE_BASE_DEFAULT)
+    limit = parse_limit(params)
+    cursor = params.get('cursor') or ''
+    hot_filters = [Question.status == 'answered']
+    cold_filters = []
+    if params.get('q'):
+        q = params.get('q')
+        hot_filters.append(Question.title.contains(q) | Question.body.contains(q))
+        cold_filters.append(ArchivedQuestion.title.contains(q) | ArchivedQuestion.body.contains(q))
+
+    if cursor.startswith(ARCHIVE_CURSOR):
+        cursor = cursor[len(ARCHIVE_CURSOR):]
+        page = {'items': [], 'next_cursor': None}
+    else:
+        page = cursor_page(question_rows(fields, *hot_filters), fields,
+                           Question.created_at, Question.id, dict(params, limit=limit))
+        if page['next_cursor']:
+            return page
+        cursor = ''
+
+    remaining = limit - len(page['items'])
+    cold = archived_question_rows(fields, *cold_filters)
+    if not remaining:
+        # The hot page ended exactly at the limit; continue from the archive's start
+        if cold.first() is not None:
+            page['next_cursor'] = ARCHIVE_CURSOR
+        return page
+
+    archived = cursor_page(cold, fields, ArchivedQuestion.created_at, ArchivedQuestion.id,
+                           dict(params, limit=remaining, cursor=cursor))
+    page['items'] += archived['items']
+    if archived['next_cursor']:
+        page['next_cursor'] = ARCHIVE_CURSOR + archived['next_cursor']
+    return page
+
+
+def referrals(params):
+    """The current student's requests, or the current mentor's inbox"""
+    fields = parse_fields(params, REFERRAL_FIELDS, REFERRAL_DEFAULT)
+    if current_user.role == 'student':
+        filters = [Referral.student_id == current_user.student_profile.id]
+    elif current_user.role == 'alumni':
+        filters = [Referral.mentor_id == current_user.alumni_profile.id]
+    else:
+        raise ApiError('Access denied.', 403)
+    if params.get('status'):
+        filters.append(Referral.status == params.get('status'))
+
+    return cursor_page(referral_rows(fields, *filters), fields,
+                       Referral.requested_at, Referral.id, params)
+
+
+def feedback_trends(params):
+    """
+    Feedback outcomes per company per day/week, answered from rollups only
+
+    Admins see every mentor; a mentor sees their own feedback.
+    """
+    if current_user.role == 'admin':
+        mentor_id = None
+    elif current_user.role == 'alumni':
+        mentor_id = current_user.alumni_profile.id
+    else:
+        raise ApiError('Access denied.', 403)
+
+    period = params.get('period', 'week')
+    if period not in FeedbackRollups.PERIODS:
+        raise ApiError(f"period must be one of: {', '.join(FeedbackRollups.PERIODS)}")
+    try:
+        company_id = int(params['company_id']) if params.get('company_id') else None
+    except ValueError:
+        raise ApiError('company_id must be an integer')
+
+    rows = FeedbackRollups.outcomes_by_company(
+        period=period,
+        start=parse_date(params, 'from'),
+        end=parse_date(params, 'to'),
+        company_id=company_id,
+        mentor_id=mentor_id,
+        outcome=params.get('outcome')
+    )
+    return {
+        'period': period,
+        'items': [{k: serialize(v) for k, v in row.items()} for row in rows]
+    }
+
+
+RESOURCES = {
+    'student_dashboard': student_dashboard,
+    'mentor_dashboard': mentor_dashboard,
+    'mentor_queue': mentor_queue,
+    'knowledge_base': knowledge_base,
+    'referrals': referrals,
+    'feedback_trends': feedback_trends,
+}
+
+
+# ---------- Routes ----------
+
+@bp.route('/student/dashboard')
+def get_student_dashboard():
+    return jsonify(student_dashboard(request.args))
+
+
+@bp.route('/mentor/dashboard')
+def get_mentor_dashboard():
+    return jsonify(mentor_dashboard(request.args))
+
+
+@bp.route('/mentor/queue')
+def get_mentor_queue():
+    return jsonify(mentor_queue(request.args))
+
+
+@bp.route('/knowledge_base')
+def get_knowledge_base():
+    return jsonify(knowledge_base(request.args))
+
+
+@bp.route('/referrals')
+def get_referrals():
+    return jsonify(referrals(request.args))
+
+
+@bp.route('/referrals/bulk', methods=['POST'])
+def bulk_referrals():
+    """
+    Approve or reject many referrals at once
+
+    Body: {"ids": [1, 2], "action": "approve", "response": "optional message"}
+    Returns: {"results": {"1": "approved", "2": "not_found"}, "updated": 1}
+    """
+    require_role('alumni')
+    payload = request.get_json(silent=True) or {}
+    ids = payload.get('ids')
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        raise ApiError('ids must be a list of integers')
+    response_text = payload.get('response')
+    if response_text is not None and not isinstance(response_text, str):
+        raise ApiError('response must be a string')
+
+    try:
+        results = ReferralManager.respond(current_user.alumni_profile.id, ids,
+                                          payload.get('action'), response_text)
+    except ValueError as error:
+        raise ApiError(str(error))
+
+    return jsonify({
+        'results': {str(k): v for k, v in sorted(results.items())},
+        'updated': sum(1 for v in results.values() if v in ('approved', 'rejected'))
+    })
+
+
+@bp.route('/analytics/feedback')
+def get_feedback_trends():
+    return jsonify(feedback_trends(request.args))
+
+
+@bp.route('/batch', methods=['POST'])
+def batch():
+    """
+    Several resources in one round trip
+
+    Body: {"requests": [{"id": "kb", "resource": "knowledge_base", "params": {...}}]}
+    Returns: {"responses": {"kb": {"status": 200, "data": {...}}}}
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        raise ApiError('Body must be a JSON object')
+    items = payload.get('requests')
+    if not isinstance(items, list) or not items:
+        raise ApiError('requests must be a non-empty list')
+    if len(items) > MAX_BATCH:
+        raise ApiError(f'At most {MAX_BATCH} requests per batch')
+
+    responses = {}
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        key = str(item.get('id', index))
+        handler = RESOURCES.get(item.get('resource'))
+        if handler is None:
+            responses[key] = {'status': 404, 'error': f"Unknown resource: {item.get('resource')}"}
+            continue
+        params = item.get('params') or {}
+        try:
+            if not isinstance(params, dict):
+                raise ApiError('params must be an object')
+            params = {k: str(v) for k, v in params.items()}
+            responses[key] = {'status': 200, 'data': handler(params)}
+        except ApiError as error:
+            responses[key] = {'status': error.status, 'error': error.message}
+
+    return jsonify({'responses': responses})
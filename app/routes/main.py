@@ -1,11 +1,27 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from datetime import datetime
+import time
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, \
+    current_app, stream_with_context
 from flask_login import login_required, current_user
 from app import db
 from app.models import User, Student, Alumni, Company, Question, Response, Feedback, Referral
-from app.trust_calculator import submit_question_feedback
+from app.trust_calculator import submit_question_feedback, TrustCalculator, TrustSnapshots
+from app.sla import SLATracker
+from app.referrals import ReferralManager
+from app.queries import REFERRAL_STATUSES, referral_page, referral_status_counts, student_question_counts
+from app.archive import ArchiveManager
+from app.related_questions import index_question, get_related_questions
+from app.matching import industry_index
+from app.queue_manager import AssignmentManager
+from app.http_cache import make_etag, not_modified, with_validators
+from app.events import event_bus, company_topic, mentor_topic, ALL_QUESTIONS_TOPIC, format_sse
+from app.reports import mentor_report, send_report
+from app.pdf import PDFError
 
 bp = Blueprint('main', __name__)
 
+REFERRALS_PER_PAGE = 20
+
 @bp.route('/')
 def index():
     return redirect(url_for('auth.login'))
@@ -18,8 +34,7 @@ def student_dashboard():
         return render_template('main/student_dashboard.html') # Placeholder if alumni logs in
     
     # Fetch Data for Dashboard
-    question_count = Question.query.filter_by(student_id=current_user.student_profile.id).count()
-    answered_count = Question.query.filter_by(student_id=current_user.student_profile.id, status='answered').count()
+    question_count, answered_count = student_question_counts(current_user.student_profile.id)
     companies = Company.query.limit(5).all()
     recent_responses = Response.query.join(Question).filter(Question.student_id == current_user.student_profile.id).order_by(Response.created_at.desc()).limit(3).all()
 
@@ -42,13 +57,30 @@ def knowledge_base():
     page = request.args.get('page', 1, type=int)
     query = request.args.get('q')
     
-    if query:
-        # Simple search implementation
-        questions = Question.query.filter(Question.title.contains(query) | Question.body.contains(query)).filter_by(status='answered').paginate(page=page, per_page=10)
-    else:
-        questions = Question.query.filter_by(status='answered').order_by(Question.created_at.desc()).paginate(page=page, per_page=10)
-        
-    return render_template('main/knowledge_base.html', questions=questions)
+    # Any change to an answered question moves these stamps, and so does
+    # renaming (or deleting) a company or user, whose names the cards show
+    stamps = db.session.query(
+        db.select(db.func.max(Question.updated_at))
+            .where(Question.status == 'answered').scalar_subquery(),
+        db.select(db.func.max(Company.updated_at)).scalar_subquery(),
+        db.select(db.func.max(User.updated_at)).scalar_subquery(),
+        db.select(db.func.count(Company.id)).scalar_subquery(),
+        db.select(db.func.count(User.id)).scalar_subquery(),
+    ).one()
+    last_modified = max((stamp for stamp in stamps[:3] if stamp is not None), default=None)
+    etag = make_etag('knowledge_base', current_user.id, page, query, *stamps,
+                     ArchiveManager.version())
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
+    # Hot questions first, then the archive (see app.archive)
+    questions = ArchiveManager.knowledge_base_page(page, per_page=10, search=query)
+    
+    return with_validators(
+        render_template('main/knowledge_base.html', questions=questions),
+        etag, last_modified
+    )
 
 @bp.route('/ask_question', methods=['GET', 'POST'])
 @login_required
@@ -70,6 +102,7 @@ def ask_question():
         )
         db.session.add(question)
         db.session.commit()
+        index_question(question.id)
         flash('Your question has been submitted successfully!', 'success')
         return redirect(url_for('main.student_dashboard'))
         
@@ -79,8 +112,26 @@ def ask_question():
 @bp.route('/question/<int:id>')
 @login_required
 def view_question(id):
-    question = Question.query.get_or_404(id)
-    return render_template('questions/view.html', question=question)
+    stamp = ArchiveManager.question_stamp(id)
+    if stamp is None:
+        abort(404)
+    last_modified, archived = stamp
+    # Answers and mentor details have no timestamp of their own, so only the
+    # ETag (which hashes them) may answer 304; If-Modified-Since alone is ignored
+    etag = make_etag('question', id, current_user.id, last_modified,
+                     ArchiveManager.answers_stamp(id, archived))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    # Archived questions read through to cold storage and have no related index
+    question = ArchiveManager.get_question(id)
+    related_questions = [] if archived else get_related_questions(id)
+    return with_validators(
+        render_template('questions/view.html', question=question,
+                        related_questions=related_questions),
+        etag, last_modified
+    )
 
 @bp.route('/mentor_queue')
 @login_required
@@ -94,6 +145,42 @@ def mentor_queue():
     questions = Question.query.filter_by(status='pending').all()
     return render_template('main/mentor_queue.html', questions=questions)
 
+@bp.route('/mentor/events')
+@login_required
+def mentor_events():
+    """Server-sent events: queue changes for the mentor's company and their feedback"""
+    if current_user.role != 'alumni':
+        abort(403)
+    
+    alumni = current_user.alumni_profile
+    topics = [company_topic(alumni.current_company_id), mentor_topic(alumni.id)]
+    if request.args.get('scope') == 'all':
+        # The queue page lists every pending question, not just this company's
+        topics.append(ALL_QUESTIONS_TOPIC)
+    
+    heartbeat = current_app.config['SSE_HEARTBEAT_SECONDS']
+    deadline = time.monotonic() + current_app.config['SSE_MAX_STREAM_SECONDS']
+    
+    def stream():
+        # Subscribe only once the response is iterated, so a response that is
+        # never sent (client gone, error in a later handler) leaves no subscriber
+        subscription = event_bus.subscribe(topics)
+        try:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            while time.monotonic() < deadline:
+                payload = subscription.get(timeout=heartbeat)
+                yield format_sse(payload) if payload else ': keep-alive\n\n'
+        finally:
+            subscription.close()
+    
+    # Release the DB connection; the stream never touches the database
+    db.session.remove()
+    
+    response = current_app.response_class(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @bp.route('/mentor_dashboard')
 @login_required
 def mentor_dashboard():
@@ -109,16 +196,15 @@ def mentor_dashboard():
         status='pending'
     ).count()
     
-    answered_count = Response.query.filter_by(mentor_id=alumni.id).count()
+    answered_count = Response.query.filter_by(mentor_id=alumni.id).count() + \
+        ArchiveManager.archived_answer_count(alumni.id)
     
-    # Get trust badge
-    trust_score = alumni.trust_score
-    if trust_score >= 75:
-        trust_badge = 'Gold'
-    elif trust_score >= 50:
-        trust_badge = 'Silver'
-    else:
-        trust_badge = 'Bronze'
+    overdue_count = SLATracker.breached_count(alumni.current_company_id)
+    
+    # Score, badge and breakdown come from the latest trust snapshot
+    trust = TrustSnapshots.latest(alumni.id)
+    trust_score = alumni.trust_score or 0
+    trust_badge = trust.badge if trust else TrustCalculator.get_trust_badge(trust_score)
     
     # Recent responses
     recent_responses = Response.query.filter_by(mentor_id=alumni.id)\
@@ -129,9 +215,28 @@ def mentor_dashboard():
                          answered_count=answered_count,
                          trust_score=trust_score,
                          trust_badge=trust_badge,
+                         trust=trust,
+                         overdue_count=overdue_count,
                          is_accepting=alumni.is_accepting_questions,
                          recent_responses=recent_responses)
 
+@bp.route('/mentor/report.pdf')
+@login_required
+def mentor_impact_report():
+    if current_user.role != 'alumni':
+        flash('Access denied.', 'danger')
+        return redirect(url_for('main.student_dashboard'))
+    
+    alumni = current_user.alumni_profile
+    try:
+        path, digest = mentor_report(alumni.id)
+    except (PDFError, TimeoutError):
+        current_app.logger.exception('Impact report failed for mentor %s', alumni.id)
+        flash('The report could not be generated right now. Please try again later.', 'danger')
+        return redirect(url_for('main.mentor_dashboard'))
+    
+    return send_report(path, digest, 'ascend-impact-report.pdf')
+
 @bp.route('/answer_question/<int:id>', methods=['GET'])
 @login_required
 def answer_question(id):
@@ -165,10 +270,19 @@ def submit_answer(id):
     
     # Update question status
     question.status = 'answered'
+    question.updated_at = datetime.utcnow()
+    AssignmentManager.complete_question(
+        question.id,
+        answered_by=current_user.alumni_profile.id,
+        commit=False
+    )
     
     db.session.add(response)
     db.session.commit()
     
+    # Offer the newly answered question to similar questions' panels
+    index_question(question.id)
+    
     flash('Your answer has been submitted successfully! 🎉', 'success')
     return redirect(url_for('main.mentor_dashboard'))
 
@@ -196,6 +310,7 @@ def toggle_availability():
     alumni = current_user.alumni_profile
     alumni.is_accepting_questions = not alumni.is_accepting_questions
     db.session.commit()
+    industry_index.update_mentor(alumni)
     
     status = 'active' if alumni.is_accepting_questions else 'paused'
     flash(f'Your status has been updated to {status}.', 'success')
@@ -288,6 +403,28 @@ def request_referral(alumni_id):
     
     return render_template('referrals/request.html', alumni=alumni)
 
+def referral_tab(owner_filter):
+    """Status counts plus one eager-loaded page of the selected status tab"""
+    status = request.args.get('status', 'requested')
+    if status not in REFERRAL_STATUSES:
+        status = 'requested'
+    
+    try:
+        referrals, next_cursor = referral_page(owner_filter, status,
+                                               cursor=request.args.get('cursor'),
+                                               limit=REFERRALS_PER_PAGE)
+    except ValueError:
+        abort(400)
+    
+    return dict(
+        referrals=referrals,
+        next_cursor=next_cursor,
+        status=status,
+        statuses=REFERRAL_STATUSES,
+        status_counts=referral_status_counts(owner_filter),
+        is_first_page=not request.args.get('cursor')
+    )
+
 @bp.route('/referrals/my_requests')
 @login_required
 def my_referrals():
@@ -295,10 +432,8 @@ def my_referrals():
         flash('Access denied.', 'danger')
         return redirect(url_for('main.student_dashboard'))
     
-    referrals = Referral.query.filter_by(student_id=current_user.student_profile.id)\
-        .order_by(Referral.requested_at.desc()).all()
-    
-    return render_template('referrals/student_dashboard.html', referrals=referrals)
+    tab = referral_tab(Referral.student_id == current_user.student_profile.id)
+    return render_template('referrals/student_dashboard.html', **tab)
 
 @bp.route('/mentor/referrals')
 @login_required
@@ -307,10 +442,8 @@ def mentor_referrals():
         flash('Access denied.', 'danger')
         return redirect(url_for('main.student_dashboard'))
     
-    referrals = Referral.query.filter_by(mentor_id=current_user.alumni_profile.id)\
-        .order_by(Referral.requested_at.desc()).all()
-    
-    return render_template('referrals/mentor_dashboard.html', referrals=referrals)
+    tab = referral_tab(Referral.mentor_id == current_user.alumni_profile.id)
+    return render_template('referrals/mentor_dashboard.html', **tab)
 
 @bp.route('/referral/<int:id>/respond', methods=['POST'])
 @login_required
@@ -319,22 +452,50 @@ def respond_referral(id):
         flash('Access denied.', 'danger')
         return redirect(url_for('main.student_dashboard'))
     
-    referral = Referral.query.get_or_404(id)
-    
     action = request.form.get('action')
-    response_text = request.form.get('response')
+    if action not in ReferralManager.ACTIONS:
+        abort(400)
     
-    if action == 'approve':
-        referral.status = 'approved'
-        referral.mentor_response = response_text
+    results = ReferralManager.respond(current_user.alumni_profile.id, [id], action,
+                                      request.form.get('response'))
+    if results[id] == 'not_found':
+        abort(404)
+    
+    if results[id] == 'approved':
         flash('Referral approved! 🎉', 'success')
-    elif action == 'reject':
-        referral.status = 'rejected'
-        referral.mentor_response = response_text
+    elif results[id] == 'rejected':
         flash('Referral request declined.', 'info')
+    else:
+        flash('This referral has already been answered.', 'warning')
     
-    from datetime import datetime
-    referral.responded_at = datetime.utcnow()
-    db.session.commit()
+    return redirect(url_for('main.mentor_referrals'))
+
+@bp.route('/mentor/referrals/bulk', methods=['POST'])
+@login_required
+def bulk_respond_referrals():
+    if current_user.role != 'alumni':
+        flash('Access denied.', 'danger')
+        return redirect(url_for('main.student_dashboard'))
+    
+    try:
+        results = ReferralManager.respond(
+            current_user.alumni_profile.id,
+            request.form.getlist('referral_ids', type=int),
+            request.form.get('action'),
+            request.form.get('response') or None
+        )
+    except ValueError as error:
+        flash(str(error), 'danger')
+        return redirect(url_for('main.mentor_referrals'))
+    
+    if not results:
+        flash('Select at least one referral request.', 'warning')
+        return redirect(url_for('main.mentor_referrals'))
+    
+    done = sum(1 for outcome in results.values() if outcome in ('approved', 'rejected'))
+    skipped = len(results) - done
+    verb = 'approved' if request.form.get('action') == 'approve' else 'declined'
+    flash(f'{done} referral request(s) {verb}.' + (f' {skipped} skipped.' if skipped else ''),
+          'success' if done else 'warning')
     
     return redirect(url_for('main.mentor_referrals'))
@@ -0,0 +1,198 @@
+"""
+Answer SLA Tracking for ASCEND
+Maintains per-company counts of pending questions older than the SLA window.
+A scheduled sweep moves questions into the count as they cross the
+threshold; a flush hook takes them out when they stop being pending.
+"""
+
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Company, CompanySLA, Question
+from app.database import dialect_insert
+from app import db
+
+
+class SLATracker:
+    """Sweep, read and repair the CompanySLA counters"""
+
+    DEFAULT_SLA_DAYS = 7
+
+    @staticmethod
+    def window():
+        try:
+            days = current_app.config.get('QUESTION_SLA_DAYS', SLATracker.DEFAULT_SLA_DAYS)
+        except RuntimeError:
+            days = SLATracker.DEFAULT_SLA_DAYS
+        return timedelta(days=days)
+
+    @staticmethod
+    def sweep(now=None):
+        """
+        Count every pending question that crossed the SLA since the last sweep
+
+        Only questions not yet flagged are touched, so each sweep costs the
+        number of new breaches, not the size of the backlog.
+
+        Returns: {company_id: newly breached count}
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - SLATracker.window()
+
+        rows = db.session.query(Question.id, Question.company_id).filter(
+            Question.status == 'pending',
+            Question.sla_breached.is_(False),
+            Question.created_at < cutoff
+        ).all()
+
+        added = {}
+        for _, company_id in rows:
+            if company_id is not None:
+                added[company_id] = added.get(company_id, 0) + 1
+
+        if rows:
+            # Keep updated_at: the flag is not visible on the question page
+            db.session.query(Question).filter(Question.id.in_([row.id for row in rows]))\
+                .update({Question.sla_breached: True, Question.updated_at: Question.updated_at},
+                        synchronize_session=False)
+        for company_id, count in added.items():
+            SLATracker._adjust(db.session.connection(), company_id, count, swept_at=now)
+
+        db.session.commit()
+        return added
+
+    @staticmethod
+    def _adjust(connection, company_id, delta, swept_at=None):
+        """Add delta to a company's count (creating its row) on the given connection"""
+        table = CompanySLA.__table__
+        values = {'company_id': company_id, 'breached_count': max(delta, 0)}
+        if swept_at is not None:
+            values['last_swept_at'] = swept_at
+        changes = {'breached_count': table.c.breached_count + delta}
+        if swept_at is not None:
+            changes['last_swept_at'] = swept_at
+
+        insert = dialect_insert(db.session)
+        if insert is not None:
+            stmt = insert(table).values(**values)
+            connection.execute(stmt.on_conflict_do_update(index_elements=['company_id'], set_=changes))
+            return
+
+        result = connection.execute(table.update().where(table.c.company_id == company_id).values(**changes))
+        if not result.rowcount:
+            connection.execute(table.insert().values(**values))
+
+    @staticmethod
+    def breached_count(company_id):
+        """Pending questions past the SLA for one company (identity-map cached per session)"""
+        if company_id is None:
+            return 0
+        row = db.session.get(CompanySLA, company_id)
+        return row.breached_count if row else 0
+
+    @staticmethod
+    def breached_counts():
+        """{company_id: count} for every company with breaches, in one query"""
+        rows = db.session.query(CompanySLA.company_id, CompanySLA.breached_count)\
+            .filter(CompanySLA.breached_count > 0).all()
+        return dict(rows)
+
+    @staticmethod
+    def worst_companies(limit=5):
+        """[(company name, count)] with the most breaches, for dashboards"""
+        return db.session.query(Company.name, CompanySLA.breached_count)\
+            .join(Company, Company.id == CompanySLA.company_id)\
+            .filter(CompanySLA.breached_count > 0)\
+            .order_by(CompanySLA.breached_count.desc(), Company.name)\
+            .limit(limit).all()
+
+    @staticmethod
+    def total_breached():
+        return db.session.query(db.func.coalesce(db.func.sum(CompanySLA.breached_count), 0)).scalar()
+
+    @staticmethod
+    def rebuild(now=None):
+        """
+        Reset every flag and count from scratch, then sweep (repairs drift)
+
+        Returns: {company_id: breached count}
+        """
+        db.session.query(Question).filter(Question.sla_breached.is_(True))\
+            .update({Question.sla_breached: False, Question.updated_at: Question.updated_at},
+                    synchronize_session=False)
+        CompanySLA.query.delete()
+        db.session.commit()
+        return SLATracker.sweep(now)
+
+
+def release_breaches(session, flush_context, instances):
+    """
+    before_flush: a breached question that stops being pending leaves the count
+
+    The flag itself records that the question was counted, so no attribute
+    history is needed (status may have been set on an expired instance).
+    """
+    released = session.info.setdefault('sla_released', {})
+
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Question) or not obj.sla_breached or obj.company_id is None:
+            continue
+        if obj in session.deleted or obj.status != 'pending':
+            obj.sla_breached = False
+            released[obj.company_id] = released.get(obj.company_id, 0) + 1
+
+
+def apply_releases(session, flush_context):
+    """after_flush: decrement the counters inside the same transaction"""
+    released = session.info.pop('sla_released', None)
+    if not released:
+        return
+    table = CompanySLA.__table__
+    connection = session.connection()
+    for company_id, count in released.items():
+        connection.execute(
+            table.update().where(table.c.company_id == company_id)
+            .values(breached_count=table.c.breached_count - count)
+        )
+
+
+def discard_releases(session):
+    """after_rollback: the flush that queued these never happened"""
+    session.info.pop('sla_released', None)
+
+
+@click.group('sla')
+def sla_cli():
+    """Answer SLA commands."""
+
+
+@sla_cli.command('sweep')
+def sweep_command():
+    """Count questions that crossed the SLA since the last sweep (run from cron)."""
+    added = SLATracker.sweep()
+    click.echo(f'{sum(added.values())} new SLA breaches across {len(added)} companies')
+
+
+@sla_cli.command('rebuild')
+def rebuild_command():
+    """Recount every company's SLA breaches from scratch."""
+    counts = SLATracker.rebuild()
+    click.echo(f'{sum(counts.values())} pending questions past the SLA across {len(counts)} companies')
+
+
+_registered = False
+
+
+def init_sla(app):
+    """Register the flush hooks once per process and the sla CLI commands"""
+    global _registered
+    if not _registered:
+        event.listen(Session, 'before_flush', release_breaches)
+        event.listen(Session, 'after_flush', apply_releases)
+        event.listen(Session, 'after_rollback', discard_releases)
+        _registered = True
+    app.cli.add_command(sla_cli)
@@ -0,0 +1,59 @@
+"""
+Startup Instrumentation for ASCEND
+Times each phase of create_app so slow boots (which hurt autoscaling) show
+up per subsystem rather than as one number
+"""
+
+import time
+from contextlib import contextmanager
+
+import click
+
+
+class StartupTimer:
+    """Records (phase, seconds) pairs for one create_app call"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def finish(self, app):
+        """Store the timings on the app and log a one-line summary"""
+        report = {
+            'phases': list(self.phases),
+            'total': self.total,
+        }
+        app.extensions['startup_timings'] = report
+        app.logger.debug('create_app took %.1f ms (%s)', report['total'] * 1000,
+                         ', '.join(f'{name}={seconds * 1000:.1f}ms' for name, seconds in self.phases))
+        return report
+
+
+@click.command('startup-report')
+def startup_report_command():
+    """Show how long each create_app phase took."""
+    from flask import current_app
+    report = current_app.extensions.get('startup_timings')
+    if not report:
+        click.echo('No startup timings recorded')
+        return
+    for name, seconds in report['phases']:
+        click.echo(f'{name:<20} {seconds * 1000:>8.1f} ms')
+    click.echo(f"{'total':<20} {report['total'] * 1000:>8.1f} ms")
+
+
+def init_startup(app):
+    """Register the startup-report CLI command"""
+    app.cli.add_command(startup_report_command)
@@ -220,8 +220,104 @@ function copyToClipboard(text) {
     });
 }
 
+// Live queue/dashboard updates over server-sent events
+class LiveUpdates {
+    constructor(element) {
+        this.element = element;
+        this.queueBody = document.getElementById('mentor-queue-body');
+        this.source = new EventSource(element.getAttribute('data-live-events'));
+
+        this.source.addEventListener('question.new', (e) => this.onQuestionNew(JSON.parse(e.data)));
+        this.source.addEventListener('question.taken', (e) => this.onQuestionTaken(JSON.parse(e.data)));
+        this.source.addEventListener('feedback.received', (e) => this.onFeedback(JSON.parse(e.data)));
+    }
+
+    adjustCount(name, delta) {
+        document.querySelectorAll(`[data-live-count="${name}"]`).forEach(counter => {
+            const value = parseInt(counter.textContent, 10) || 0;
+            counter.textContent = Math.max(0, value + delta);
+        });
+    }
+
+    onQuestionNew(question) {
+        this.adjustCount('pending', 1);
+        if (!this.queueBody || this.queueBody.querySelector(`[data-question-id="${question.id}"]`)) return;
+
+        const empty = this.queueBody.querySelector('.queue-empty');
+        if (empty) empty.remove();
+
+        const row = document.createElement('tr');
+        row.setAttribute('data-question-id', question.id);
+
+        const titleCell = document.createElement('td');
+        titleCell.className = 'ps-4';
+        const title = document.createElement('div');
+        title.className = 'fw-bold text-dark';
+        title.textContent = question.title;
+        const body = document.createElement('small');
+        body.className = 'text-muted text-truncate d-inline-block';
+        body.style.maxWidth = '300px';
+        body.textContent = question.body;
+        titleCell.append(title, body);
+
+        const categoryCell = document.createElement('td');
+        const category = document.createElement('span');
+        category.className = 'badge bg-light text-dark border';
+        category.textContent = question.category || '';
+        categoryCell.appendChild(category);
+
+        const dateCell = document.createElement('td');
+        dateCell.textContent = question.created_at.slice(0, 10);
+
+        const urgencyCell = document.createElement('td');
+        const urgency = document.createElement('span');
+        urgency.className = question.urgency === 'High' ? 'badge bg-danger' : 'badge bg-info text-dark';
+        urgency.textContent = question.urgency === 'High' ? 'High' : 'Normal';
+        urgencyCell.appendChild(urgency);
+
+        const actionCell = document.createElement('td');
+        const link = document.createElement('a');
+        link.className = 'btn btn-sm btn-primary';
+        link.href = `/question/${question.id}`;
+        link.textContent = 'Answer';
+        actionCell.appendChild(link);
+
+        row.append(titleCell, categoryCell, dateCell, urgencyCell, actionCell);
+        this.queueBody.appendChild(row);
+        toastManager.show(`New question: ${question.title}`, 'info');
+    }
+
+    onQuestionTaken(data) {
+        this.adjustCount('pending', -1);
+        if (!this.queueBody) return;
+        const row = this.queueBody.querySelector(`[data-question-id="${data.question_id}"]`);
+        if (row) row.remove();
+    }
+
+    onFeedback(data) {
+        const outcome = (data.outcome || '').replace(/_/g, ' ');
+        toastManager.show(`New feedback received: ${outcome}`, 'success');
+    }
+}
+
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', () => {
+    // Live updates on mentor queue and dashboard
+    const liveElement = document.querySelector('[data-live-events]');
+    if (liveElement && window.EventSource) {
+        new LiveUpdates(liveElement);
+    }
+
+    // "Select all" checkboxes for bulk actions
+    document.querySelectorAll('[data-select-all]').forEach(toggle => {
+        toggle.addEventListener('change', () => {
+            const name = toggle.dataset.selectAll;
+            document.querySelectorAll(`input[type="checkbox"][name="${name}"]`).forEach(box => {
+                box.checked = toggle.checked;
+            });
+        });
+    });
+
     // Add character counters to textareas
     document.querySelectorAll('textarea').forEach(textarea => {
         if (textarea.hasAttribute('maxlength')) {
@@ -3,9 +3,140 @@ Trust Score Calculator for ASCEND
 Calculates and updates mentor trust scores based on feedback and outcomes
 """
 
-from app.models import Alumni, Feedback, Response, Question
+import math
+import threading
+import time
+
+import click
+from flask import current_app
+
+from app.models import Alumni, Feedback, Response, Question, TrustSnapshot
+from app.matching import industry_index
+from app.events import queue_event, mentor_topic
+from app.fragment_cache import queue_invalidation
+from app.database import dialect_insert
+from app.analytics import FeedbackRollups
+from app.sla import SLATracker
+from app.archive import FEEDBACK_MODELS
 from app import db
-from datetime import datetime, timedelta
+from datetime import datetime
+
+
+class DecayedTrust:
+    """
+    Exponentially time-decayed trust
+    
+    A feedback's weight halves every HALF_LIFE_DAYS. Instead of decaying every
+    mentor's sum on a schedule, each weight is stored scaled up to a fixed
+    EPOCH: w * 2^((t - EPOCH) / half_life). Adding an event is then a plain
+    SQL increment, and the value "now" is the stored sum times
+    2^(-(now - EPOCH) / half_life), applied lazily at read time.
+    
+    Changing HALF_LIFE_DAYS or EPOCH requires `flask trust backfill-decay`.
+    """
+    
+    HALF_LIFE_DAYS = 180
+    EPOCH = datetime(2024, 1, 1)
+    
+    @staticmethod
+    def _half_lives(moment):
+        seconds = (moment - DecayedTrust.EPOCH).total_seconds()
+        return seconds / (DecayedTrust.HALF_LIFE_DAYS * 86400)
+    
+    @staticmethod
+    def anchored(weight, at):
+        """A weight observed at `at`, expressed in EPOCH units"""
+        return weight * math.pow(2.0, DecayedTrust._half_lives(at))
+    
+    @staticmethod
+    def decayed(anchored_sum, now=None):
+        """Value of an anchored sum as of now"""
+        return anchored_sum * math.pow(2.0, -DecayedTrust._half_lives(now or datetime.utcnow()))
+    
+    @staticmethod
+    def outcome_weight(outcome):
+        return {
+            'helpful': TrustCalculator.HELPFUL_BONUS,
+            'got_interview': TrustCalculator.INTERVIEW_BONUS,
+            'got_referral': TrustCalculator.REFERRAL_BONUS,
+            'not_helpful': -TrustCalculator.NOT_HELPFUL_PENALTY,
+        }.get(outcome, 0)
+    
+    @staticmethod
+    def record(alumni_id, outcome, at, sign=1):
+        """
+        Add (or with sign=-1, take back) one feedback: a single UPDATE, O(1)
+        
+        Runs in the caller's transaction; does not commit.
+        """
+        weight = DecayedTrust.outcome_weight(outcome)
+        if not weight or alumni_id is None:
+            return
+        
+        delta = sign * DecayedTrust.anchored(weight, at)
+        db.session.query(Alumni).filter(Alumni.id == alumni_id).update(
+            {Alumni.decayed_trust_sum: Alumni.decayed_trust_sum + delta},
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def score(alumni, now=None, unanswered_count=None):
+        """Decayed trust score on the same 0-100 scale as the additive one"""
+        if unanswered_count is None:
+            unanswered_count = TrustCalculator.get_unanswered_count(alumni.id)
+        
+        score = TrustCalculator.BASE_SCORE + DecayedTrust.decayed(alumni.decayed_trust_sum or 0.0, now)
+        score -= unanswered_count * TrustCalculator.UNANSWERED_PENALTY
+        
+        return max(TrustCalculator.MIN_SCORE, min(TrustCalculator.MAX_SCORE, int(round(score))))
+    
+    @staticmethod
+    def backfill():
+        """
+        Rebuild every mentor's anchored sum from hot and archived feedback
+        
+        Returns: number of mentors updated
+        """
+        sums = {}
+        for model in FEEDBACK_MODELS:
+            rows = db.session.query(model.mentor_id, model.outcome, model.created_at)\
+                .filter(model.mentor_id.isnot(None))
+            for mentor_id, outcome, created_at in rows:
+                weight = DecayedTrust.outcome_weight(outcome)
+                if weight and created_at:
+                    sums[mentor_id] = sums.get(mentor_id, 0.0) + DecayedTrust.anchored(weight, created_at)
+        
+        db.session.bulk_update_mappings(Alumni, [
+            {'id': alumni_id, 'decayed_trust_sum': sums.get(alumni_id, 0.0)}
+            for (alumni_id,) in db.session.query(Alumni.id)
+        ])
+        db.session.commit()
+        
+        return len(sums)
+    
+    @staticmethod
+    def compare(now=None):
+        """
+        Additive vs decayed score for every verified mentor
+        
+        Returns: list of dicts (alumni_id, name, additive, decayed, delta),
+        largest absolute difference first
+        """
+        rows = []
+        for alumni in Alumni.query.filter_by(is_verified=True).all():
+            unanswered = TrustCalculator.get_unanswered_count(alumni.id, alumni=alumni)
+            additive = TrustCalculator.additive_score(TrustCalculator.get_outcome_counts(alumni.id), unanswered)
+            decayed = DecayedTrust.score(alumni, now, unanswered_count=unanswered)
+            rows.append({
+                'alumni_id': alumni.id,
+                'name': alumni.user.name if alumni.user else None,
+                'additive': additive,
+                'decayed': decayed,
+                'delta': decayed - additive,
+            })
+        
+        rows.sort(key=lambda r: (-abs(r['delta']), r['alumni_id']))
+        return rows
 
 
 class TrustCalculator:
@@ -38,23 +169,21 @@ class TrustCalculator:
         
         Min: 0, Max: 100
         """
-        score = TrustCalculator.BASE_SCORE
-        
-        # Get all feedback for this mentor
-        feedbacks = Feedback.query.filter_by(mentor_id=alumni_id).all()
+        counts = TrustCalculator.get_outcome_counts(alumni_id)
+        unanswered_count = TrustCalculator.get_unanswered_count(alumni_id)
         
-        for feedback in feedbacks:
-            if feedback.outcome == 'helpful':
-                score += TrustCalculator.HELPFUL_BONUS
-            elif feedback.outcome == 'got_interview':
-                score += TrustCalculator.INTERVIEW_BONUS
-            elif feedback.outcome == 'got_referral':
-                score += TrustCalculator.REFERRAL_BONUS
-            elif feedback.outcome == 'not_helpful':
-                score -= TrustCalculator.NOT_HELPFUL_PENALTY
+        return TrustCalculator.additive_score(counts, unanswered_count)
+    
+    @staticmethod
+    def additive_score(counts, unanswered_count):
+        """The additive formula applied to per-outcome counts"""
+        score = TrustCalculator.BASE_SCORE
+        score += counts.get('helpful', (0, 0, 0))[0] * TrustCalculator.HELPFUL_BONUS
+        score += counts.get('got_interview', (0, 0, 0))[0] * TrustCalculator.INTERVIEW_BONUS
+        score += counts.get('got_referral', (0, 0, 0))[0] * TrustCalculator.REFERRAL_BONUS
+        score -= counts.get('not_helpful', (0, 0, 0))[0] * TrustCalculator.NOT_HELPFUL_PENALTY
         
         # Penalty for unanswered questions (questions assigned but not answered in 7 days)
-        unanswered_count = TrustCalculator.get_unanswered_count(alumni_id)
         score -= (unanswered_count * TrustCalculator.UNANSWERED_PENALTY)
         
         # Clamp score between MIN and MAX
@@ -63,22 +192,67 @@ class TrustCalculator:
         return score
     
     @staticmethod
-    def get_unanswered_count(alumni_id):
-        """Count questions that were assigned but not answered within 7 days"""
-        alumni = Alumni.query.get(alumni_id)
-        if not alumni:
-            return 0
+    def get_outcome_counts(alumni_id):
+        """{outcome: (count, rating_sum, rating_count)}, one grouped query per hot/archived table"""
+        counts = {}
+        for model in FEEDBACK_MODELS:
+            rows = db.session.query(
+                model.outcome,
+                db.func.count(model.id),
+                db.func.coalesce(db.func.sum(model.rating), 0),
+                db.func.count(model.rating)
+            ).filter(model.mentor_id == alumni_id)\
+                .group_by(model.outcome)\
+                .all()
+            for outcome, count, ratings, rated in rows:
+                prev = counts.get(outcome, (0, 0, 0))
+                counts[outcome] = (prev[0] + count, prev[1] + ratings, prev[2] + rated)
+        return counts
+    
+    @staticmethod
+    def collect_components(alumni):
+        """
+        Every score component for a mentor: two queries, no Feedback rows loaded
         
-        # Get questions for this mentor's company that are still pending after 7 days
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
+        Returns: dict matching the TrustSnapshot columns
+        """
+        counts = TrustCalculator.get_outcome_counts(alumni.id)
+        unanswered_count = TrustCalculator.get_unanswered_count(alumni.id, alumni=alumni)
+        
+        additive = TrustCalculator.additive_score(counts, unanswered_count)
+        decayed = DecayedTrust.score(alumni, unanswered_count=unanswered_count)
+        score = decayed if current_app.config.get('TRUST_SCORE_MODEL') == 'decayed' else additive
+        
+        rating_sum = sum(ratings for _, ratings, _ in counts.values())
+        rating_count = sum(rated for _, _, rated in counts.values())
+        
+        return {
+            'score': score,
+            'additive_score': additive,
+            'decayed_score': decayed,
+            'badge': TrustCalculator.get_trust_badge(score),
+            'total_feedback': sum(count for count, _, _ in counts.values()),
+            'helpful_count': counts.get('helpful', (0, 0, 0))[0],
+            'interview_count': counts.get('got_interview', (0, 0, 0))[0],
+            'referral_count': counts.get('got_referral', (0, 0, 0))[0],
+            'not_helpful_count': counts.get('not_helpful', (0, 0, 0))[0],
+            'unanswered_count': unanswered_count,
+            'average_rating': round(rating_sum / rating_count, 2) if rating_count else 0,
+        }
+    
+    @staticmethod
+    def get_unanswered_count(alumni_id, alumni=None):
+        """
+        Questions at the mentor's company still pending past the answer SLA
         
-        unanswered = Question.query.filter(
-            Question.company_id == alumni.current_company_id,
-            Question.status == 'pending',
-            Question.created_at < seven_days_ago
-        ).count()
+        Reads the swept per-company counter (see app.sla), so mentors at the
+        same company share one row instead of each counting the backlog.
+        """
+        alumni = alumni or db.session.get(Alumni, alumni_id)
+        if not alumni:
+            return 0
         
-        return unanswered
+        return SLATracker.breached_count(alumni.current_company_id)
     
     @staticmethod
     def update_trust_score(alumni_id, feedback=None):
@@ -92,19 +266,67 @@ class TrustCalculator:
         Returns:
             New trust score
         """
-        alumni = Alumni.query.get(alumni_id)
+        alumni = db.session.get(Alumni, alumni_id)
         if not alumni:
             return None
         
         # Recalculate complete score
-        new_score = TrustCalculator.calculate_trust_score(alumni_id)
+        components = TrustCalculator.collect_components(alumni)
+        new_score = components['score']
         
         # Update in database
         alumni.trust_score = new_score
+        TrustSnapshots.record(alumni, components)
         db.session.commit()
+        industry_index.update_mentor(alumni)
         
         return new_score
     
+    @staticmethod
+    def recompute_scores(alumni_ids):
+        """
+        Recompute several mentors' scores with a single commit
+        
+        Returns: number of scores that changed
+        """
+        if not alumni_ids:
+            return 0
+        
+        mentors = Alumni.query.filter(Alumni.id.in_(list(alumni_ids))).all()
+        
+        changed = []
+        for alumni in mentors:
+            components = TrustCalculator.collect_components(alumni)
+            new_score = components['score']
+            TrustSnapshots.record(alumni, components)
+            if alumni.trust_score != new_score:
+                alumni.trust_score = new_score
+                changed.append(alumni)
+        
+        db.session.commit()
+        for alumni in changed:
+            industry_index.update_mentor(alumni)
+        
+        return len(changed)
+    
+    @staticmethod
+    def recompute_all(batch_size=200):
+        """
+        Recompute every mentor's stored score, batch_size mentors per commit
+        
+        Decayed scores fall as time passes and the unanswered penalty moves
+        with the SLA sweep, neither of which enqueues a recompute, so this
+        runs on a schedule. Returns: number of scores that changed
+        """
+        changed, last_id = 0, 0
+        while True:
+            ids = [alumni_id for (alumni_id,) in db.session.query(Alumni.id)
+                   .filter(Alumni.id > last_id).order_by(Alumni.id).limit(batch_size)]
+            if not ids:
+                return changed
+            changed += TrustCalculator.recompute_scores(ids)
+            last_id = ids[-1]
+    
     @staticmethod
     def get_trust_badge(score):
         """
@@ -124,30 +346,20 @@ class TrustCalculator:
         """
         Get detailed trust metrics for a mentor
         
+        Reads the latest TrustSnapshot; only a mentor with no snapshot yet
+        is computed (and snapshotted) on the spot.
+        
         Returns: dict with breakdown of score components
         """
-        feedbacks = Feedback.query.filter_by(mentor_id=alumni_id).all()
-        
-        metrics = {
-            'total_feedback': len(feedbacks),
-            'helpful_count': sum(1 for f in feedbacks if f.outcome == 'helpful'),
-            'interview_count': sum(1 for f in feedbacks if f.outcome == 'got_interview'),
-            'referral_count': sum(1 for f in feedbacks if f.outcome == 'got_referral'),
-            'not_helpful_count': sum(1 for f in feedbacks if f.outcome == 'not_helpful'),
-            'unanswered_count': TrustCalculator.get_unanswered_count(alumni_id),
-            'average_rating': 0
-        }
-        
-        # Calculate average rating
-        ratings = [f.rating for f in feedbacks if f.rating]
-        if ratings:
-            metrics['average_rating'] = sum(ratings) / len(ratings)
-        
-        # Calculate current score
-        metrics['current_score'] = TrustCalculator.calculate_trust_score(alumni_id)
-        metrics['badge'] = TrustCalculator.get_trust_badge(metrics['current_score'])
+        snapshot = TrustSnapshots.latest(alumni_id)
+        if snapshot is None:
+            alumni = db.session.get(Alumni, alumni_id)
+            if not alumni:
+                return None
+            snapshot = TrustSnapshots.record(alumni, TrustCalculator.collect_components(alumni))
+            db.session.commit()
         
-        return metrics
+        return TrustSnapshots.to_metrics(snapshot)
     
     @staticmethod
     def bulk_update_scores():
@@ -156,24 +368,82 @@ class TrustCalculator:
         
         updated_count = 0
         for alumni in all_alumni:
-            new_score = TrustCalculator.calculate_trust_score(alumni.id)
+            components = TrustCalculator.collect_components(alumni)
+            new_score = components['score']
+            TrustSnapshots.record(alumni, components)
             if alumni.trust_score != new_score:
                 alumni.trust_score = new_score
                 updated_count += 1
         
         db.session.commit()
+        if updated_count:
+            industry_index.refresh()
         
         return updated_count
 
 
+class TrustSnapshots:
+    """History of each mentor's score and components, newest row = current"""
+    
+    COMPONENTS = ('score', 'additive_score', 'decayed_score', 'badge', 'total_feedback',
+                  'helpful_count', 'interview_count', 'referral_count', 'not_helpful_count',
+                  'unanswered_count', 'average_rating')
+    
+    @staticmethod
+    def latest(alumni_id):
+        return TrustSnapshot.query.filter_by(mentor_id=alumni_id)\
+            .order_by(TrustSnapshot.created_at.desc(), TrustSnapshot.id.desc())\
+            .first()
+    
+    @staticmethod
+    def history(alumni_id, limit=50):
+        """Newest first, for auditing how a score moved"""
+        return TrustSnapshot.query.filter_by(mentor_id=alumni_id)\
+            .order_by(TrustSnapshot.created_at.desc(), TrustSnapshot.id.desc())\
+            .limit(limit).all()
+    
+    @staticmethod
+    def record(alumni, components):
+        """
+        Add a snapshot unless the latest one already has these components
+        
+        Does not commit. Returns: the current snapshot
+        """
+        latest = TrustSnapshots.latest(alumni.id)
+        if latest is not None and all(
+                getattr(latest, name) == components[name] for name in TrustSnapshots.COMPONENTS):
+            return latest
+        
+        snapshot = TrustSnapshot(mentor_id=alumni.id, **{
+            name: components[name] for name in TrustSnapshots.COMPONENTS
+        })
+        db.session.add(snapshot)
+        return snapshot
+    
+    @staticmethod
+    def to_metrics(snapshot):
+        """The get_trust_metrics dict for a snapshot"""
+        metrics = {name: getattr(snapshot, name) for name in TrustSnapshots.COMPONENTS}
+        metrics['current_score'] = metrics.pop('score')
+        metrics['snapshot_at'] = snapshot.created_at
+        return metrics
+
+
 class FeedbackManager:
     """Manage feedback submission and processing"""
     
+    # Insert/compare-and-swap rounds before upsert_feedback gives up
+    UPSERT_ATTEMPTS = 5
+    
     @staticmethod
     def submit_feedback(question_id, student_id, outcome, rating=None, comment=None):
         """
         Submit feedback for a question/response
         
+        One query reads the question status and its response, one upsert
+        writes the feedback, and everything commits once. The mentor's trust
+        score is not recomputed here; it is queued on trust_update_queue.
+        
         Args:
             question_id: ID of the question
             student_id: ID of the student submitting feedback
@@ -182,63 +452,125 @@ class FeedbackManager:
             comment: Optional text comment
         
         Returns:
-            Feedback object or None if error
+            Feedback id or None if error
         """
-        # Get the question and its response
-        question = Question.query.get(question_id)
-        if not question or question.status != 'answered':
-            return None
-        
-        # Get the response
-        response = Response.query.filter_by(question_id=question_id).first()
-        if not response:
+        # Question and its (first) response in one query
+        row = db.session.query(
+            Question.status, Question.company_id, Response.id, Response.mentor_id
+        ).outerjoin(Response, Response.question_id == Question.id)\
+            .filter(Question.id == question_id)\
+            .order_by(Response.id)\
+            .first()
+        if not row or row.status != 'answered' or row.id is None:
             return None
         
-        # Check if feedback already exists
-        existing = Feedback.query.filter_by(question_id=question_id).first()
-        if existing:
-            # Update existing feedback
-            existing.outcome = outcome
-            existing.rating = rating
-            existing.comment = comment
-            db.session.commit()
-            
-            # Update trust score
-            TrustCalculator.update_trust_score(response.mentor_id)
-            
-            return existing
+        response_id, mentor_id = row.id, row.mentor_id
         
-        # Create new feedback
-        feedback = Feedback(
+        upserted = FeedbackManager.upsert_feedback(
             question_id=question_id,
-            response_id=response.id,
+            response_id=response_id,
             student_id=student_id,
-            mentor_id=response.mentor_id,
+            mentor_id=mentor_id,
             outcome=outcome,
             rating=rating,
-            comment=comment
+            comment=comment,
+            created_at=datetime.utcnow()
         )
-        
-        db.session.add(feedback)
+        if upserted is None:
+            db.session.rollback()
+            return None
+        feedback_id, previous, created_at = upserted
+        
+        # Move the feedback between rollup buckets in the same transaction.
+        # `previous` comes from the write itself, so concurrent submissions
+        # never both count as the first one.
+        if previous is not None:
+            FeedbackRollups.record(mentor_id, row.company_id, previous[0], previous[1],
+                                   created_at, sign=-1)
+            DecayedTrust.record(mentor_id, previous[0], created_at, sign=-1)
+        FeedbackRollups.record(mentor_id, row.company_id, outcome, rating, created_at)
+        DecayedTrust.record(mentor_id, outcome, created_at)
+        
+        queue_event(db.session, (mentor_topic(mentor_id),), 'feedback.received', {
+            'question_id': question_id, 'outcome': outcome, 'rating': rating
+        })
+        # The upsert is a Core statement, so the flush hooks never see it
+        queue_invalidation(db.session, 'response', response_id)
+        queue_invalidation(db.session, 'question', question_id)
         db.session.commit()
         
-        # Update mentor's trust score
-        TrustCalculator.update_trust_score(response.mentor_id)
+        trust_update_queue.enqueue(mentor_id)
         
-        return feedback
+        return feedback_id
+    
+    @staticmethod
+    def upsert_feedback(**values):
+        """
+        Insert feedback, or update outcome/rating/comment if the question has some
+        
+        INSERT ... ON CONFLICT DO NOTHING on the unique question_id decides
+        atomically whether this submission created the row. Otherwise the
+        existing row is updated with a compare-and-swap on the outcome and
+        rating just read, retried if another submission changed them first,
+        so the values returned are exactly the ones this write replaced. A row
+        deleted in between (e.g. archived) sends it back to the insert.
+        Does not commit.
+        
+        Returns: (feedback id, (old outcome, old rating) or None if inserted,
+        the feedback's created_at), or None if every one of UPSERT_ATTEMPTS
+        rounds lost to a concurrent write
+        """
+        insert = dialect_insert(db.session)
+        if insert is None:
+            feedback = Feedback.query.filter_by(question_id=values['question_id'])\
+                .with_for_update().first()
+            if feedback is None:
+                feedback = Feedback(**values)
+                db.session.add(feedback)
+                db.session.flush()
+                return feedback.id, None, feedback.created_at
+            previous = (feedback.outcome, feedback.rating)
+            feedback.outcome = values['outcome']
+            feedback.rating = values['rating']
+            feedback.comment = values['comment']
+            db.session.flush()
+            return feedback.id, previous, feedback.created_at
+        
+        stmt = insert(Feedback).values(**values)\
+            .on_conflict_do_nothing(index_elements=[Feedback.question_id])\
+            .returning(Feedback.id)
+        for _ in range(FeedbackManager.UPSERT_ATTEMPTS):
+            feedback_id = db.session.execute(stmt).scalar()
+            if feedback_id is not None:
+                return feedback_id, None, values['created_at']
+            
+            current = db.session.query(Feedback.id, Feedback.outcome, Feedback.rating,
+                                       Feedback.created_at)\
+                .filter(Feedback.question_id == values['question_id']).first()
+            if current is None:
+                continue  # deleted (e.g. archived) since the insert: insert again
+            swapped = db.session.execute(
+                db.update(Feedback)
+                .where(Feedback.id == current.id,
+                       Feedback.outcome.is_not_distinct_from(current.outcome),
+                       Feedback.rating.is_not_distinct_from(current.rating))
+                .values(outcome=values['outcome'], rating=values['rating'],
+                        comment=values['comment'])
+                .execution_options(synchronize_session=False)
+            )
+            if swapped.rowcount == 1:
+                return current.id, (current.outcome, current.rating), current.created_at
+        return None
     
     @staticmethod
     def get_feedback_stats():
-        """Get overall feedback statistics"""
-        total_feedback = Feedback.query.count()
-        
-        stats = {
-            'total_feedback': total_feedback,
-            'helpful': Feedback.query.filter_by(outcome='helpful').count(),
-            'got_interview': Feedback.query.filter_by(outcome='got_interview').count(),
-            'got_referral': Feedback.query.filter_by(outcome='got_referral').count(),
-            'not_helpful': Feedback.query.filter_by(outcome='not_helpful').count(),
-        }
+        """Get overall feedback statistics (read from the feedback rollups)"""
+        totals = FeedbackRollups.outcome_totals()
+        total_feedback = sum(count for count, _, _ in totals.values())
+        
+        stats = {'total_feedback': total_feedback}
+        for key in ['helpful', 'got_interview', 'got_referral', 'not_helpful']:
+            stats[key] = totals.get(key, (0, 0, 0))[0]
         
         # Calculate percentages
         if total_feedback > 0:
@@ -246,15 +578,127 @@ class FeedbackManager:
                 stats[f'{key}_percent'] = (stats[key] / total_feedback) * 100
         
         # Average rating
-        avg_rating = db.session.query(db.func.avg(Feedback.rating))\
-            .filter(Feedback.rating.isnot(None))\
-            .scalar()
+        rating_sum = sum(ratings for _, ratings, _ in totals.values())
+        rating_count = sum(rated for _, _, rated in totals.values())
         
-        stats['average_rating'] = round(avg_rating, 2) if avg_rating else 0
+        stats['average_rating'] = round(rating_sum / rating_count, 2) if rating_count else 0
         
         return stats
 
 
+class TrustUpdateQueue:
+    """
+    Coalescing queue of mentors whose trust score needs recomputing
+    
+    Mentor ids go into a set, so many feedbacks for the same mentor before
+    the next run cause one recompute. In 'background' mode a daemon thread
+    waits TRUST_UPDATE_DELAY_SECONDS after the first enqueue, then
+    recomputes the whole batch in an app context. In 'manual' mode nothing
+    runs until flush() (tests, scripts).
+    """
+    
+    def __init__(self):
+        self._app = None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.mode = 'background'
+        self.delay = 2.0
+    
+    def init_app(self, app):
+        self._app = app
+        self.mode = app.config.get('TRUST_UPDATE_MODE', 'background')
+        self.delay = app.config.get('TRUST_UPDATE_DELAY_SECONDS', 2.0)
+    
+    def enqueue(self, alumni_id):
+        with self._lock:
+            self._pending.add(alumni_id)
+        
+        if self.mode == 'background':
+            self._ensure_worker()
+            self._wakeup.set()
+    
+    def pending(self):
+        with self._lock:
+            return set(self._pending)
+    
+    def _drain(self):
+        with self._lock:
+            batch, self._pending = self._pending, set()
+        return batch
+    
+    def flush(self):
+        """Recompute everything queued so far in the current app context"""
+        batch = self._drain()
+        return TrustCalculator.recompute_scores(batch)
+    
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='trust-updates', daemon=True)
+            self._thread.start()
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Coalescing window: let more feedback for the same mentors arrive
+            time.sleep(self.delay)
+            self._wakeup.clear()
+            
+            batch = self._drain()
+            if not batch:
+                continue
+            with self._app.app_context():
+                try:
+                    TrustCalculator.recompute_scores(batch)
+                except Exception:
+                    db.session.rollback()
+                    self._app.logger.exception('Trust score recompute failed for %s', sorted(batch))
+                finally:
+                    db.session.remove()
+
+
+# Global trust update queue instance
+trust_update_queue = TrustUpdateQueue()
+
+
+@click.group('trust')
+def trust_cli():
+    """Trust score commands."""
+
+
+@trust_cli.command('recompute')
+@click.option('--batch-size', default=200, show_default=True, help='Mentors per transaction.')
+def recompute_command(batch_size):
+    """Recompute every mentor's stored trust score (run on a schedule)."""
+    changed = TrustCalculator.recompute_all(batch_size=batch_size)
+    click.echo(f'Recomputed trust scores; {changed} changed')
+
+
+@trust_cli.command('backfill-decay')
+def backfill_decay_command():
+    """Rebuild every mentor's time-decayed trust sum from Feedback."""
+    updated = DecayedTrust.backfill()
+    click.echo(f'Backfilled decayed trust for {updated} mentors with feedback')
+
+
+@trust_cli.command('compare')
+@click.option('--limit', default=20, show_default=True, help='Rows to show.')
+def compare_command(limit):
+    """Show additive and time-decayed scores side by side."""
+    rows = DecayedTrust.compare()
+    click.echo(f"{'mentor':<30} {'additive':>8} {'decayed':>8} {'delta':>6}")
+    for row in rows[:limit]:
+        name = row['name'] or f"#{row['alumni_id']}"
+        click.echo(f"{name:<30} {row['additive']:>8} {row['decayed']:>8} {row['delta']:>+6}")
+
+
+def init_trust(app):
+    """Configure the trust update queue and register the trust CLI commands"""
+    trust_update_queue.init_app(app)
+    app.cli.add_command(trust_cli)
+
+
 def calculate_mentor_trust_score(alumni_id):
     """Convenience function to calculate trust score"""
     return TrustCalculator.calculate_trust_score(alumni_id)
@@ -6,3 +6,82 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(os.path.abspath(os.path.dirname(__file__)), 'instance', 'ascend.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Mixed into page ETags; change it to invalidate browser caches after template changes
+    ETAG_SALT = os.environ.get('ETAG_SALT', '1')
+    # Reverse proxies in front of the app (1 on Heroku and Render) whose
+    # X-Forwarded-For/-Proto/-Host headers are trusted; 0 = none
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+
+    # Server-sent events: keep-alive comment interval and max stream lifetime
+    # (EventSource reconnects on its own, which frees the worker periodically)
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_MAX_STREAM_SECONDS = 300
+
+    # Trust scores are recomputed off the request path: 'background' runs a
+    # coalescing worker thread, 'manual' waits for trust_update_queue.flush()
+    TRUST_UPDATE_MODE = os.environ.get('TRUST_UPDATE_MODE', 'background')
+    TRUST_UPDATE_DELAY_SECONDS = 2.0
+    # A pending question older than this counts against its company's SLA
+    QUESTION_SLA_DAYS = 7
+    # Answered questions untouched this long move to the archive tables
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+    ARCHIVE_BATCH_SIZE = 500
+    # {% cache %} template fragments: in-process LRU store, entries expire
+    # after FRAGMENT_CACHE_TIMEOUT seconds even if nothing invalidates them
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_TIMEOUT = 300
+    CACHE_MAX_ENTRIES = 2000
+    # Workers replay each other's committed changes from the change_log table
+    # at most this often (seconds); `flask changes prune` trims old entries
+    CHANGE_BUS_POLL_SECONDS = 1.0
+    # Entries this recent are re-read on every poll, so ones that commit out
+    # of id order (PostgreSQL) are not skipped; cover commit time + clock skew
+    CHANGE_BUS_LAG_SECONDS = 30
+    CHANGE_LOG_RETENTION_HOURS = 24
+    # PDF reports: converted in REPORT_WORKERS spawned processes (0 = inline),
+    # cached under REPORTS_DIR (default instance/reports) by content hash
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+    REPORT_TIMEOUT_SECONDS = 60
+    REPORTS_DIR = os.environ.get('REPORTS_DIR')
+    # CSV / JSONL exports are fetched and sent this many rows at a time
+    EXPORT_CHUNK_ROWS = 1000
+    # Admission control (app.rate_limit). Per client: per_minute requests
+    # with bursts of up to burst; per endpoint: at most concurrency in flight
+    # across all workers. None = on unless TESTING. State is shared through
+    # RATE_LIMIT_STORAGE (a SQLite file, default instance/ratelimit.db, or
+    # 'memory' for a single process).
+    RATE_LIMIT_ENABLED = None
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE')
+    RATE_LIMIT_STORE_TIMEOUT = 0.05
+    RATE_LIMIT_SLOT_TTL = 30
+    RATE_LIMITS = {
+        # Keyed on IP + email (users behind one NAT), and capped per IP as well
+        'auth.login': {'per_minute': 10, 'burst': 5, 'concurrency': 4, 'key_field': 'email',
+                       'ip_per_minute': 30, 'ip_burst': 15},
+        'auth.register': {'per_minute': 3, 'burst': 3, 'concurrency': 2},
+        'main.ask_question': {'per_minute': 6, 'burst': 3, 'concurrency': 4},
+        'main.submit_answer': {'per_minute': 20, 'burst': 5, 'concurrency': 4},
+        'main.request_referral': {'per_minute': 5, 'burst': 2, 'concurrency': 2},
+    }
+    # 'additive' (every feedback counts forever) or 'decayed' (exponential half-life)
+    TRUST_SCORE_MODEL = os.environ.get('TRUST_SCORE_MODEL', 'additive')
+
+    # Engine profiles, picked from the database URL by app.database.
+    # SQLite: pragmas run on every new connection. WAL lets readers carry on
+    # while a writer commits, and busy_timeout waits for the lock instead of
+    # failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,  # negative = KiB, so ~64 MB
+    }
+    # PostgreSQL: connection pool settings passed to create_engine
+    POSTGRES_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'pool_timeout': 30,
+    }
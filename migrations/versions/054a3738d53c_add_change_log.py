@@ -0,0 +1,33 @@
+"""add change_log
+
+Revision ID: 054a3738d53c
+Revises: 7384047d888d
+Create Date: 2026-10-19 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '054a3738d53c'
+down_revision = '7384047d888d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('origin', sa.String(length=80), nullable=False),
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_created_at', 'change_log', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_log_created_at', table_name='change_log')
+    op.drop_table('change_log')
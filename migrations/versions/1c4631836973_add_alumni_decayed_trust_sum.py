@@ -0,0 +1,29 @@
+"""add alumni.decayed_trust_sum
+
+Revision ID: 1c4631836973
+Revises: ef62d5da2b1e
+Create Date: 2026-10-19 09:30:00.000000
+
+Existing mentors start at 0; run `flask trust backfill-decay` after
+upgrading to rebuild their sums from feedback.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c4631836973'
+down_revision = 'ef62d5da2b1e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alumni', sa.Column('decayed_trust_sum', sa.Float(), server_default='0',
+                                      nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('alumni') as batch_op:
+        batch_op.drop_column('decayed_trust_sum')
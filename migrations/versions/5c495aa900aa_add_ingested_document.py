@@ -0,0 +1,43 @@
+"""add ingested_document and question.document_id
+
+Revision ID: 5c495aa900aa
+Revises: 71eca2504d9c
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c495aa900aa'
+down_revision = '71eca2504d9c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ingested_document',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('page_count', sa.Integer(), nullable=False),
+        sa.Column('entry_count', sa.Integer(), nullable=False),
+        sa.Column('ingested_at', sa.DateTime(), nullable=False),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sha256')
+    )
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.add_column(sa.Column('document_id', sa.Integer(), nullable=True))
+        batch_op.create_index('ix_question_document_id', ['document_id'], unique=False)
+        batch_op.create_foreign_key('fk_question_document_id', 'ingested_document',
+                                    ['document_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_constraint('fk_question_document_id', type_='foreignkey')
+        batch_op.drop_index('ix_question_document_id')
+        batch_op.drop_column('document_id')
+    op.drop_table('ingested_document')
@@ -0,0 +1,36 @@
+"""add updated_at to question, company and user
+
+Revision ID: 71eca2504d9c
+Revises: fe48d445ca40
+Create Date: 2026-10-19 09:50:00.000000
+
+Existing rows are stamped with the upgrade time, so browsers revalidate
+their cached pages once.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '71eca2504d9c'
+down_revision = 'fe48d445ca40'
+branch_labels = None
+depends_on = None
+
+TABLES = ('question', 'company', 'user')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(sa.table(table, sa.column('updated_at')).update()
+                   .values(updated_at=sa.func.current_timestamp()))
+    op.create_index('ix_question_status_updated_at', 'question', ['status', 'updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_question_status_updated_at', table_name='question')
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,149 @@
+"""baseline schema
+
+Revision ID: 7384047d888d
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Databases made with db.create_all() before migrations were kept (such as
+instance/ascend.db) have some or all of these tables but no version row,
+so each table is only created when it is missing.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7384047d888d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'user' not in existing:
+        op.create_table('user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=128), nullable=True),
+            sa.Column('role', sa.String(length=20), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_user_email', 'user', ['email'], unique=True)
+
+    if 'company' not in existing:
+        op.create_table('company',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('industry', sa.String(length=50), nullable=True),
+            sa.Column('logo_url', sa.String(length=200), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+
+    if 'student' not in existing:
+        op.create_table('student',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('batch_year', sa.Integer(), nullable=True),
+            sa.Column('branch', sa.String(length=50), nullable=True),
+            sa.Column('skills', sa.String(length=200), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'alumni' not in existing:
+        op.create_table('alumni',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('current_company_id', sa.Integer(), nullable=True),
+            sa.Column('current_role', sa.String(length=100), nullable=True),
+            sa.Column('trust_score', sa.Integer(), nullable=True),
+            sa.Column('is_accepting_questions', sa.Boolean(), nullable=True),
+            sa.Column('is_verified', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['current_company_id'], ['company.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'question' not in existing:
+        op.create_table('question',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=True),
+            sa.Column('company_id', sa.Integer(), nullable=True),
+            sa.Column('title', sa.String(length=200), nullable=False),
+            sa.Column('body', sa.Text(), nullable=False),
+            sa.Column('category', sa.String(length=50), nullable=True),
+            sa.Column('urgency', sa.String(length=20), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('target_mentor_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['company_id'], ['company.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+            sa.ForeignKeyConstraint(['target_mentor_id'], ['alumni.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'response' not in existing:
+        op.create_table('response',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=True),
+            sa.Column('mentor_id', sa.Integer(), nullable=True),
+            sa.Column('body', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('helpful_count', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['mentor_id'], ['alumni.id']),
+            sa.ForeignKeyConstraint(['question_id'], ['question.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'feedback' not in existing:
+        op.create_table('feedback',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=True),
+            sa.Column('response_id', sa.Integer(), nullable=True),
+            sa.Column('student_id', sa.Integer(), nullable=True),
+            sa.Column('mentor_id', sa.Integer(), nullable=True),
+            sa.Column('outcome', sa.String(length=50), nullable=True),
+            sa.Column('rating', sa.Integer(), nullable=True),
+            sa.Column('comment', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['mentor_id'], ['alumni.id']),
+            sa.ForeignKeyConstraint(['question_id'], ['question.id']),
+            sa.ForeignKeyConstraint(['response_id'], ['response.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'referral' not in existing:
+        op.create_table('referral',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('student_id', sa.Integer(), nullable=True),
+            sa.Column('mentor_id', sa.Integer(), nullable=True),
+            sa.Column('company_id', sa.Integer(), nullable=True),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=True),
+            sa.Column('mentor_response', sa.Text(), nullable=True),
+            sa.Column('requested_at', sa.DateTime(), nullable=True),
+            sa.Column('responded_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['company_id'], ['company.id']),
+            sa.ForeignKeyConstraint(['mentor_id'], ['alumni.id']),
+            sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('referral')
+    op.drop_table('feedback')
+    op.drop_table('response')
+    op.drop_table('question')
+    op.drop_table('alumni')
+    op.drop_table('student')
+    op.drop_index('ix_user_email', table_name='user')
+    op.drop_table('company')
+    op.drop_table('user')
@@ -0,0 +1,50 @@
+"""add assignment and alumni.open_assignments
+
+Revision ID: ef62d5da2b1e
+Revises: 054a3738d53c
+Create Date: 2026-10-19 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision = 'ef62d5da2b1e'
+down_revision = '054a3738d53c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('assignment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=True),
+        sa.Column('mentor_id', sa.Integer(), nullable=True),
+        sa.Column('assigned_at', sa.DateTime(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=False),
+        sa.Column('state', sa.String(length=20), nullable=True),
+        sa.ForeignKeyConstraint(['mentor_id'], ['alumni.id']),
+        sa.ForeignKeyConstraint(['question_id'], ['question.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_assignment_question_id', 'assignment', ['question_id'], unique=False)
+    op.create_index('ix_assignment_mentor_state', 'assignment', ['mentor_id', 'state'], unique=False)
+    op.create_index('ix_assignment_state_lease', 'assignment', ['state', 'lease_expires_at'], unique=False)
+
+    # The server default fills existing rows, so NOT NULL holds on SQLite and PostgreSQL
+    op.add_column('alumni', sa.Column('open_assignments', sa.Integer(), server_default='0',
+                                      nullable=False))
+
+    from app.queue_manager import AssignmentManager
+    AssignmentManager.rebuild_counters(Session(bind=op.get_bind()))
+
+
+def downgrade():
+    with op.batch_alter_table('alumni') as batch_op:
+        batch_op.drop_column('open_assignments')
+    op.drop_index('ix_assignment_state_lease', table_name='assignment')
+    op.drop_index('ix_assignment_mentor_state', table_name='assignment')
+    op.drop_index('ix_assignment_question_id', table_name='assignment')
+    op.drop_table('assignment')
@@ -0,0 +1,40 @@
+"""add company_sla and question.sla_breached
+
+Revision ID: fe48d445ca40
+Revises: 1c4631836973
+Create Date: 2026-10-19 09:40:00.000000
+
+Existing questions start unflagged; run `flask sla rebuild` after
+upgrading to count the ones already past the SLA.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fe48d445ca40'
+down_revision = '1c4631836973'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('company_sla',
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('breached_count', sa.Integer(), nullable=False),
+        sa.Column('last_swept_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['company.id']),
+        sa.PrimaryKeyConstraint('company_id')
+    )
+    op.add_column('question', sa.Column('sla_breached', sa.Boolean(), server_default=sa.false(),
+                                        nullable=False))
+    op.create_index('ix_question_sla_sweep', 'question', ['status', 'sla_breached', 'created_at'],
+                    unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_question_sla_sweep', table_name='question')
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_column('sla_breached')
+    op.drop_table('company_sla')
@@ -0,0 +1,148 @@
+"""
+Compare database engine profiles under the same mixed read/write workload.
+
+Usage:
+    python scripts/benchmark_db.py [--threads 8] [--ops 200] [--postgres-url URL]
+
+Each profile gets a fresh database. Worker threads then each run the same
+sequence of operations: mostly knowledge-base style reads, with question
+inserts and status updates mixed in. Reports throughput, latency
+percentiles and "database is locked" errors per profile.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import OperationalError
+
+from app import create_app, db
+from app.models import Company, Question
+from config import Config
+
+
+def make_config(uri, sqlite_pragmas):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLITE_PRAGMAS = sqlite_pragmas
+    return BenchConfig
+
+
+def seed(app, questions=500):
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        company = Company(name='Bench Co', industry='Technology')
+        db.session.add(company)
+        db.session.commit()
+        db.session.add_all(
+            Question(company_id=company.id, title=f'Seed question {i}',
+                     body='How should I prepare?', status='answered' if i % 2 else 'pending')
+            for i in range(questions)
+        )
+        db.session.commit()
+        return company.id
+
+
+def worker(app, company_id, ops, write_ratio, seed_value, results):
+    rng = random.Random(seed_value)
+    latencies = []
+    locked = 0
+
+    with app.app_context():
+        for i in range(ops):
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    if i % 2:
+                        db.session.add(Question(company_id=company_id, title='Bench question',
+                                                body='Body', status='pending'))
+                    else:
+                        question = Question.query.filter_by(status='pending').first()
+                        if question:
+                            question.status = 'answered'
+                    db.session.commit()
+                else:
+                    Question.query.filter_by(status='answered')\
+                        .order_by(Question.created_at.desc()).limit(10).all()
+                    Question.query.filter_by(company_id=company_id, status='pending').count()
+                    db.session.rollback()
+            except OperationalError as exc:
+                db.session.rollback()
+                if 'locked' in str(exc).lower():
+                    locked += 1
+                else:
+                    raise
+            latencies.append(time.perf_counter() - started)
+        db.session.remove()
+
+    results.append((latencies, locked))
+
+
+def run_profile(name, config_class, threads, ops, write_ratio):
+    app = create_app(config_class)
+    company_id = seed(app)
+
+    results = []
+    pool = [
+        threading.Thread(target=worker, args=(app, company_id, ops, write_ratio, n, results))
+        for n in range(threads)
+    ]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        db.engine.dispose()
+
+    latencies = sorted(l for lats, _ in results for l in lats)
+    locked = sum(l for _, l in results)
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        'profile': name,
+        'ops_per_sec': len(latencies) / elapsed,
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'locked_errors': locked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=200, help='operations per thread')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--postgres-url', help='also benchmark this PostgreSQL database')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='ascend-bench-')
+    profiles = [
+        ('sqlite (no pragmas)', make_config(
+            'sqlite:///' + os.path.join(tmpdir, 'baseline.db'), {})),
+        ('sqlite (WAL profile)', make_config(
+            'sqlite:///' + os.path.join(tmpdir, 'tuned.db'), Config.SQLITE_PRAGMAS)),
+    ]
+    if args.postgres_url:
+        profiles.append(('postgres (pooled)', make_config(args.postgres_url, {})))
+
+    print(f'{args.threads} threads x {args.ops} ops, write ratio {args.write_ratio}')
+    print(f"{'profile':<24}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'locked':>8}")
+    for name, config_class in profiles:
+        r = run_profile(name, config_class, args.threads, args.ops, args.write_ratio)
+        print(f"{r['profile']:<24}{r['ops_per_sec']:>10.1f}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['locked_errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
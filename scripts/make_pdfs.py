@@ -1,63 +1,60 @@
-import markdown
-from xhtml2pdf import pisa
+"""
+Convert Markdown documents to PDF in parallel.
+
+Usage:
+    python scripts/make_pdfs.py DOC.md [DOC.md ...] [--out-dir extras/pdfs] [--workers 4]
+
+Each document becomes <out-dir>/<name>.pdf, rendered with the same styling
+and converter as the in-app reports (app.pdf). Documents whose PDF is newer
+than the Markdown source are skipped.
+"""
+
+import argparse
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.pdf import markdown_to_html, html_to_pdf, PDFError
+
+
+def convert(input_path, output_path):
+    with open(input_path, 'r', encoding='utf-8') as f:
+        html = markdown_to_html(f.read())
+    return html_to_pdf(html, output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert Markdown documents to PDF.')
+    parser.add_argument('inputs', nargs='+', help='Markdown files')
+    parser.add_argument('--out-dir', default='.', help='Directory for the PDFs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = {}
+    for input_path in args.inputs:
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(args.out_dir, f'{name}.pdf')
+        if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(input_path):
+            print(f'Up to date: {output_path}')
+            continue
+        jobs[input_path] = output_path
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(convert, src, dest): src for src, dest in jobs.items()}
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                print(f'Created {future.result()}')
+            except (OSError, PDFError) as e:
+                failed += 1
+                print(f'Failed to convert {src}: {e}')
+
+    return 1 if failed else 0
+
 
-# Define input paths (Artifacts)
-summary_path = r"C:\Users\91940\.gemini\antigravity\brain\812cffc3-b5e6-4226-b5fe-010ff63812a3\project_summary.md"
-sitemap_path = r"C:\Users\91940\.gemini\antigravity\brain\812cffc3-b5e6-4226-b5fe-010ff63812a3\ui_sitemap.md"
-features_path = r"C:\Users\91940\.gemini\antigravity\brain\812cffc3-b5e6-4226-b5fe-010ff63812a3\feature_list.md"
-
-# Define output paths (Current Directory)
-summary_out = "ASCEND_Project_Summary.pdf"
-sitemap_out = "ASCEND_UI_Sitemap.pdf"
-features_out = "ASCEND_Feature_List.pdf"
-
-def convert_md_to_pdf(input_path, output_path):
-    print(f"Converting {input_path} to {output_path}...")
-    
-    try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            md_content = f.read()
-            
-        # Convert MD to HTML
-        html_content = markdown.markdown(md_content, extensions=['tables', 'fenced_code'])
-        
-        # Add basic styling
-        full_html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Helvetica, sans-serif; font-size: 12pt; }}
-                h1 {{ color: #2563EB; border-bottom: 2px solid #2563EB; padding-bottom: 10px; }}
-                h2 {{ color: #10B981; margin-top: 20px; }}
-                h3 {{ color: #4B5563; }}
-                code {{ background-color: #F3F4F6; padding: 2px 4px; border-radius: 4px; font-family: Courier New, monospace; }}
-                pre {{ background-color: #F3F4F6; padding: 10px; border-radius: 5px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #f2f2f2; }}
-                .shadow {{ box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
-        
-        # Convert HTML to PDF
-        with open(output_path, "wb") as pdf_file:
-            pisa_status = pisa.CreatePDF(full_html, dest=pdf_file)
-            
-        if pisa_status.err:
-            print(f"Error converting {input_path}")
-        else:
-            print(f"Successfully created {output_path}")
-            
-    except Exception as e:
-        print(f"Failed to convert: {str(e)}")
-
-# Run conversions
-convert_md_to_pdf(summary_path, summary_out)
-convert_md_to_pdf(sitemap_path, sitemap_out)
-convert_md_to_pdf(features_path, features_out)
+if __name__ == '__main__':
+    sys.exit(main())
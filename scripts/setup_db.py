@@ -1,11 +1,14 @@
+from flask_migrate import stamp
 from app import create_app, db
 from app.models import User, Student, Alumni, Company, Question, Response
+from app.related_questions import RelatedQuestionIndex
 
 app = create_app()
 
 with app.app_context():
     db.drop_all() # Clean slate for development
     db.create_all()
+    stamp()  # the new tables match the latest migration
     print("Database tables created successfully!")
 
     # 1. Create Companies
@@ -85,6 +88,9 @@ with app.app_context():
     db.session.commit()
     print("Demo Questions added.")
 
+    RelatedQuestionIndex.rebuild()
+    print("Related questions indexed.")
+
     # 5. Create Admin
     admin_user = User(name='Admin User', email='admin@ascend.edu', role='admin')
     admin_user.set_password('admin123')
@@ -0,0 +1,136 @@
+import unittest
+from sqlalchemy import event
+from datetime import date, datetime
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Question, Response, Feedback, FeedbackRollup
+from app.analytics import FeedbackRollups
+from app.trust_calculator import FeedbackManager
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+
+class FeedbackRollupCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.google = Company(name='Google', industry='Technology')
+        student_user = User(name='s', email='s@example.com', role='student')
+        mentor_user = User(name='m', email='m@example.com', role='alumni')
+        db.session.add_all([self.google, student_user, mentor_user])
+        db.session.commit()
+        self.student = Student(user_id=student_user.id)
+        self.mentor = Alumni(user_id=mentor_user.id, current_company_id=self.google.id)
+        db.session.add_all([self.student, self.mentor])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def answered_question(self, company_id):
+        q = Question(student_id=self.student.id, company_id=company_id, title='q', body='b',
+                     status='answered')
+        db.session.add(q)
+        db.session.commit()
+        db.session.add(Response(question_id=q.id, mentor_id=self.mentor.id, body='a'))
+        db.session.commit()
+        return q
+
+    def test_week_buckets_start_on_monday(self):
+        self.assertEqual(FeedbackRollups.bucket_start('week', datetime(2024, 1, 10, 15)), date(2024, 1, 8))
+        self.assertEqual(FeedbackRollups.bucket_start('day', datetime(2024, 1, 10, 15)), date(2024, 1, 10))
+
+    def test_outcomes_per_company_per_week(self):
+        mid = self.mentor.id
+        FeedbackRollups.record(mid, self.google.id, 'helpful', 4, datetime(2024, 1, 8))
+        FeedbackRollups.record(mid, self.google.id, 'helpful', 2, datetime(2024, 1, 12))
+        FeedbackRollups.record(mid, self.google.id, 'got_referral', 5, datetime(2024, 1, 16))
+        FeedbackRollups.record(mid, None, 'not_helpful', None, datetime(2024, 1, 16))
+        db.session.commit()
+
+        rows = FeedbackRollups.outcomes_by_company('week', start=date(2024, 1, 1))
+
+        self.assertEqual([(r['bucket_start'], r['company_name'], r['outcome'], r['count']) for r in rows], [
+            (date(2024, 1, 8), 'Google', 'helpful', 2),
+            (date(2024, 1, 15), None, 'not_helpful', 1),
+            (date(2024, 1, 15), 'Google', 'got_referral', 1),
+        ])
+        self.assertEqual(rows[0]['average_rating'], 3)
+        self.assertIsNone(rows[1]['average_rating'])
+        self.assertEqual(len(FeedbackRollups.outcomes_by_company('day')), 4)
+
+    def test_resubmitted_feedback_moves_between_outcomes(self):
+        q = self.answered_question(self.google.id)
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 3)
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'got_interview', 5)
+
+        rows = FeedbackRollups.outcomes_by_company('week')
+        self.assertEqual([(r['outcome'], r['count'], r['average_rating']) for r in rows],
+                         [('got_interview', 1, 5)])
+
+        stats = FeedbackManager.get_feedback_stats()
+        self.assertEqual(stats['total_feedback'], 1)
+        self.assertEqual(stats['got_interview'], 1)
+        self.assertEqual(stats['helpful'], 0)
+        self.assertEqual(stats['average_rating'], 5)
+
+    def test_first_submission_is_counted_once(self):
+        q = self.answered_question(self.google.id)
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 4)
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 4)  # double-click
+
+        rows = FeedbackRollups.outcomes_by_company('week')
+        self.assertEqual([(r['outcome'], r['count']) for r in rows], [('helpful', 1)])
+        self.assertAlmostEqual(db.session.get(Alumni, self.mentor.id).decayed_trust_sum,
+                               self.decayed_sum_after_one('helpful'), places=6)
+
+    def test_update_replaces_what_another_submission_wrote(self):
+        q = self.answered_question(self.google.id)
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 4)
+
+        # Another worker changes the outcome between our read and our update
+        engine = db.engine
+        def concurrent_write(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('UPDATE feedback') and not raced:
+                raced.append(True)
+                cursor.execute("UPDATE feedback SET outcome = 'got_referral', rating = 2")
+        raced = []
+        event.listen(engine, 'before_cursor_execute', concurrent_write)
+        try:
+            _, previous, _ = FeedbackManager.upsert_feedback(
+                question_id=q.id, response_id=None, student_id=self.student.id,
+                mentor_id=self.mentor.id, outcome='got_interview', rating=5, comment=None,
+                created_at=datetime.utcnow())
+        finally:
+            event.remove(engine, 'before_cursor_execute', concurrent_write)
+        self.assertTrue(raced)
+        self.assertEqual(previous, ('got_referral', 2))
+        self.assertEqual(Feedback.query.one().outcome, 'got_interview')
+
+    def decayed_sum_after_one(self, outcome):
+        from app.trust_calculator import DecayedTrust
+        feedback = Feedback.query.one()
+        return DecayedTrust.anchored(DecayedTrust.outcome_weight(outcome), feedback.created_at)
+
+    def test_rebuild_matches_incremental(self):
+        for outcome in ('helpful', 'got_referral'):
+            q = self.answered_question(self.google.id)
+            FeedbackManager.submit_feedback(q.id, self.student.id, outcome, 4)
+        incremental = FeedbackRollups.outcomes_by_company('day')
+
+        FeedbackRollup.query.delete()
+        db.session.commit()
+        FeedbackRollups.rebuild()
+
+        self.assertEqual(FeedbackRollups.outcomes_by_company('day'), incremental)
+        self.assertEqual(Feedback.query.count(), 2)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
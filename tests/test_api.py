@@ -0,0 +1,136 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Question, Response, Referral
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+
+class ApiTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        company = Company(name='Google', industry='Technology')
+        db.session.add(company)
+        u = User(name='Student', email='student@example.com', role='student')
+        u.set_password('password')
+        m = User(name='Mentor', email='mentor@example.com', role='alumni')
+        m.set_password('password')
+        db.session.add_all([u, m])
+        db.session.commit()
+        self.student = Student(user_id=u.id)
+        self.mentor = Alumni(user_id=m.id, current_company_id=company.id, is_verified=True)
+        db.session.add_all([self.student, self.mentor])
+        db.session.commit()
+
+        start = datetime(2024, 1, 1)
+        for i in range(5):
+            q = Question(student_id=self.student.id, company_id=company.id, title=f'Question {i}',
+                         body='Body', status='answered', created_at=start + timedelta(days=i))
+            db.session.add(q)
+            db.session.commit()
+            db.session.add(Response(question_id=q.id, mentor_id=self.mentor.id, body='Answer'))
+        db.session.add(Referral(student_id=self.student.id, mentor_id=self.mentor.id,
+                                company_id=company.id, message='Please refer me'))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email):
+        self.client.post('/auth/login', data=dict(email=email, password='password'))
+
+    def test_requires_login(self):
+        response = self.client.get('/api/v1/knowledge_base')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('error', response.get_json())
+
+    def test_knowledge_base_cursor_and_fields(self):
+        self.login('student@example.com')
+        first = self.client.get('/api/v1/knowledge_base?limit=2&fields=id,title,answered_by').get_json()
+        self.assertEqual([i['title'] for i in first['items']], ['Question 4', 'Question 3'])
+        self.assertEqual(set(first['items'][0]), {'id', 'title', 'answered_by'})
+        self.assertEqual(first['items'][0]['answered_by'], 'Mentor')
+
+        titles = [i['title'] for i in first['items']]
+        cursor = first['next_cursor']
+        while cursor:
+            page = self.client.get(f'/api/v1/knowledge_base?limit=2&fields=title&cursor={cursor}').get_json()
+            titles.extend(i['title'] for i in page['items'])
+            cursor = page['next_cursor']
+        self.assertEqual(titles, [f'Question {i}' for i in range(4, -1, -1)])
+
+        bad = self.client.get('/api/v1/knowledge_base?fields=password_hash')
+        self.assertEqual(bad.status_code, 400)
+
+    def test_knowledge_base_reads_through_to_archive(self):
+        from app.archive import ArchiveManager
+        old = [q.id for q in Question.query.filter(Question.title.in_(['Question 0', 'Question 1']))]
+        ArchiveManager.archive_batch(old)
+        self.login('student@example.com')
+
+        def pages(limit, **params):
+            cursor, result = None, []
+            while True:
+                query = dict(params, limit=limit, fields='title,answered_by')
+                if cursor:
+                    query['cursor'] = cursor
+                page = self.client.get('/api/v1/knowledge_base', query_string=query).get_json()
+                result.append([i['title'] for i in page['items']])
+                cursor = page['next_cursor']
+                if not cursor:
+                    return result
+
+        self.assertEqual(pages(2), [['Question 4', 'Question 3'], ['Question 2', 'Question 1'],
+                                    ['Question 0']])
+        # The hot questions fill the first page exactly
+        self.assertEqual(pages(3), [['Question 4', 'Question 3', 'Question 2'],
+                                    ['Question 1', 'Question 0']])
+        self.assertEqual(pages(2, q='Question 0'), [['Question 0']])
+        answered_by = self.client.get('/api/v1/knowledge_base?q=Question 1&fields=answered_by').get_json()
+        self.assertEqual(answered_by['items'], [{'answered_by': 'Mentor'}])
+
+    def test_student_dashboard_and_roles(self):
+        self.login('student@example.com')
+        data = self.client.get('/api/v1/student/dashboard?fields=question_count,answered_count').get_json()
+        self.assertEqual(data, {'question_count': 5, 'answered_count': 5})
+        self.assertEqual(self.client.get('/api/v1/mentor/queue').status_code, 403)
+
+    def test_batch(self):
+        self.login('mentor@example.com')
+        response = self.client.post('/api/v1/batch', json={'requests': [
+            {'id': 'dash', 'resource': 'mentor_dashboard', 'params': {'fields': 'answered_count,trust_badge'}},
+            {'id': 'refs', 'resource': 'referrals', 'params': {'status': 'requested'}},
+            {'id': 'student', 'resource': 'student_dashboard'},
+            {'id': 'nope', 'resource': 'missing'},
+        ]})
+        data = response.get_json()['responses']
+        self.assertEqual(data['dash']['data'], {'answered_count': 5, 'trust_badge': 'Silver'})
+        self.assertEqual(data['refs']['data']['items'][0]['student_name'], 'Student')
+        self.assertEqual(data['student']['status'], 403)
+        self.assertEqual(data['nope']['status'], 404)
+
+    def test_batch_rejects_malformed_bodies(self):
+        self.login('mentor@example.com')
+        for body in ([{'resource': 'referrals'}], 'requests', 3):
+            response = self.client.post('/api/v1/batch', json=body)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json()['error'], 'Body must be a JSON object')
+
+        response = self.client.post('/api/v1/batch', json={'requests': [
+            {'id': 'bad', 'resource': 'referrals', 'params': ['status', 'requested']},
+            {'id': 'good', 'resource': 'referrals', 'params': {'status': 'requested'}},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['responses']
+        self.assertEqual(data['bad'], {'status': 400, 'error': 'params must be an object'})
+        self.assertEqual(data['good']['status'], 200)
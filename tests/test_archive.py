@@ -0,0 +1,128 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import (User, Student, Alumni, Company, Question, Response, Feedback, RelatedQuestion,
+                        ArchivedQuestion, ArchivedResponse, ArchivedFeedback)
+from app.archive import ArchiveManager, ArchiveCollisionError
+from app.queries import student_question_counts
+from app.trust_calculator import TrustCalculator
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+    ARCHIVE_AFTER_DAYS = 365
+
+class ArchiveCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        company = Company(name='Google', industry='Technology')
+        student_user = User(name='Student', email='s@example.com', role='student')
+        student_user.set_password('password')
+        mentor_user = User(name='Mentor', email='m@example.com', role='alumni')
+        db.session.add_all([company, student_user, mentor_user])
+        db.session.commit()
+        self.student = Student(user_id=student_user.id)
+        self.mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id)
+        db.session.add_all([self.student, self.mentor])
+        db.session.commit()
+
+        now = datetime.utcnow()
+        self.old = [self.answered(f'Old question {i}', now - timedelta(days=400 + i)) for i in range(3)]
+        self.recent = self.answered('Recent question', now - timedelta(days=5))
+        db.session.add(RelatedQuestion(question_id=self.recent, related_id=self.old[0], score=0.5))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def answered(self, title, at):
+        q = Question(student_id=self.student.id, company_id=self.mentor.current_company_id, title=title,
+                     body='Body', status='answered', created_at=at, updated_at=at)
+        db.session.add(q)
+        db.session.commit()
+        r = Response(question_id=q.id, mentor_id=self.mentor.id, body=f'Answer to {title}', created_at=at)
+        db.session.add(r)
+        db.session.commit()
+        db.session.add(Feedback(question_id=q.id, response_id=r.id, student_id=self.student.id,
+                                mentor_id=self.mentor.id, outcome='helpful', rating=4, created_at=at))
+        db.session.commit()
+        return q.id
+
+    def login(self):
+        self.client.post('/auth/login', data=dict(email='s@example.com', password='password'))
+
+    def test_archive_moves_rows_in_batches(self):
+        counts_before = TrustCalculator.get_outcome_counts(self.mentor.id)
+        recent_stamp = db.session.get(Question, self.recent).updated_at
+
+        self.assertEqual(ArchiveManager.archive(batch_size=2), 3)
+
+        self.assertEqual(Question.query.count(), 1)
+        self.assertEqual((ArchivedQuestion.query.count(), ArchivedResponse.query.count(),
+                          ArchivedFeedback.query.count()), (3, 3, 3))
+        self.assertEqual(Response.query.count(), 1)
+        self.assertEqual(Feedback.query.count(), 1)
+        self.assertEqual(RelatedQuestion.query.count(), 0)
+        self.assertGreater(db.session.get(Question, self.recent).updated_at, recent_stamp)
+
+        # Aggregates that span the move are unchanged
+        self.assertEqual(TrustCalculator.get_outcome_counts(self.mentor.id), counts_before)
+        self.assertEqual(student_question_counts(self.student.id), (4, 4))
+        self.assertEqual(ArchiveManager.archive(), 0)
+
+    def test_pages_read_through_to_archive(self):
+        ArchiveManager.archive()
+        self.login()
+
+        page = self.client.get(f'/question/{self.old[1]}')
+        self.assertEqual(page.status_code, 200)
+        self.assertIn('Answer to Old question 1', page.get_data(as_text=True))
+        self.assertEqual(self.client.get('/question/9999').status_code, 404)
+
+        kb = ArchiveManager.knowledge_base_page(1, per_page=2)
+        self.assertEqual([q.title for q in kb.items], ['Recent question', 'Old question 0'])
+        self.assertEqual((kb.total, kb.pages, kb.next_num), (4, 2, 2))
+        second = ArchiveManager.knowledge_base_page(2, per_page=2)
+        self.assertEqual([q.title for q in second.items], ['Old question 1', 'Old question 2'])
+
+        html = self.client.get('/knowledge_base?q=Old').get_data(as_text=True)
+        self.assertIn('Old question 2', html)
+        self.assertNotIn('Recent question', html)
+
+    def test_archived_ids_are_not_reused(self):
+        # The newest rows are the ones SQLite would otherwise hand out again
+        newest = self.answered('Newest old question', datetime.utcnow() - timedelta(days=500))
+        newest_response = Response.query.filter_by(question_id=newest).one().id
+        ArchiveManager.archive()
+
+        later = self.answered('Later question', datetime.utcnow())
+        self.assertGreater(later, newest)
+        self.assertGreater(Response.query.filter_by(question_id=later).one().id, newest_response)
+        self.assertEqual(ArchiveManager.archive_batch([later]), 1)
+
+    def test_collision_refuses_the_batch(self):
+        taken = Response.query.filter_by(question_id=self.old[1]).one().id
+        db.session.add(ArchivedResponse(id=taken, question_id=None, body='Stale copy'))
+        db.session.commit()
+
+        with self.assertRaises(ArchiveCollisionError):
+            ArchiveManager.archive_batch(self.old)
+        db.session.rollback()
+        self.assertEqual(Question.query.count(), 4)
+        self.assertEqual(ArchivedQuestion.query.count(), 0)
+
+        result = self.app.test_cli_runner().invoke(args=['archive', 'run'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('already archived', result.output)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
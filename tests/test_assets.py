@@ -0,0 +1,59 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from flask import url_for
+from app import create_app, db
+from app.assets import AssetPipeline
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class AssetPipelineCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        # Build into a copy so the test never writes into the source tree
+        self.static = tempfile.mkdtemp()
+        shutil.copytree(self.app.static_folder, self.static, dirs_exist_ok=True)
+        self.app.static_folder = self.static
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.static)
+
+    def test_build_and_serve(self):
+        manifest = AssetPipeline.build(self.static)
+        self.app.extensions['asset_manifest'] = manifest
+
+        hashed = manifest['css/style.css']
+        self.assertRegex(hashed, r'^dist/css/style\.[0-9a-f]{10}\.css$')
+        self.assertTrue(os.path.isfile(os.path.join(self.static, hashed + '.gz')))
+
+        with self.app.test_request_context():
+            url = url_for('static', filename='css/style.css')
+        self.assertEqual(url, '/static/' + hashed)
+
+        with open(os.path.join(self.static, 'css', 'style.css'), 'rb') as f:
+            original = f.read()
+
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(gzip.decompress(response.data), original)
+        response.close()
+
+        plain = self.client.get(url, headers={'Accept-Encoding': 'identity'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.data, original)
+        plain.close()
+
+    def test_unbuilt_assets_use_plain_static_urls(self):
+        self.app.extensions['asset_manifest'] = {}
+        with self.app.test_request_context():
+            self.assertEqual(url_for('static', filename='js/main.js'), '/static/js/main.js')
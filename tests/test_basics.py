@@ -23,3 +23,39 @@ class BasicTestCase(unittest.TestCase):
 
     def test_app_is_testing(self):
         self.assertTrue(self.app.config['TESTING'])
+
+class EngineProfileTestCase(unittest.TestCase):
+    def test_sqlite_pragmas_applied(self):
+        import os
+        import tempfile
+        from sqlalchemy import text
+
+        tmpdir = tempfile.mkdtemp()
+
+        class FileConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmpdir, 'test.db')
+
+        app = create_app(FileConfig)
+        with app.app_context():
+            self.assertEqual(app.config['DATABASE_PROFILE'], 'sqlite')
+            with db.engine.connect() as conn:
+                self.assertEqual(conn.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+                self.assertEqual(conn.execute(text('PRAGMA synchronous')).scalar(), 1)  # NORMAL
+                self.assertEqual(conn.execute(text('PRAGMA busy_timeout')).scalar(), 5000)
+            db.engine.dispose()
+
+    def test_postgres_pool_options(self):
+        from flask import Flask
+        from app.database import engine_profile, configure_engine_options
+
+        class PostgresConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = 'postgresql://user:pw@localhost/ascend'
+
+        app = Flask(__name__)
+        app.config.from_object(PostgresConfig)
+        self.assertEqual(engine_profile(app.config['SQLALCHEMY_DATABASE_URI']), 'postgres')
+        configure_engine_options(app)
+        options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(options['pool_size'], 10)
+        self.assertEqual(options['pool_recycle'], 1800)
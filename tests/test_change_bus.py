@@ -0,0 +1,125 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import User, Alumni, Company, ChangeLog
+from app.change_bus import change_bus, ChangeBus
+from app.fragment_cache import fragment_versions, queue_invalidation
+from app.matching import industry_index
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+    CHANGE_BUS_POLL_SECONDS = 0
+
+OTHER_WORKER = 'other-host:4242:deadbeef'
+
+class ChangeBusCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        change_bus.reset()
+        industry_index.refresh()
+
+        self.company = Company(name='Google', industry='Technology')
+        user = User(name='m', email='m@example.com', role='alumni')
+        db.session.add_all([self.company, user])
+        db.session.commit()
+        self.mentor = Alumni(user_id=user.id, current_company_id=self.company.id,
+                             trust_score=60, is_verified=True)
+        db.session.add(self.mentor)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def log(self, table, entity_id, origin=OTHER_WORKER):
+        db.session.execute(ChangeLog.__table__.insert().values(
+            origin=origin, table_name=table, entity_id=entity_id, created_at=datetime.utcnow()))
+        db.session.commit()
+
+    def test_commit_appends_to_change_log(self):
+        entries = {(row.table_name, row.entity_id, row.origin) for row in ChangeLog.query}
+        self.assertIn(('company', self.company.id, change_bus.origin), entries)
+        self.assertIn(('alumni', self.mentor.id, change_bus.origin), entries)
+
+        before = ChangeLog.query.count()
+        self.company.name = 'Alphabet'
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(ChangeLog.query.count(), before)
+
+        queue_invalidation(db.session, 'question', 99)
+        db.session.commit()
+        self.assertEqual(ChangeLog.query.filter_by(table_name='question', entity_id=99).count(), 1)
+
+    def test_replays_other_workers_changes(self):
+        self.assertEqual(industry_index.top_mentor_ids(), [self.mentor.id])
+        change_bus.poll(force=True)  # first poll starts at the tip
+
+        # Another worker revokes the mentor; this process never saw the ORM change
+        db.session.execute(Alumni.__table__.update().values(is_verified=False))
+        db.session.commit()
+        db.session.expire_all()
+        self.assertEqual(industry_index.top_mentor_ids(), [self.mentor.id])
+
+        version = fragment_versions.get('alumni', self.mentor.id)
+        self.log('alumni', self.mentor.id)
+        self.assertEqual(change_bus.poll(force=True), 1)
+        self.assertEqual(industry_index.top_mentor_ids(), [])
+        self.assertEqual(fragment_versions.get('alumni', self.mentor.id), version + 1)
+
+    def test_own_entries_are_not_replayed(self):
+        change_bus.poll(force=True)
+        self.log('company', self.company.id, origin=change_bus.origin)
+        self.assertEqual(change_bus.poll(force=True), 0)
+
+    def test_entry_committed_out_of_id_order_is_replayed(self):
+        change_bus.poll(force=True)
+        self.log('company', self.company.id)
+        late_id = ChangeLog.query.order_by(ChangeLog.id.desc()).first().id
+        # Simulate a lower id becoming visible only after a higher one was polled
+        db.session.execute(ChangeLog.__table__.update().where(ChangeLog.id == late_id)
+                           .values(id=late_id + 100))
+        db.session.commit()
+        self.assertEqual(change_bus.poll(force=True), 1)
+
+        version = fragment_versions.get('alumni', self.mentor.id)
+        db.session.execute(ChangeLog.__table__.insert().values(
+            id=late_id, origin=OTHER_WORKER, table_name='alumni', entity_id=self.mentor.id,
+            created_at=datetime.utcnow()))
+        db.session.commit()
+        self.assertEqual(change_bus.poll(force=True), 1)
+        self.assertEqual(fragment_versions.get('alumni', self.mentor.id), version + 1)
+        # Applied once only, although it stays inside the lag window
+        self.assertEqual(change_bus.poll(force=True), 0)
+
+    def test_polled_before_requests(self):
+        self.app.test_client().get('/')
+        version = fragment_versions.get('company', self.company.id)
+        self.log('company', self.company.id)
+        self.app.test_client().get('/')
+        self.assertEqual(fragment_versions.get('company', self.company.id), version + 1)
+
+    def test_failed_poll_does_not_fail_the_request(self):
+        ChangeLog.__table__.drop(db.engine)
+        with self.assertLogs(self.app.logger, 'WARNING'):
+            response = self.app.test_client().get('/auth/login')
+        self.assertEqual(response.status_code, 200)
+        ChangeLog.__table__.create(db.engine)
+
+    def test_prune(self):
+        db.session.execute(ChangeLog.__table__.update().values(
+            created_at=datetime.utcnow() - timedelta(hours=48)))
+        db.session.commit()
+        self.log('company', self.company.id)
+        self.assertGreater(ChangeBus.prune(24), 0)
+        self.assertEqual(ChangeLog.query.count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Question
+from app.events import event_bus, company_topic, mentor_topic
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SSE_HEARTBEAT_SECONDS = 0.01
+    SSE_MAX_STREAM_SECONDS = 0.05
+
+class EventBusCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.company = Company(name='Google', industry='Technology')
+        db.session.add(self.company)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_events_published_after_commit_only(self):
+        subscription = event_bus.subscribe([company_topic(self.company.id)])
+        try:
+            q = Question(company_id=self.company.id, title='New', body='b')
+            db.session.add(q)
+            db.session.flush()
+            self.assertIsNone(subscription.get(timeout=0))
+            db.session.commit()
+
+            event = subscription.get(timeout=0)
+            self.assertEqual(event['type'], 'question.new')
+            self.assertEqual(event['data']['id'], q.id)
+
+            q.status = 'answered'
+            db.session.commit()
+            self.assertEqual(subscription.get(timeout=0)['type'], 'question.taken')
+
+            db.session.add(Question(company_id=self.company.id, title='Rolled back', body='b'))
+            db.session.flush()
+            db.session.rollback()
+            self.assertIsNone(subscription.get(timeout=0))
+        finally:
+            subscription.close()
+
+    def test_subscriber_gets_each_event_once(self):
+        subscription = event_bus.subscribe([company_topic(1), mentor_topic(1), 'other'])
+        try:
+            self.assertEqual(event_bus.publish([company_topic(1), mentor_topic(1)], 'x', {}), 1)
+            self.assertIsNotNone(subscription.get(timeout=0))
+            self.assertIsNone(subscription.get(timeout=0))
+        finally:
+            subscription.close()
+        self.assertEqual(event_bus.publish([company_topic(1)], 'x', {}), 0)
+
+    def test_mentor_event_stream(self):
+        u = User(name='Mentor', email='mentor@example.com', role='alumni')
+        u.set_password('password')
+        db.session.add(u)
+        db.session.commit()
+        db.session.add(Alumni(user_id=u.id, current_company_id=self.company.id))
+        db.session.commit()
+
+        client = self.app.test_client()
+        client.post('/auth/login', data=dict(email='mentor@example.com', password='password'))
+        response = client.get('/mentor/events')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.startswith('retry:'))
+        self.assertIn(': keep-alive', body)
+        self.assertEqual(event_bus.subscriber_count(), 0)
+
+        # A response that is never iterated must not leave a subscriber behind
+        from flask_login import login_user
+        from app.routes.main import mentor_events
+        with self.app.test_request_context('/mentor/events'):
+            login_user(u)
+            unread = mentor_events()
+            self.assertEqual(event_bus.subscriber_count(), 0)
+            unread.close()
@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Question, Response, Feedback, Referral
+from app.archive import ArchiveManager
+from app.exports import ExportManager, _csv_value
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    EXPORT_CHUNK_ROWS = 2
+
+class ExportCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.google = Company(name='Google', industry='Technology')
+        self.amazon = Company(name='Amazon', industry='Retail')
+        student_user = User(name='Sam', email='s@example.com', role='student')
+        mentor_user = User(name='Mira', email='m@example.com', role='alumni')
+        admin = User(name='a', email='a@example.com', role='admin')
+        for user in (student_user, mentor_user, admin):
+            user.set_password('pw')
+        db.session.add_all([self.google, self.amazon, student_user, mentor_user, admin])
+        db.session.commit()
+
+        student = Student(user_id=student_user.id)
+        mentor = Alumni(user_id=mentor_user.id, current_company_id=self.google.id, is_verified=True)
+        db.session.add_all([student, mentor])
+        db.session.commit()
+
+        for day in range(1, 6):
+            company = self.google if day % 2 else self.amazon
+            question = Question(student_id=student.id, company_id=company.id, title=f'Q{day}',
+                                body='How, "exactly"?\nLine two', status='answered',
+                                created_at=datetime(2024, 3, day, 12))
+            db.session.add(question)
+            db.session.flush()
+            db.session.add(Response(question_id=question.id, mentor_id=mentor.id, body=f'A{day}',
+                                    created_at=datetime(2024, 3, day, 13)))
+            db.session.flush()
+            db.session.add(Feedback(question_id=question.id, student_id=student.id, mentor_id=mentor.id,
+                                    outcome='helpful', rating=day, created_at=datetime(2024, 3, day, 14)))
+        db.session.add(Referral(student_id=student.id, mentor_id=mentor.id, company_id=self.google.id,
+                                message='Please', requested_at=datetime(2024, 3, 2)))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email):
+        client = self.app.test_client()
+        client.post('/auth/login', data={'email': email, 'password': 'pw'})
+        return client
+
+    def test_csv_is_streamed_in_chunks_with_joined_names(self):
+        chunks = list(ExportManager.stream('questions', 'csv'))
+        self.assertEqual(len(chunks), 3)  # 5 rows, 2 per chunk
+
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual([r['title'] for r in rows], ['Q1', 'Q2', 'Q3', 'Q4', 'Q5'])
+        self.assertEqual(rows[0]['company_name'], 'Google')
+        self.assertEqual(rows[0]['answered_by'], 'Mira')
+        self.assertEqual(rows[0]['body'], 'How, "exactly"?\nLine two')
+
+    def test_csv_neutralises_formulas_but_jsonl_does_not(self):
+        question = Question.query.filter_by(title='Q1').one()
+        question.title = '=HYPERLINK("http://evil.example","x")'
+        question.body = '@SUM(1+1)'
+        db.session.commit()
+
+        rows = list(csv.DictReader(io.StringIO(''.join(ExportManager.stream('questions', 'csv')))))
+        self.assertEqual(rows[0]['title'], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(rows[0]['body'], "'@SUM(1+1)")
+        self.assertEqual(rows[1]['title'], 'Q2')
+        for value in ('+1', '-1'):
+            self.assertEqual(_csv_value(value), "'" + value)
+        self.assertEqual(_csv_value(-1), -1)
+
+        line = json.loads(''.join(ExportManager.stream('questions', 'jsonl')).splitlines()[0])
+        self.assertEqual(line['body'], '@SUM(1+1)')
+
+    def test_filters_by_date_range_and_company(self):
+        lines = ''.join(ExportManager.stream('responses', 'jsonl', date_from=date(2024, 3, 2),
+                                             date_to=date(2024, 3, 4),
+                                             company_id=self.google.id)).splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r['body'] for r in rows], ['A3'])
+        self.assertEqual(rows[0]['mentor_name'], 'Mira')
+        self.assertEqual(rows[0]['created_at'], '2024-03-03T13:00:00')
+
+    def test_feedback_export_joins_names(self):
+        rows = list(csv.DictReader(io.StringIO(''.join(
+            ExportManager.stream('feedback', 'csv', company_id=self.amazon.id)))))
+        self.assertEqual([r['rating'] for r in rows], ['2', '4'])
+        self.assertEqual((rows[0]['company_name'], rows[0]['student_name'], rows[0]['mentor_name'],
+                          rows[0]['question_title']), ('Amazon', 'Sam', 'Mira', 'Q2'))
+
+    def test_archived_rows_follow_hot_rows(self):
+        first_two = [q.id for q in Question.query.order_by(Question.id).limit(2)]
+        ArchiveManager.archive_batch(first_two)
+
+        for kind, expected in (('questions', 5), ('responses', 5), ('feedback', 5)):
+            rows = [json.loads(line) for line in ''.join(ExportManager.stream(kind, 'jsonl')).splitlines()]
+            self.assertEqual(len(rows), expected, kind)
+            self.assertEqual([r['archived'] for r in rows], [False] * 3 + [True] * 2, kind)
+
+        rows = [json.loads(line) for line in ''.join(
+            ExportManager.stream('questions', 'jsonl', company_id=self.google.id)).splitlines()]
+        self.assertEqual([(r['title'], r['archived']) for r in rows], [('Q3', False), ('Q5', False), ('Q1', True)])
+        self.assertEqual(rows[-1]['answered_by'], 'Mira')
+        self.assertEqual(rows[-1]['company_name'], 'Google')
+
+    def test_bad_arguments_fail_before_streaming(self):
+        with self.assertRaises(ValueError):
+            ExportManager.stream('users', 'csv')
+        with self.assertRaises(ValueError):
+            ExportManager.stream('questions', 'xml')
+        with self.assertRaises(ValueError):
+            ExportManager.parse_filters({'from': '03/01/2024'})
+
+    def test_admin_download(self):
+        client = self.login('a@example.com')
+        response = client.get('/admin/export/referrals.csv?from=2024-03-01&company_id=%d' % self.google.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertIn('attachment; filename="ascend-referrals-', response.headers['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual((rows[0]['student_name'], rows[0]['mentor_name']), ('Sam', 'Mira'))
+
+        self.assertEqual(client.get('/admin/export/questions.csv?to=tomorrow').status_code, 400)
+        self.assertEqual(client.get('/admin/export/users.csv').status_code, 404)
+
+    def test_students_cannot_export(self):
+        client = self.login('s@example.com')
+        self.assertEqual(client.get('/admin/export/questions.jsonl').status_code, 403)
+
+    def test_cli_writes_file(self):
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        result = self.app.test_cli_runner().invoke(args=[
+            'export', 'questions', '--format', 'jsonl', '--from', '2024-03-04', '--output', path])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['title'] for line in f], ['Q4', 'Q5'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from flask import render_template_string
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Question, Response
+from app.fragment_cache import fragment_versions
+from app.trust_calculator import FeedbackManager, trust_update_queue
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+
+class FragmentCacheCase(unittest.TestCase):
+    TEMPLATE = "{% cache 'card', entity %}{{ entity.name }}#{{ render() }}{% endcache %}"
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.renders = 0
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def render(self, entity):
+        def render():
+            self.renders += 1
+            return self.renders
+        return render_template_string(self.TEMPLATE, entity=entity, render=render)
+
+    def test_hit_skips_body_until_entity_changes(self):
+        company = Company(name='Google', industry='Technology')
+        db.session.add(company)
+        db.session.commit()
+
+        self.assertEqual(self.render(company), 'Google#1')
+        self.assertEqual(self.render(company), 'Google#1')
+        self.assertEqual(self.renders, 1)
+
+        company.name = 'Alphabet'
+        db.session.commit()
+        self.assertEqual(self.render(company), 'Alphabet#2')
+
+    def test_rollback_does_not_invalidate(self):
+        company = Company(name='Google', industry='Technology')
+        db.session.add(company)
+        db.session.commit()
+        self.render(company)
+
+        company.name = 'Alphabet'
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.render(company), 'Google#1')
+
+    def test_disabled(self):
+        self.app.config['FRAGMENT_CACHE_ENABLED'] = False
+        company = Company(name='Google', industry='Technology')
+        db.session.add(company)
+        db.session.commit()
+        self.render(company)
+        self.render(company)
+        self.assertEqual(self.renders, 2)
+
+    def test_core_feedback_upsert_invalidates_response_and_question(self):
+        trust_update_queue._drain()
+        student_user = User(name='s', email='s@example.com', role='student')
+        mentor_user = User(name='m', email='m@example.com', role='alumni')
+        db.session.add_all([student_user, mentor_user])
+        db.session.commit()
+        student = Student(user_id=student_user.id)
+        mentor = Alumni(user_id=mentor_user.id)
+        db.session.add_all([student, mentor])
+        db.session.commit()
+        question = Question(student_id=student.id, title='q', body='b', status='answered')
+        db.session.add(question)
+        db.session.commit()
+        response = Response(question_id=question.id, mentor_id=mentor.id, body='a')
+        db.session.add(response)
+        db.session.commit()
+
+        before = (fragment_versions.get('response', response.id),
+                  fragment_versions.get('question', question.id))
+        FeedbackManager.submit_feedback(question.id, student.id, 'helpful', rating=5)
+        after = (fragment_versions.get('response', response.id),
+                 fragment_versions.get('question', question.id))
+        self.assertGreater(after[0], before[0])
+        self.assertGreater(after[1], before[1])
+
+    def test_cards_follow_the_names_they_show(self):
+        company = Company(name='Google', industry='Technology')
+        student_user = User(name='Sam', email='s@example.com', role='student')
+        mentor_user = User(name='Mira', email='m@example.com', role='alumni')
+        for user in (student_user, mentor_user):
+            user.set_password('pw')
+        db.session.add_all([company, student_user, mentor_user])
+        db.session.commit()
+        student = Student(user_id=student_user.id)
+        mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id)
+        db.session.add_all([student, mentor])
+        db.session.commit()
+        question = Question(student_id=student.id, company_id=company.id, title='q', body='b',
+                            status='answered')
+        db.session.add(question)
+        db.session.commit()
+        db.session.add(Response(question_id=question.id, mentor_id=mentor.id, body='a'))
+        db.session.commit()
+
+        client = self.app.test_client()
+        client.post('/auth/login', data={'email': 'm@example.com', 'password': 'pw'})
+        self.assertIn(b'Answered by Mira', client.get('/knowledge_base').data)
+        self.assertIn(b'Asked by Sam', client.get('/mentor/my_responses').data)
+
+        company.name = 'Alphabet'
+        mentor_user.name = 'Mira Renamed'
+        student_user.name = 'Sam Renamed'
+        db.session.commit()
+        page = client.get('/knowledge_base').data
+        self.assertIn(b'Alphabet', page)
+        self.assertIn(b'Answered by Mira Renamed', page)
+        page = client.get('/mentor/my_responses').data
+        self.assertIn(b'Alphabet', page)
+        self.assertIn(b'Asked by Sam Renamed', page)
+
+    def test_pages_render_with_cached_cards(self):
+        user = User(name='s', email='s@example.com', role='student')
+        user.set_password('pw')
+        db.session.add_all([user, Company(name='Google', industry='Technology')])
+        db.session.commit()
+        client = self.app.test_client()
+        client.post('/auth/login', data={'email': 's@example.com', 'password': 'pw'})
+
+        first = client.get('/companies')
+        second = client.get('/companies')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(b'Google', second.data)
+        self.assertIn(b'Logout', second.data)
+        self.assertEqual(first.data, second.data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import User, Question, IngestedDocument, QuestionSignature
+from app.ingest import KnowledgeIngestor, TextChunker
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+# Fake PDFs: file content is '<pages>' and page n reads 'interview prep page n ...'
+def fake_inspect(path):
+    with open(path) as f:
+        content = f.read()
+    if content == 'broken':
+        return path, None, 0, 'not a PDF'
+    return path, f'hash-{content}-{os.path.basename(path)[0]}', int(content.split(':')[0]), None
+
+def fake_extract(task):
+    path, start, stop = task
+    with open(path) as f:
+        if f.read().endswith(':bad'):
+            return None, 'extraction failed'
+    return [(n + 1, f'interview prep page {n + 1} ' + 'dynamic programming ' * 20)
+            for n in range(start, stop)], None
+
+class IngestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.directory = tempfile.mkdtemp()
+
+        for target, fake in (('inspect_task', fake_inspect), ('extract_task', fake_extract)):
+            patcher = mock.patch(f'app.ingest.{target}', side_effect=fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    def pdf(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_chunker_keeps_page_spans(self):
+        chunker = TextChunker(max_chars=50)
+        chunks = list(chunker.feed(1, 'a' * 20)) + list(chunker.feed(2, 'b' * 20))
+        self.assertEqual(chunks, [])
+        chunks = list(chunker.feed(3, 'word ' * 30)) + list(chunker.finish())
+        self.assertEqual(chunks[0][:2], (1, 2))
+        self.assertTrue(all(len(text) <= 50 for _, _, text in chunks))
+        self.assertEqual(chunks[-1][:2], (3, 3))
+
+    def test_ingest_creates_indexed_entries_and_skips_known_files(self):
+        self.pdf('a_guide.pdf', '20')
+        self.pdf('b_notes.pdf', '3')
+
+        stats = KnowledgeIngestor.ingest([self.directory], workers=0, batch_size=4, chunk_chars=1000)
+        self.assertEqual(stats['documents'], 2)
+        self.assertEqual(stats['pages'], 23)
+        self.assertGreater(stats['pages_per_second'], 0)
+
+        entries = Question.query.filter_by(category=KnowledgeIngestor.CATEGORY).all()
+        self.assertEqual(len(entries), stats['entries'])
+        self.assertTrue(all(q.status == 'answered' for q in entries))
+        self.assertTrue(any(q.title.startswith('a guide (pp. 1-') for q in entries))
+        self.assertEqual(QuestionSignature.query.count(), len(entries))
+        self.assertEqual(IngestedDocument.query.count(), 2)
+
+        again = KnowledgeIngestor.ingest([self.directory], workers=0)
+        self.assertEqual((again['documents'], again['skipped']), (0, 2))
+        self.assertEqual(Question.query.count(), len(entries))
+
+    def test_failed_document_leaves_nothing_behind(self):
+        self.pdf('a_good.pdf', '2')
+        self.pdf('b_bad.pdf', '12:bad')
+        self.pdf('c_broken.pdf', 'broken')
+
+        stats = KnowledgeIngestor.ingest([self.directory], workers=0, batch_size=1)
+        self.assertEqual(stats['documents'], 1)
+        self.assertEqual(sorted(os.path.basename(path) for path, _ in stats['failed']),
+                         ['b_bad.pdf', 'c_broken.pdf'])
+        self.assertEqual(IngestedDocument.query.count(), 1)
+        self.assertEqual(Question.query.count(), stats['entries'])
+
+    def test_no_transaction_is_open_while_pages_are_extracted(self):
+        self.pdf('a_guide.pdf', '20')
+        self.pdf('b_notes.pdf', '9')
+        open_during_extraction = []
+
+        def extract(task):
+            open_during_extraction.append(db.session().in_transaction())
+            return fake_extract(task)
+
+        with mock.patch('app.ingest.extract_task', side_effect=extract):
+            stats = KnowledgeIngestor.ingest([self.directory], workers=0, batch_size=2, chunk_chars=1000)
+        self.assertEqual(stats['documents'], 2)
+        self.assertEqual(open_during_extraction, [False] * 5)
+        self.assertEqual({d.state for d in IngestedDocument.query}, {'complete'})
+
+    def test_interrupted_documents_are_recovered(self):
+        path = self.pdf('a_guide.pdf', '2')
+        digest = fake_inspect(path)[1]
+        # Died while writing: hidden entries are dropped and the file is ingested again
+        writing = IngestedDocument(sha256=digest, filename='a_guide.pdf', state='writing')
+        # Died while indexing: published entries only need indexing
+        indexing = IngestedDocument(sha256='other', filename='other.pdf', state='indexing')
+        db.session.add_all([writing, indexing])
+        db.session.commit()
+        db.session.add_all([
+            Question(title='partial', body='x', status=KnowledgeIngestor.IMPORTING, document_id=writing.id),
+            Question(title='published', body='interview prep ' * 20, status='answered',
+                     document_id=indexing.id),
+        ])
+        db.session.commit()
+
+        stats = KnowledgeIngestor.ingest([self.directory], workers=0)
+        self.assertEqual((stats['documents'], stats['skipped']), (1, 0))
+        self.assertIsNone(Question.query.filter_by(title='partial').first())
+        self.assertEqual({d.state for d in IngestedDocument.query}, {'complete'})
+        self.assertEqual(QuestionSignature.query.count(), Question.query.count())
+
+    def test_entries_are_labelled_as_prep_material(self):
+        self.pdf('guide.pdf', '2')
+        KnowledgeIngestor.ingest([self.directory], workers=0)
+        user = User(name='s', email='s@example.com', role='student')
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.commit()
+        client = self.app.test_client()
+        client.post('/auth/login', data={'email': 's@example.com', 'password': 'pw'})
+
+        entry = Question.query.first()
+        page = client.get(f'/question/{entry.id}').get_data(as_text=True)
+        self.assertIn('Prep material', page)
+        self.assertNotIn('Student #None', page)
+        self.assertNotIn('No answers yet', page)
+        page = client.get('/knowledge_base').get_data(as_text=True)
+        self.assertIn('Prep material', page)
+        self.assertNotIn('Answered by Mentor', page)
+
+    def test_cli(self):
+        self.pdf('guide.pdf', '4')
+        result = self.app.test_cli_runner().invoke(args=['kb', 'ingest', self.directory, '--workers', '0'])
+        self.assertIn('Ingested 1 documents (4 pages', result.output)
+        self.assertIn('pages/sec', result.output)
+
+class IngestPoolCase(unittest.TestCase):
+    def test_unreadable_file_is_reported_from_the_pool(self):
+        app = create_app(TestConfig)
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, 'not_a.pdf'), 'w') as f:
+                f.write('plain text')
+            with app.app_context():
+                db.create_all()
+                stats = KnowledgeIngestor.ingest([directory], workers=1)
+                db.session.remove()
+                db.drop_all()
+            self.assertEqual(stats['documents'], 0)
+            self.assertEqual(len(stats['failed']), 1)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from app import create_app, db
+from app.models import User, Alumni, Company, Question
+from app.matching import MentorMatcher, industry_index
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class FallbackMatchingCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        industry_index.refresh()
+
+        self.google = Company(name='Google', industry='Technology')
+        self.microsoft = Company(name='Microsoft', industry='Technology')
+        self.tcs = Company(name='TCS', industry='IT Services')
+        db.session.add_all([self.google, self.microsoft, self.tcs])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_mentor(self, name, company, trust_score, verified=True):
+        u = User(name=name, email=f'{name}@example.com', role='alumni')
+        db.session.add(u)
+        db.session.commit()
+        a = Alumni(user_id=u.id, current_company_id=company.id, trust_score=trust_score,
+                   is_verified=verified, is_accepting_questions=True)
+        db.session.add(a)
+        db.session.commit()
+        return a
+
+    def test_prefers_same_industry(self):
+        self.add_mentor('tcs', self.tcs, 99)
+        ms = self.add_mentor('ms', self.microsoft, 60)
+        q = Question(company_id=self.google.id, title='t', body='b')
+
+        self.assertEqual(MentorMatcher.fallback_matching(q), ms)
+
+    def test_falls_back_to_global_best(self):
+        self.add_mentor('low', self.tcs, 40)
+        high = self.add_mentor('high', self.tcs, 90)
+        q = Question(company_id=self.google.id, title='t', body='b')
+
+        self.assertEqual(MentorMatcher.fallback_matching(q), high)
+
+    def test_updates_on_alumni_changes(self):
+        ms = self.add_mentor('ms', self.microsoft, 60)
+        pending = self.add_mentor('pending', self.microsoft, 95, verified=False)
+        q = Question(company_id=self.google.id, title='t', body='b')
+        self.assertEqual(MentorMatcher.fallback_matching(q), ms)
+
+        pending.is_verified = True
+        db.session.commit()
+        industry_index.update_mentor(pending)
+        self.assertEqual(MentorMatcher.fallback_matching(q), pending)
+
+        ms.is_accepting_questions = False
+        pending.is_accepting_questions = False
+        db.session.commit()
+        industry_index.update_mentor(ms)
+        industry_index.update_mentor(pending)
+        self.assertIsNone(MentorMatcher.fallback_matching(q))
+
+    def test_reloads_capped_list_after_removal(self):
+        mentors = [self.add_mentor(f'm{i}', self.microsoft, i)
+                   for i in range(industry_index.TOP_K + 2)]
+        self.assertEqual(industry_index.top_mentor_ids('Technology')[0], mentors[-1].id)
+
+        best = mentors[-1]
+        best.is_accepting_questions = False
+        db.session.commit()
+        industry_index.update_mentor(best)
+
+        ids = industry_index.top_mentor_ids('Technology')
+        self.assertEqual(len(ids), industry_index.TOP_K)
+        self.assertEqual(ids[0], mentors[-2].id)
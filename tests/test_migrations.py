@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import sqlalchemy as sa
+from flask_migrate import upgrade
+from app import create_app, db
+from config import Config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+# Made with db.create_all() before migrations were kept
+PREMIGRATION_DB = os.path.join(ROOT, 'instance', 'ascend.db')
+
+class TestConfig(Config):
+    TESTING = True
+    TRUST_UPDATE_MODE = 'manual'
+
+class MigrationCase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'ascend.db')
+        shutil.copy(PREMIGRATION_DB, self.path)
+
+        config = type('MigrationConfig', (TestConfig,), {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + self.path})
+        self.app = create_app(config)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.app_context.pop()
+
+    def upgrade(self):
+        # env.py applies alembic.ini's logging config, which would disable the app's loggers
+        with mock.patch('logging.config.fileConfig'):
+            upgrade(directory=MIGRATIONS)
+        db.session.remove()
+
+    def columns(self, table):
+        return {column['name']: column for column in sa.inspect(db.engine).get_columns(table)}
+
+    def test_upgrade_adopts_a_premigration_database(self):
+        self.upgrade()
+        tables = set(sa.inspect(db.engine).get_table_names())
+        self.assertTrue({'feedback', 'referral', 'change_log'} <= tables)
+        self.assertEqual(db.session.execute(sa.text('SELECT count(*) FROM user')).scalar(), 4)
+
+        self.assertEqual(self.app.test_client().get('/auth/login').status_code, 200)
+        for table in ('question', 'company', 'user'):
+            self.assertIn('updated_at', self.columns(table))
+        self.assertIn('document_id', self.columns('question'))
+
+    def test_new_not_null_columns_are_filled(self):
+        self.upgrade()
+        for column in ('open_assignments', 'decayed_trust_sum'):
+            self.assertFalse(self.columns('alumni')[column]['nullable'])
+            self.assertEqual(db.session.execute(sa.text(f'SELECT {column} FROM alumni')).scalars().all(),
+                             [0, 0])
+        self.assertFalse(self.columns('question')['sla_breached']['nullable'])
+        self.assertEqual(db.session.execute(sa.text('SELECT sla_breached FROM question')).scalars().all(),
+                         [0, 0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from app import create_app, db
+from datetime import datetime, timedelta
+from app.models import User, Alumni, Company, Question, Assignment
+from app.queue_manager import QueueAllocator, BatchAssignmentOptimizer, AssignmentManager
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class DistributionCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.google = Company(name='Google', industry='Technology')
+        self.tcs = Company(name='TCS', industry='IT Services')
+        db.session.add_all([self.google, self.tcs])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_mentor(self, name, company, trust_score):
+        u = User(name=name, email=f'{name}@example.com', role='alumni')
+        db.session.add(u)
+        db.session.commit()
+        a = Alumni(user_id=u.id, current_company_id=company.id, trust_score=trust_score,
+                   is_verified=True, is_accepting_questions=True)
+        db.session.add(a)
+        db.session.commit()
+        return a
+
+    def add_questions(self, company, count, urgency='Normal'):
+        questions = [Question(company_id=company.id, title=f'q{i}', body='b', urgency=urgency)
+                     for i in range(count)]
+        db.session.add_all(questions)
+        db.session.commit()
+        return questions
+
+    def test_batch_is_balanced(self):
+        mentors = [self.add_mentor(f'm{i}', self.google, 50 + i) for i in range(3)]
+        self.add_questions(self.google, 9)
+
+        plan = QueueAllocator.plan_distribution()
+
+        per_mentor = {m.id: 0 for m in mentors}
+        for a in plan['assignments']:
+            per_mentor[a['mentor_id']] += 1
+        self.assertEqual(sorted(per_mentor.values()), [3, 3, 3])
+        self.assertEqual(plan['stats']['assigned'], 9)
+        self.assertEqual(plan['stats']['load_stddev'], 0)
+        self.assertIn('runtime_ms', plan['stats'])
+
+    def test_capacity_and_unassigned(self):
+        mentor = self.add_mentor('m', self.google, 80)
+        urgent = self.add_questions(self.google, 1, urgency='High')
+        normal = self.add_questions(self.google, 2)
+        orphan = self.add_questions(self.tcs, 1)
+
+        plan = BatchAssignmentOptimizer.optimize(normal + orphan + urgent, [mentor], capacity=2)
+
+        self.assertEqual([a['question_id'] for a in plan['assignments']],
+                         [urgent[0].id, normal[0].id])
+        self.assertEqual(sorted(plan['unassigned']), sorted([normal[1].id, orphan[0].id]))
+        self.assertEqual(plan['stats']['max_load'], 2)
+
+    def test_distribute_questions_returns_assignments(self):
+        mentor = self.add_mentor('m', self.google, 80)
+        self.add_questions(self.google, 2)
+
+        assignments = QueueAllocator.distribute_questions()
+
+        self.assertEqual(len(assignments), 2)
+        self.assertEqual(assignments[0]['mentor_name'], 'm')
+        self.assertEqual(assignments[0]['mentor_id'], mentor.id)
+
+    def test_distribution_persists_assignments_and_counters(self):
+        a = self.add_mentor('a', self.google, 80)
+        b = self.add_mentor('b', self.google, 60)
+        self.add_questions(self.google, 3)
+
+        QueueAllocator.distribute_questions()
+
+        self.assertEqual(Assignment.query.filter_by(state='open').count(), 3)
+        self.assertEqual(QueueAllocator.calculate_mentor_load(a.id), 2)
+        self.assertEqual(QueueAllocator.calculate_mentor_load(b.id), 1)
+        # Already-assigned questions are not handed out again
+        self.assertEqual(QueueAllocator.distribute_questions(), [])
+
+    def test_assignment_lifecycle_counters(self):
+        a = self.add_mentor('a', self.google, 80)
+        b = self.add_mentor('b', self.google, 60)
+        q1, q2 = self.add_questions(self.google, 2)
+
+        AssignmentManager.assign(q1.id, a.id)
+        AssignmentManager.assign(q1.id, b.id)
+        AssignmentManager.assign(q2.id, a.id, lease=timedelta(hours=1))
+        self.assertEqual(AssignmentManager.get_load(a.id), 2)
+
+        AssignmentManager.complete_question(q1.id, answered_by=a.id)
+        self.assertEqual(AssignmentManager.get_load(a.id), 1)
+        self.assertEqual(AssignmentManager.get_load(b.id), 0)
+        self.assertEqual(sorted(x.state for x in q1.assignments), ['answered', 'released'])
+
+        expired = AssignmentManager.expire_leases(now=datetime.utcnow() + timedelta(hours=2))
+        self.assertEqual(expired, 1)
+        self.assertEqual(AssignmentManager.get_load(a.id), 0)
+
+        a.open_assignments = 7
+        db.session.commit()
+        AssignmentManager.rebuild_counters()
+        self.assertEqual(AssignmentManager.get_load(a.id), 0)
+
+    def test_cli_expires_leases_and_rebuilds(self):
+        a = self.add_mentor('a', self.google, 80)
+        q1, q2 = self.add_questions(self.google, 2)
+        AssignmentManager.assign(q1.id, a.id, lease=timedelta(seconds=-1))
+        AssignmentManager.assign(q2.id, a.id)
+
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['assignments', 'expire'])
+        self.assertIn('Expired 1 assignments', result.output)
+        self.assertEqual(AssignmentManager.get_load(a.id), 1)
+
+        a.open_assignments = 7
+        db.session.commit()
+        result = runner.invoke(args=['assignments', 'rebuild'])
+        self.assertIn('1 open assignments across 1 mentors', result.output)
+        db.session.expire_all()
+        self.assertEqual(AssignmentManager.get_load(a.id), 1)
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import User
+from app.rate_limit import (
+    MemoryLimitStore, SQLiteLimitStore, RateLimiter, get_limiter,
+    ALLOWED, RATE_LIMITED, CONCURRENCY_LIMITED, STORE_ERROR
+)
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_STORAGE = 'memory'
+    RATE_LIMITS = {
+        'auth.login': {'per_minute': 60, 'burst': 2, 'concurrency': 1},
+    }
+
+class ProxyConfig(TestConfig):
+    TRUSTED_PROXY_COUNT = 1
+    RATE_LIMITS = {
+        'auth.login': {'per_minute': 60, 'burst': 1, 'concurrency': 0, 'key_field': 'email',
+                       'ip_per_minute': 60, 'ip_burst': 3},
+    }
+
+class DefaultConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class RateLimitCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(name='Sam', email='s@example.com', role='student')
+        user.set_password('pw')
+        db.session.add(user)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_burst_then_fast_429_without_password_check(self):
+        client = self.app.test_client()
+        with mock.patch.object(User, 'check_password', return_value=False) as check:
+            statuses = [client.post('/auth/login', data={'email': 's@example.com', 'password': 'x'})
+                        for _ in range(3)]
+        self.assertEqual([r.status_code for r in statuses], [302, 302, 429])
+        self.assertEqual(check.call_count, 2)
+        self.assertEqual(statuses[2].headers['Retry-After'], '1')
+
+        # Rendering the form is never limited
+        self.assertEqual(client.get('/auth/login').status_code, 200)
+
+        stats = get_limiter().stats()['auth.login']
+        self.assertEqual((stats[ALLOWED], stats[RATE_LIMITED]), (2, 1))
+        self.assertNotIn('in_flight', stats)  # slots are released at teardown
+
+    def test_buckets_are_per_client(self):
+        limiter = get_limiter()
+        for _ in range(2):
+            limiter.release(limiter.check('auth.login', 'POST', 'ip:1.1.1.1')[2])
+        self.assertEqual(limiter.check('auth.login', 'POST', 'ip:1.1.1.1')[0], RATE_LIMITED)
+        outcome, _, slot = limiter.check('auth.login', 'POST', 'user:7')
+        self.assertEqual(outcome, ALLOWED)
+        # The endpoint's single slot is taken until released
+        self.assertEqual(limiter.check('auth.login', 'POST', 'user:8')[0], CONCURRENCY_LIMITED)
+        limiter.release(slot)
+        self.assertEqual(limiter.check('auth.login', 'POST', 'user:8')[0], ALLOWED)
+
+    def test_cli_stats(self):
+        get_limiter().check('auth.login', 'POST', 'ip:1.1.1.1')
+        result = self.app.test_cli_runner().invoke(args=['ratelimit', 'stats'])
+        self.assertIn('auth.login: 1 allowed, 0 rate limited', result.output)
+
+    def test_disabled_under_testing_by_default(self):
+        app = create_app(DefaultConfig)
+        self.assertIsNone(get_limiter(app))
+
+class ClientKeyCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(ProxyConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, client_ip, email='s@example.com', router='10.0.0.1'):
+        return self.app.test_client().post(
+            '/auth/login', data={'email': email, 'password': 'x'},
+            headers={'X-Forwarded-For': client_ip}, environ_base={'REMOTE_ADDR': router})
+
+    def test_clients_behind_the_router_have_their_own_buckets(self):
+        self.assertEqual(self.login('203.0.113.5').status_code, 302)
+        self.assertEqual(self.login('203.0.113.5').status_code, 429)
+        # Same router, different client address
+        self.assertEqual(self.login('198.51.100.7').status_code, 302)
+
+    def test_login_is_keyed_on_the_email_too(self):
+        self.assertEqual(self.login('203.0.113.5', 'a@example.com').status_code, 302)
+        self.assertEqual(self.login('203.0.113.5', 'B@example.com').status_code, 302)
+        self.assertEqual(self.login('203.0.113.5', 'b@example.com ').status_code, 429)
+
+    def test_rotating_emails_hits_the_per_ip_bucket(self):
+        statuses = [self.login('203.0.113.5', f'user{i}@example.com').status_code for i in range(4)]
+        self.assertEqual(statuses, [302, 302, 302, 429])
+        # Other clients behind the same router are unaffected
+        self.assertEqual(self.login('198.51.100.7', 'user9@example.com').status_code, 302)
+        self.assertEqual(get_limiter().stats()['auth.login:ip'][RATE_LIMITED], 1)
+
+class LimitStoreCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'limits.db')
+
+    def check_store(self, store):
+        admit = lambda now, limit=0: store.admit('e', 'e:ip:1', 1.0, 2, 'e', limit, 30, now)
+        self.assertEqual(admit(100.0)[0], ALLOWED)
+        self.assertEqual(admit(100.0)[0], ALLOWED)
+        outcome, retry_after, _ = admit(100.5)
+        self.assertEqual((outcome, retry_after), (RATE_LIMITED, 0.5))
+        self.assertEqual(admit(101.0)[0], ALLOWED)  # one token refilled
+
+        outcome, _, slot = admit(110.0, limit=1)
+        self.assertEqual(admit(110.0, limit=1)[0], CONCURRENCY_LIMITED)
+        self.assertEqual(admit(141.0, limit=1)[0], ALLOWED)  # abandoned slot expired
+        return slot
+
+    def test_memory_store(self):
+        self.check_store(MemoryLimitStore())
+
+    def test_sqlite_store_is_shared_between_processes(self):
+        self.check_store(SQLiteLimitStore(self.path))
+        other_worker = SQLiteLimitStore(self.path)
+        self.assertEqual(other_worker.counters()[('e', RATE_LIMITED)], 1)
+        self.assertEqual(other_worker.admit('e', 'e:ip:1', 1.0, 2, 'e', 1, 30, 141.0)[0],
+                         CONCURRENCY_LIMITED)
+
+    def test_store_failure_admits_the_request(self):
+        store = SQLiteLimitStore(os.path.join(self.directory, 'missing', 'limits.db'))
+        limiter = RateLimiter(store, {'e': {'per_minute': 1, 'burst': 1}})
+        self.assertEqual(limiter.check('e', 'POST', 'ip:1')[0], STORE_ERROR)
+        self.assertEqual(limiter.store_errors, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Referral
+from app.referrals import ReferralManager
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+
+class ReferralBulkCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        company = Company(name='Google', industry='Technology')
+        users = [User(name=n, email=f'{n}@example.com', role=r)
+                 for n, r in (('s', 'student'), ('m', 'alumni'), ('other', 'alumni'))]
+        for u in users:
+            u.set_password('password')
+        db.session.add_all([company] + users)
+        db.session.commit()
+        self.student = Student(user_id=users[0].id)
+        self.mentor = Alumni(user_id=users[1].id, current_company_id=company.id)
+        self.other = Alumni(user_id=users[2].id, current_company_id=company.id)
+        db.session.add_all([self.student, self.mentor, self.other])
+        db.session.commit()
+
+        self.mine = [self.add_referral(self.mentor) for _ in range(3)]
+        self.theirs = self.add_referral(self.other)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_referral(self, mentor, status='requested'):
+        r = Referral(student_id=self.student.id, mentor_id=mentor.id, company_id=mentor.current_company_id,
+                     message='Please refer me', status=status)
+        db.session.add(r)
+        db.session.commit()
+        return r.id
+
+    def test_bulk_respond_enforces_ownership_and_state(self):
+        ReferralManager.respond(self.mentor.id, [self.mine[0]], 'reject')
+
+        results = ReferralManager.respond(self.mentor.id, self.mine + [self.theirs, 9999], 'approve', 'Done')
+
+        self.assertEqual(results, {
+            self.mine[0]: 'already_responded',
+            self.mine[1]: 'approved',
+            self.mine[2]: 'approved',
+            self.theirs: 'not_found',
+            9999: 'not_found',
+        })
+        self.assertEqual(db.session.get(Referral, self.mine[0]).status, 'rejected')
+        self.assertEqual(db.session.get(Referral, self.mine[1]).mentor_response, 'Done')
+        self.assertIsNotNone(db.session.get(Referral, self.mine[1]).responded_at)
+        self.assertEqual(db.session.get(Referral, self.theirs).status, 'requested')
+
+        with self.assertRaises(ValueError):
+            ReferralManager.respond(self.mentor.id, self.mine, 'maybe')
+
+    def test_bulk_form_and_api(self):
+        self.client.post('/auth/login', data=dict(email='m@example.com', password='password'))
+
+        response = self.client.post('/mentor/referrals/bulk', data={
+            'referral_ids': [str(self.mine[0]), str(self.theirs)], 'action': 'reject'
+        }, follow_redirects=True)
+        self.assertIn('1 referral request(s) declined. 1 skipped.', response.get_data(as_text=True))
+
+        data = self.client.post('/api/v1/referrals/bulk', json={
+            'ids': self.mine[1:], 'action': 'approve'
+        }).get_json()
+        self.assertEqual(data['updated'], 2)
+        self.assertEqual(set(data['results'].values()), {'approved'})
+
+        self.assertEqual(self.client.post(f'/referral/{self.theirs}/respond',
+                                          data={'action': 'approve'}).status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,75 @@
+import unittest
+from app import create_app, db
+from app.models import User, Student, Question, RelatedQuestion
+from app.related_questions import MinHasher, RelatedQuestionIndex, get_related_questions
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class RelatedQuestionsCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        u = User(name='Student', email='student@example.com', role='student')
+        db.session.add(u)
+        db.session.commit()
+        self.student = Student(user_id=u.id)
+        db.session.add(self.student)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_question(self, title, body, status='answered'):
+        q = Question(student_id=self.student.id, title=title, body=body, status=status)
+        db.session.add(q)
+        db.session.commit()
+        RelatedQuestionIndex.add_question(q)
+        return q
+
+    def test_signature_similarity(self):
+        a = MinHasher.signature('How to prepare for the Google system design interview round')
+        b = MinHasher.signature('How to prepare for the Google system design interview')
+        c = MinHasher.signature('Best hostels near campus with cheap mess food')
+        self.assertGreater(MinHasher.similarity(a, b), MinHasher.similarity(a, c))
+        self.assertIsNone(MinHasher.signature('the of and'))
+
+    def test_answered_question_offered_to_similar_questions(self):
+        q1 = self.add_question('Google system design interview preparation',
+                               'What topics come up in the Google system design interview round?')
+        q2 = self.add_question('Unrelated hostel question',
+                               'Which hostels near campus have cheap mess food?')
+        q3 = self.add_question('Preparing for Google system design interview',
+                               'What topics come up in the Google system design round?')
+
+        self.assertEqual([r.related_id for r in get_related_questions(q3.id)], [q1.id])
+        self.assertEqual([r.related_id for r in get_related_questions(q1.id)], [q3.id])
+        self.assertEqual(get_related_questions(q2.id), [])
+
+    def test_pending_questions_only_list_answered(self):
+        q1 = self.add_question('Amazon leadership principles interview',
+                               'How should I prepare stories for Amazon leadership principles?',
+                               status='pending')
+        q2 = self.add_question('Amazon leadership principles interview prep',
+                               'How should I prepare stories for Amazon leadership principles?')
+
+        self.assertEqual([r.related_id for r in get_related_questions(q1.id)], [q2.id])
+        self.assertEqual(get_related_questions(q2.id), [])
+
+    def test_rebuild(self):
+        self.add_question('Microsoft internship interview rounds',
+                          'How many rounds are in the Microsoft internship interview?')
+        self.add_question('Microsoft internship interview process',
+                          'How many rounds are in the Microsoft internship interview?')
+        RelatedQuestion.query.delete()
+        db.session.commit()
+
+        self.assertEqual(RelatedQuestionIndex.rebuild(), 2)
+        self.assertEqual(RelatedQuestion.query.count(), 2)
@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import Question, Response
+from app.rendering import AnswerRenderer
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class AnswerRenderingCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.question = Question(title='q', body='b', status='answered')
+        db.session.add(self.question)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_markdown_is_sanitized(self):
+        html = AnswerRenderer.render('**Prep** <script>alert(1)</script>\n\n'
+                                     '[bad](javascript:alert(1)) [good](https://example.com)')
+        self.assertIn('<strong>Prep</strong>', html)
+        self.assertNotIn('<script>', html)
+        self.assertIn('&lt;script&gt;', html)
+        self.assertNotIn('javascript:', html)
+        self.assertIn('href="https://example.com"', html)
+
+    def test_encoded_javascript_links_are_dropped(self):
+        for source in ('[x](&#106;avascript:alert(1))', '[x](javascript&#58;alert(1))',
+                       '![i](&#x6A;avascript:alert(1))', '[x](java&#x09;script:alert(1))'):
+            html = AnswerRenderer.render(source)
+            self.assertNotIn('href=', html, source)
+            self.assertNotIn('src=', html, source)
+        self.assertIn('href="https://example.com/?a=1&amp;b=2"',
+                      AnswerRenderer.render('[ok](https://example.com/?a=1&b=2)'))
+
+    def test_rendered_once_per_body(self):
+        response = Response(question_id=self.question.id, body='- one\n- two')
+        db.session.add(response)
+        db.session.commit()
+        self.assertIn('<li>one</li>', response.body_html)
+
+        with mock.patch.object(AnswerRenderer, 'render', wraps=AnswerRenderer.render) as render:
+            response.helpful_count = 3
+            db.session.commit()
+            self.assertEqual(render.call_count, 0)
+            self.assertIn('<li>one</li>', AnswerRenderer.html(response))
+
+            response.body = '*changed*'
+            db.session.commit()
+            self.assertEqual(render.call_count, 1)
+        self.assertIn('<em>changed</em>', response.body_html)
+
+    def test_rerender_after_version_bump(self):
+        db.session.add_all([Response(question_id=self.question.id, body=f'answer {i}') for i in range(3)])
+        db.session.commit()
+        self.assertEqual(AnswerRenderer.rerender_all(), 0)
+
+        with mock.patch.object(AnswerRenderer, 'VERSION', AnswerRenderer.VERSION + 1):
+            stale = Response.query.first()
+            self.assertNotEqual(stale.body_hash, AnswerRenderer.content_hash(stale.body))
+            self.assertEqual(AnswerRenderer.rerender_all(batch_size=2), 3)
+            self.assertEqual(AnswerRenderer.rerender_all(), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,173 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+from app import create_app, db
+from app.models import User, Alumni, Company
+from app.pdf import PDFPool, PDFError
+from app.reports import mentor_report, platform_report, ReportCache
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+    REPORT_WORKERS = 0
+
+def fake_pdf(html, output_path):
+    with open(output_path, 'wb') as f:
+        f.write(b'%PDF-1.4 ' + html.encode('utf-8'))
+    return output_path
+
+class ReportCase(unittest.TestCase):
+    def setUp(self):
+        self.reports_dir = tempfile.mkdtemp()
+        TestConfig.REPORTS_DIR = self.reports_dir
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        company = Company(name='Google', industry='Technology')
+        mentor_user = User(name='Mira', email='m@example.com', role='alumni')
+        mentor_user.set_password('pw')
+        admin = User(name='a', email='a@example.com', role='admin')
+        admin.set_password('pw')
+        db.session.add_all([company, mentor_user, admin])
+        db.session.commit()
+        self.mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id,
+                             trust_score=70, is_verified=True)
+        db.session.add(self.mentor)
+        db.session.commit()
+
+        patcher = mock.patch('app.pdf.html_to_pdf', side_effect=fake_pdf)
+        self.convert = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.reports_dir)
+
+    def login(self, email):
+        client = self.app.test_client()
+        client.post('/auth/login', data={'email': email, 'password': 'pw'})
+        return client
+
+    def test_unchanged_report_is_not_regenerated(self):
+        path, digest = mentor_report(self.mentor.id)
+        self.assertTrue(path.startswith(self.reports_dir))
+        with open(path, 'rb') as f:
+            self.assertIn(b'Mira', f.read())
+
+        self.assertEqual(mentor_report(self.mentor.id), (path, digest))
+        self.assertEqual(self.convert.call_count, 1)
+
+        self.mentor.trust_score = 90
+        db.session.commit()
+        new_path, new_digest = mentor_report(self.mentor.id)
+        self.assertNotEqual(new_digest, digest)
+        self.assertEqual(self.convert.call_count, 2)
+
+        self.assertEqual(ReportCache.prune({new_path}), 1)
+        self.assertFalse(os.path.exists(path))
+
+    def test_unknown_mentor(self):
+        self.assertIsNone(mentor_report(9999))
+
+    def test_mentor_download_streams_with_etag(self):
+        client = self.login('m@example.com')
+        response = client.get('/mentor/report.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/pdf')
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        self.assertTrue(response.is_streamed)
+        etag = response.headers['ETag']
+        response.close()
+
+        cached = client.get('/mentor/report.pdf', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+
+    def test_admin_reports(self):
+        client = self.login('a@example.com')
+        response = client.get('/admin/reports/platform.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Mira', response.get_data())
+        self.assertEqual(client.get(f'/admin/reports/mentor/{self.mentor.id}.pdf').status_code, 200)
+        self.assertEqual(client.get('/admin/reports/mentor/9999.pdf').status_code, 404)
+
+    def test_admin_reports_require_admin(self):
+        client = self.login('m@example.com')
+        self.assertEqual(client.get('/admin/reports/platform.pdf').status_code, 403)
+
+    def test_conversion_failure_redirects(self):
+        self.convert.side_effect = PDFError('xhtml2pdf is not installed')
+        client = self.login('m@example.com')
+        response = client.get('/mentor/report.pdf')
+        self.assertEqual(response.status_code, 302)
+
+class BrokenExecutor:
+    """A ProcessPoolExecutor whose child died: new submissions fail at once"""
+    def __init__(self, submit_fails=False):
+        self.submit_fails = submit_fails
+        self.closed = False
+
+    def submit(self, fn, *args):
+        if self.submit_fails:
+            raise BrokenProcessPool('child died')
+        future = Future()
+        future.set_exception(BrokenProcessPool('child died'))
+        return future
+
+    def shutdown(self, wait=True):
+        self.closed = True
+
+class InlineExecutor(BrokenExecutor):
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(args[-1])
+        return future
+
+class PDFPoolRecoveryCase(unittest.TestCase):
+    def test_dead_child_becomes_pdf_error_and_pool_is_replaced(self):
+        pool = PDFPool()
+        dead, fresh = BrokenExecutor(), InlineExecutor()
+        with mock.patch('app.pdf.new_process_pool', side_effect=[dead, fresh]):
+            with self.assertRaises(PDFError):
+                pool.render('<html></html>', 'a.pdf')
+            self.assertTrue(dead.closed)
+            self.assertEqual(pool.render('<html></html>', 'a.pdf'), 'a.pdf')
+
+    def test_broken_pool_is_replaced_on_submit(self):
+        pool = PDFPool()
+        broken, fresh = BrokenExecutor(submit_fails=True), InlineExecutor()
+        with mock.patch('app.pdf.new_process_pool', side_effect=[broken, fresh]):
+            self.assertEqual(pool.render('<html></html>', 'b.pdf'), 'b.pdf')
+        self.assertTrue(broken.closed)
+
+@unittest.skipIf(importlib.util.find_spec('xhtml2pdf') is None, 'xhtml2pdf not installed')
+class PDFPoolCase(unittest.TestCase):
+    def test_process_pool_conversion(self):
+        pool = PDFPool()
+        pool.workers = 2
+        directory = tempfile.mkdtemp()
+        try:
+            paths = [os.path.join(directory, f'{i}.pdf') for i in range(3)]
+            futures = [pool.submit(f'<html><body><h1>Report {i}</h1></body></html>', path)
+                       for i, path in enumerate(paths)]
+            for future in futures:
+                future.result(timeout=60)
+            for path in paths:
+                with open(path, 'rb') as f:
+                    self.assertTrue(f.read().startswith(b'%PDF'))
+        finally:
+            pool.shutdown()
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,3 +49,146 @@ class RouteTestCase(unittest.TestCase):
     def test_dashboard_access_denied_anonymous(self):
         response = self.client.get('/student_dashboard', follow_redirects=True)
         self.assertIn(b'Login', response.data) # Should redirect to login
+
+    def login(self):
+        self.client.post('/auth/login', data=dict(
+            email='test@example.com',
+            password='password'
+        ))
+
+    def test_view_question_conditional_get(self):
+        from app.models import Question
+        q = Question(student_id=1, title='How to prepare?', body='Body', status='pending')
+        db.session.add(q)
+        db.session.commit()
+        self.login()
+
+        first = self.client.get(f'/question/{q.id}')
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+        self.assertIn('Last-Modified', first.headers)
+
+        repeat = self.client.get(f'/question/{q.id}', headers={'If-None-Match': etag})
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.data, b'')
+
+        q.title = 'How to prepare for interviews?'
+        db.session.commit()
+        changed = self.client.get(f'/question/{q.id}', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+
+    def test_view_question_etag_follows_answers_and_mentors(self):
+        from app.models import Alumni, Company, Question, Response
+        company = Company(name='Google', industry='Technology')
+        mentor_user = User(name='Mentor', email='mentor@example.com', role='alumni')
+        db.session.add_all([company, mentor_user])
+        db.session.commit()
+        mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id, current_role='SWE')
+        q = Question(student_id=1, title='How to prepare?', body='Body', status='answered')
+        db.session.add_all([mentor, q])
+        db.session.commit()
+        response = Response(question_id=q.id, mentor_id=mentor.id, body='Practice')
+        db.session.add(response)
+        db.session.commit()
+        self.login()
+
+        first = self.client.get(f'/question/{q.id}')
+        etag, last_modified = first.headers['ETag'], first.headers['Last-Modified']
+        self.assertEqual(self.client.get(f'/question/{q.id}', headers={'If-None-Match': etag}).status_code, 304)
+
+        for change in (lambda: setattr(mentor_user, 'name', 'Mentor Renamed'),
+                       lambda: setattr(mentor, 'current_role', 'Staff SWE'),
+                       lambda: setattr(company, 'name', 'Alphabet'),
+                       lambda: setattr(response, 'helpful_count', 3)):
+            change()
+            db.session.commit()
+            changed = self.client.get(f'/question/{q.id}', headers={'If-None-Match': etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertNotEqual(changed.headers['ETag'], etag)
+            etag = changed.headers['ETag']
+
+        # The question row is unchanged, so If-Modified-Since alone must not answer 304
+        self.assertEqual(self.client.get(f'/question/{q.id}',
+                                         headers={'If-Modified-Since': last_modified}).status_code, 200)
+
+    def test_knowledge_base_conditional_get(self):
+        self.login()
+        first = self.client.get('/knowledge_base')
+        etag = first.headers['ETag']
+
+        self.assertEqual(self.client.get('/knowledge_base', headers={'If-None-Match': etag}).status_code, 304)
+        other_page = self.client.get('/knowledge_base?q=google', headers={'If-None-Match': etag})
+        self.assertEqual(other_page.status_code, 200)
+
+    def test_knowledge_base_etag_follows_card_names(self):
+        from app.models import Alumni, Company, Question, Response
+        company = Company(name='Google', industry='Technology')
+        mentor_user = User(name='Mentor', email='mentor@example.com', role='alumni')
+        db.session.add_all([company, mentor_user])
+        db.session.commit()
+        mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id)
+        q = Question(student_id=1, company_id=company.id, title='How to prepare?', body='Body',
+                     status='answered')
+        db.session.add_all([mentor, q])
+        db.session.commit()
+        db.session.add(Response(question_id=q.id, mentor_id=mentor.id, body='Practice'))
+        db.session.commit()
+        self.login()
+
+        etag = self.client.get('/knowledge_base').headers['ETag']
+        for entity, name in ((company, 'Alphabet'), (mentor_user, 'Renamed Mentor')):
+            entity.name = name
+            db.session.commit()
+            changed = self.client.get('/knowledge_base', headers={'If-None-Match': etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertIn(name, changed.get_data(as_text=True))
+            etag = changed.headers['ETag']
+        self.assertEqual(self.client.get('/knowledge_base', headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_referral_tabs_paginate_by_cursor(self):
+        import re
+        from datetime import datetime, timedelta
+        from sqlalchemy import event
+        from app.models import Alumni, Company, Referral
+        company = Company(name='Google', industry='Technology')
+        mentor_user = User(name='Mentor', email='mentor@example.com', role='alumni')
+        db.session.add_all([company, mentor_user])
+        db.session.commit()
+        mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id)
+        db.session.add(mentor)
+        db.session.commit()
+        start = datetime(2024, 1, 1)
+        for i in range(27):
+            db.session.add(Referral(student_id=1, mentor_id=mentor.id, company_id=company.id,
+                                    message=f'Request {i:02d}', requested_at=start + timedelta(hours=i),
+                                    status='approved' if i >= 25 else 'requested'))
+        db.session.commit()
+        self.login()
+
+        statements = []
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            html = self.client.get('/referrals/my_requests').get_data(as_text=True)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        self.assertIn('Requested (25)', html)
+        self.assertIn('Approved (2)', html)
+        self.assertIn('Request 24', html)
+        self.assertNotIn('Request 04', html)
+        # current user, student profile, one page, status counts: no per-row lazy loads
+        self.assertLessEqual(len(statements), 5)
+
+        next_url = re.search(r'href="([^"]*cursor=[^"]*)"', html).group(1).replace('&amp;', '&')
+        older = self.client.get(next_url).get_data(as_text=True)
+        self.assertIn('Request 04', older)
+        self.assertNotIn('Request 05', older)
+        self.assertIn('Newest', older)
+
+        approved = self.client.get('/referrals/my_requests?status=approved').get_data(as_text=True)
+        self.assertIn('Request 26', approved)
+        self.assertNotIn('Request 24', approved)
+        self.assertEqual(self.client.get('/referrals/my_requests?cursor=bogus').status_code, 400)
@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.models import User, Alumni, Company, Question, CompanySLA
+from app.sla import SLATracker
+from app.queue_manager import get_queue_stats
+from app.trust_calculator import TrustCalculator
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+
+class SLATrackerCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.google = Company(name='Google', industry='Technology')
+        self.tcs = Company(name='TCS', industry='IT Services')
+        db.session.add_all([self.google, self.tcs])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_question(self, company, age_days, status='pending'):
+        q = Question(company_id=company.id, title='q', body='b', status=status,
+                     created_at=datetime.utcnow() - timedelta(days=age_days))
+        db.session.add(q)
+        db.session.commit()
+        return q
+
+    def test_sweep_counts_each_breach_once(self):
+        old = self.add_question(self.google, 10)
+        self.add_question(self.google, 8)
+        self.add_question(self.google, 2)
+        self.add_question(self.tcs, 9, status='answered')
+        updated_at = old.updated_at
+
+        self.assertEqual(SLATracker.sweep(), {self.google.id: 2})
+        self.assertEqual(SLATracker.sweep(), {})
+        self.assertEqual(SLATracker.breached_count(self.google.id), 2)
+        self.assertEqual(SLATracker.breached_count(self.tcs.id), 0)
+        self.assertEqual(db.session.get(Question, old.id).updated_at, updated_at)
+
+        # Crosses the threshold later
+        self.assertEqual(SLATracker.sweep(datetime.utcnow() + timedelta(days=6)), {self.google.id: 1})
+        self.assertEqual(SLATracker.total_breached(), 3)
+
+    def test_answering_releases_breach(self):
+        q = self.add_question(self.google, 10)
+        self.add_question(self.google, 10)
+        SLATracker.sweep()
+
+        q.status = 'answered'
+        db.session.commit()
+
+        self.assertEqual(db.session.get(CompanySLA, self.google.id).breached_count, 1)
+        self.assertFalse(db.session.get(Question, q.id).sla_breached)
+        self.assertEqual(get_queue_stats()['sla_breached'], 1)
+        self.assertEqual(SLATracker.rebuild(), {self.google.id: 1})
+
+    def test_rollback_does_not_release(self):
+        q = self.add_question(self.google, 10)
+        SLATracker.sweep()
+
+        q.status = 'answered'
+        db.session.flush()
+        db.session.rollback()
+
+        self.assertEqual(SLATracker.breached_count(self.google.id), 1)
+
+    def test_trust_penalty_reads_company_count(self):
+        u = User(name='m', email='m@example.com', role='alumni')
+        db.session.add(u)
+        db.session.commit()
+        mentor = Alumni(user_id=u.id, current_company_id=self.google.id, is_verified=True)
+        db.session.add(mentor)
+        db.session.commit()
+        for _ in range(3):
+            self.add_question(self.google, 10)
+
+        self.assertEqual(TrustCalculator.calculate_trust_score(mentor.id), 50)
+        SLATracker.sweep()
+        self.assertEqual(TrustCalculator.get_unanswered_count(mentor.id), 3)
+        self.assertEqual(TrustCalculator.calculate_trust_score(mentor.id), 44)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from sqlalchemy.engine import Engine
+from app import create_app
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold import + create_app in a fresh interpreter; fails the suite on regressions.
+# Override with ASCEND_STARTUP_BUDGET_SECONDS on slow CI machines.
+STARTUP_BUDGET_SECONDS = float(os.environ.get('ASCEND_STARTUP_BUDGET_SECONDS', 3.0))
+
+BENCHMARK = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+light = 'app.models' not in sys.modules
+from config import Config
+class C(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+created = app.create_app(C)
+end = time.perf_counter()
+print(json.dumps({'import': imported - start, 'total': end - start, 'light_import': light,
+                  'phases': dict(created.extensions['startup_timings']['phases'])}))
+"""
+
+class StartupCase(unittest.TestCase):
+    def test_phases_are_timed(self):
+        app = create_app(TestConfig)
+        report = app.extensions['startup_timings']
+        phases = [name for name, _ in report['phases']]
+        for name in ('database', 'models', 'trust', 'blueprints'):
+            self.assertIn(name, phases)
+        self.assertGreaterEqual(report['total'], sum(seconds for _, seconds in report['phases']))
+
+        with app.app_context():
+            result = app.test_cli_runner().invoke(args=['startup-report'])
+        self.assertIn('blueprints', result.output)
+        self.assertIn('total', result.output)
+
+    def test_create_app_does_no_database_work(self):
+        with mock.patch.object(Engine, 'connect', side_effect=AssertionError('connected at startup')):
+            create_app(TestConfig)
+
+    def test_cold_start_within_budget(self):
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        out = subprocess.run([sys.executable, '-c', BENCHMARK], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+
+        self.assertTrue(result['light_import'], 'importing app pulled in app.models')
+        self.assertLess(result['total'], STARTUP_BUDGET_SECONDS,
+                        f"cold start took {result['total']:.2f}s; phases: {result['phases']}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import User, Student, Alumni, Company, Question, Response, Feedback, TrustSnapshot
+from datetime import datetime, timedelta
+from app.trust_calculator import (TrustCalculator, FeedbackManager, DecayedTrust, TrustSnapshots,
+                                  trust_update_queue)
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    TRUST_UPDATE_MODE = 'manual'
+
+class TrustTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        trust_update_queue._drain()
+
+        company = Company(name='Google', industry='Technology')
+        student_user = User(name='s', email='s@example.com', role='student')
+        mentor_user = User(name='m', email='m@example.com', role='alumni')
+        db.session.add_all([company, student_user, mentor_user])
+        db.session.commit()
+        self.student = Student(user_id=student_user.id)
+        self.mentor = Alumni(user_id=mentor_user.id, current_company_id=company.id,
+                             trust_score=50, is_verified=True)
+        db.session.add_all([self.student, self.mentor])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def answered_question(self, title='q'):
+        q = Question(student_id=self.student.id, title=title, body='b', status='answered')
+        db.session.add(q)
+        db.session.commit()
+        db.session.add(Response(question_id=q.id, mentor_id=self.mentor.id, body='a'))
+        db.session.commit()
+        return q
+
+class FeedbackUpsertCase(TrustTestCase):
+    def test_second_submit_updates_same_row(self):
+        q = self.answered_question()
+
+        first = FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 3)
+        second = FeedbackManager.submit_feedback(q.id, self.student.id, 'got_referral', 5, 'thanks')
+
+        self.assertEqual(first, second)
+        feedback = Feedback.query.filter_by(question_id=q.id).one()
+        self.assertEqual((feedback.outcome, feedback.rating, feedback.comment),
+                         ('got_referral', 5, 'thanks'))
+        self.assertEqual(feedback.mentor_id, self.mentor.id)
+
+    def test_feedback_deleted_between_statements_is_inserted_again(self):
+        q = self.answered_question()
+        first = FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 3)
+        execute = db.session.execute
+        deleted = []
+
+        def delete_after_conflict(stmt, *args, **kwargs):
+            result = execute(stmt, *args, **kwargs)
+            if stmt.is_insert and not deleted:
+                deleted.append(execute(db.delete(Feedback)).rowcount)
+            return result
+
+        with mock.patch.object(db.session, 'execute', side_effect=delete_after_conflict):
+            second = FeedbackManager.submit_feedback(q.id, self.student.id, 'got_referral', 5)
+
+        self.assertEqual(deleted, [1])
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first, second)
+        feedback = Feedback.query.filter_by(question_id=q.id).one()
+        self.assertEqual((feedback.outcome, feedback.rating), ('got_referral', 5))
+
+    def test_compare_and_swap_retries_are_bounded(self):
+        q = self.answered_question()
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 3)
+        execute = db.session.execute
+        updates = []
+
+        def always_lose(stmt, *args, **kwargs):
+            if stmt.is_update:
+                updates.append(stmt)
+                return mock.Mock(rowcount=0)
+            return execute(stmt, *args, **kwargs)
+
+        with mock.patch.object(db.session, 'execute', side_effect=always_lose):
+            self.assertIsNone(FeedbackManager.submit_feedback(q.id, self.student.id, 'got_referral', 5))
+
+        self.assertEqual(len(updates), FeedbackManager.UPSERT_ATTEMPTS)
+        feedback = Feedback.query.filter_by(question_id=q.id).one()
+        self.assertEqual((feedback.outcome, feedback.rating), ('helpful', 3))
+
+    def test_unanswered_question_is_rejected(self):
+        q = Question(student_id=self.student.id, title='q', body='b', status='pending')
+        db.session.add(q)
+        db.session.commit()
+
+        self.assertIsNone(FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 5))
+        self.assertIsNone(FeedbackManager.submit_feedback(9999, self.student.id, 'helpful', 5))
+        self.assertEqual(trust_update_queue.pending(), set())
+
+    def test_trust_updates_are_coalesced(self):
+        questions = [self.answered_question(f'q{i}') for i in range(3)]
+        for q in questions:
+            FeedbackManager.submit_feedback(q.id, self.student.id, 'got_interview', 5)
+
+        # Deferred: nothing recomputed on the request path
+        self.assertEqual(db.session.get(Alumni, self.mentor.id).trust_score, 50)
+        self.assertEqual(trust_update_queue.pending(), {self.mentor.id})
+
+        with mock.patch.object(TrustCalculator, 'collect_components',
+                               wraps=TrustCalculator.collect_components) as calculate:
+            self.assertEqual(trust_update_queue.flush(), 1)
+        self.assertEqual(calculate.call_count, 1)
+        self.assertGreater(db.session.get(Alumni, self.mentor.id).trust_score, 50)
+        self.assertEqual(trust_update_queue.pending(), set())
+
+class DecayedTrustCase(TrustTestCase):
+    def feedback_at(self, outcome, created_at):
+        q = self.answered_question()
+        db.session.add(Feedback(question_id=q.id, mentor_id=self.mentor.id, student_id=self.student.id,
+                                outcome=outcome, rating=5, created_at=created_at))
+        db.session.commit()
+
+    def test_weight_halves_every_half_life(self):
+        at = datetime(2025, 3, 1)
+        later = at + timedelta(days=DecayedTrust.HALF_LIFE_DAYS)
+        anchored = DecayedTrust.anchored(10, at)
+        self.assertAlmostEqual(DecayedTrust.decayed(anchored, at), 10)
+        self.assertAlmostEqual(DecayedTrust.decayed(anchored, later), 5)
+
+    def test_submit_updates_running_sum_in_place(self):
+        q = self.answered_question()
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'got_referral', 5)
+        mentor = db.session.get(Alumni, self.mentor.id)
+        self.assertAlmostEqual(DecayedTrust.decayed(mentor.decayed_trust_sum), 15, places=3)
+
+        # Changing the outcome takes the old weight back out exactly
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 5)
+        db.session.refresh(mentor)
+        self.assertAlmostEqual(DecayedTrust.decayed(mentor.decayed_trust_sum), 5, places=3)
+
+        incremental = mentor.decayed_trust_sum
+        DecayedTrust.backfill()
+        db.session.refresh(mentor)
+        self.assertAlmostEqual(mentor.decayed_trust_sum, incremental)
+
+    def test_old_feedback_counts_less_than_additive(self):
+        now = datetime.utcnow()
+        self.feedback_at('got_referral', now - timedelta(days=3 * 365))
+        self.feedback_at('helpful', now - timedelta(days=1))
+        DecayedTrust.backfill()
+
+        [row] = DecayedTrust.compare(now)
+        self.assertEqual(row['additive'], 70)
+        self.assertEqual(row['decayed'], 55)
+        self.assertEqual(row['delta'], -15)
+
+    def test_decayed_model_drives_stored_score(self):
+        self.app.config['TRUST_SCORE_MODEL'] = 'decayed'
+        self.feedback_at('got_interview', datetime.utcnow() - timedelta(days=DecayedTrust.HALF_LIFE_DAYS))
+        DecayedTrust.backfill()
+
+        TrustCalculator.recompute_scores([self.mentor.id])
+        self.assertEqual(db.session.get(Alumni, self.mentor.id).trust_score, 55)
+
+    def test_scheduled_recompute_decays_idle_mentors(self):
+        self.app.config['TRUST_SCORE_MODEL'] = 'decayed'
+        self.feedback_at('got_interview', datetime.utcnow())
+        DecayedTrust.backfill()
+        TrustCalculator.recompute_scores([self.mentor.id])
+        fresh = db.session.get(Alumni, self.mentor.id).trust_score
+
+        # A half-life later, with no new feedback
+        later = datetime.utcnow() + timedelta(days=DecayedTrust.HALF_LIFE_DAYS)
+        class Later(datetime):
+            @classmethod
+            def utcnow(cls):
+                return later
+        with mock.patch('app.trust_calculator.datetime', Later):
+            result = self.app.test_cli_runner().invoke(args=['trust', 'recompute', '--batch-size', '1'])
+        self.assertIn('1 changed', result.output)
+        self.assertLess(db.session.get(Alumni, self.mentor.id).trust_score, fresh)
+
+class TrustSnapshotCase(TrustTestCase):
+    def test_snapshot_only_when_components_change(self):
+        q = self.answered_question()
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'got_interview', 4)
+        trust_update_queue.flush()
+        TrustCalculator.recompute_scores([self.mentor.id])
+
+        self.assertEqual(TrustSnapshot.query.count(), 1)
+        metrics = TrustCalculator.get_trust_metrics(self.mentor.id)
+        self.assertEqual(metrics['current_score'], 60)
+        self.assertEqual(metrics['interview_count'], 1)
+        self.assertEqual(metrics['average_rating'], 4)
+        self.assertEqual(metrics['badge'], 'Silver')
+
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'got_referral', 5)
+        trust_update_queue.flush()
+
+        history = TrustSnapshots.history(self.mentor.id)
+        self.assertEqual([h.score for h in history], [65, 60])
+        self.assertEqual(history[0].referral_count, 1)
+        self.assertEqual(history[0].interview_count, 0)
+
+    def test_metrics_without_snapshot_are_computed_once(self):
+        self.assertIsNone(TrustSnapshots.latest(self.mentor.id))
+        metrics = TrustCalculator.get_trust_metrics(self.mentor.id)
+        self.assertEqual(metrics['current_score'], 50)
+        self.assertEqual(metrics['total_feedback'], 0)
+        self.assertIsNotNone(TrustSnapshots.latest(self.mentor.id))
+
+    def test_mentor_dashboard_shows_breakdown(self):
+        self.mentor.user.set_password('password')
+        db.session.commit()
+        q = self.answered_question()
+        FeedbackManager.submit_feedback(q.id, self.student.id, 'helpful', 5)
+        trust_update_queue.flush()
+
+        client = self.app.test_client()
+        client.post('/auth/login', data=dict(email='m@example.com', password='password'))
+        html = client.get('/mentor_dashboard').get_data(as_text=True)
+        self.assertIn('1 helpful', html)
+        self.assertIn('5.0 avg', html)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)